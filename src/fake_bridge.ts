@@ -1,10 +1,27 @@
-import { CommandSystem, CommandSystemDonate, CommandSystemExit, isCommandSystemDonate, isCommandSystemExit } from './framework/types/commands'
+import { DonationChunks, missingChunks, reassembleDonation } from './framework/donation'
+import {
+  CommandSystem,
+  CommandSystemDonate,
+  CommandSystemDonateChunk,
+  CommandSystemDonateManifest,
+  CommandSystemExit,
+  isCommandSystemDonate,
+  isCommandSystemDonateChunk,
+  isCommandSystemDonateManifest,
+  isCommandSystemExit
+} from './framework/types/commands'
 import { Bridge } from './framework/types/modules'
 
 export default class FakeBridge implements Bridge {
+  chunks = new DonationChunks()
+
   send (command: CommandSystem): void {
     if (isCommandSystemDonate(command)) {
       this.handleDonation(command)
+    } else if (isCommandSystemDonateChunk(command)) {
+      this.handleDonationChunk(command)
+    } else if (isCommandSystemDonateManifest(command)) {
+      this.handleDonationManifest(command)
     } else if (isCommandSystemExit(command)) {
       this.handleExit(command)
     } else {
@@ -16,6 +33,25 @@ export default class FakeBridge implements Bridge {
     console.log(`[FakeBridge] received donation: ${command.key}=${command.json_string}`)
   }
 
+  handleDonationChunk (command: CommandSystemDonateChunk): void {
+    this.chunks.add(command)
+    console.log(`[FakeBridge] received donation chunk: ${command.key} #${command.sequence} (${command.table_id}, ${command.size} bytes)`)
+  }
+
+  handleDonationManifest (command: CommandSystemDonateManifest): void {
+    const chunks = this.chunks.take(command.key)
+    const missing = missingChunks(command, chunks)
+    const size = command.chunks.reduce((total, chunk) => total + chunk.size, 0)
+    if (missing.length > 0) {
+      console.log(`[FakeBridge] donation ${command.key} is incomplete, chunks missing: ${missing.join(', ')}`)
+      return
+    }
+    console.log(`[FakeBridge] received donation: ${command.key}, ${command.tables.length} entries in ${command.chunks.length} chunks, ${size} bytes`)
+    reassembleDonation(command, chunks)
+      .then((donation) => this.handleDonation(donation))
+      .catch((error) => console.log(`[FakeBridge] donation ${command.key} could not be reassembled: ${String(error)}`))
+  }
+
   handleExit (command: CommandSystemExit): void {
     console.log(`[FakeBridge] received exit: ${command.code}=${command.info}`)
   }
@@ -0,0 +1,74 @@
+import {
+  CommandSystemDonate,
+  CommandSystemDonateChunk,
+  CommandSystemDonateManifest
+} from './types/commands'
+
+// Chunks of the donations that are being received, per donation key
+export class DonationChunks {
+  private readonly chunks = new Map<string, Map<number, CommandSystemDonateChunk>>()
+
+  add (chunk: CommandSystemDonateChunk): void {
+    const chunks = this.chunks.get(chunk.key) ?? new Map<number, CommandSystemDonateChunk>()
+    chunks.set(chunk.sequence, chunk)
+    this.chunks.set(chunk.key, chunks)
+  }
+
+  take (key: string): Map<number, CommandSystemDonateChunk> {
+    const chunks = this.chunks.get(key) ?? new Map<number, CommandSystemDonateChunk>()
+    this.chunks.delete(key)
+    return chunks
+  }
+}
+
+// The chunks the manifest lists that did not arrive or do not belong to the entry the manifest gives
+export function missingChunks (
+  manifest: CommandSystemDonateManifest,
+  chunks: Map<number, CommandSystemDonateChunk>
+): number[] {
+  return manifest.chunks
+    .filter(({ sequence, entry, checksum }) => {
+      const chunk = chunks.get(sequence)
+      return chunk === undefined || chunk.entry !== entry || chunk.checksum !== checksum
+    })
+    .map(({ sequence }) => sequence)
+}
+
+// The single donation command of a chunked donation, the counterpart of reassemble in port/donation.py
+export async function reassembleDonation (
+  manifest: CommandSystemDonateManifest,
+  chunks: Map<number, CommandSystemDonateChunk>
+): Promise<CommandSystemDonate> {
+  const missing = missingChunks(manifest, chunks)
+  if (missing.length > 0) {
+    throw new Error(`Chunks ${missing.join(', ')} of donation ${manifest.key} are missing`)
+  }
+
+  const entries: string[][] = manifest.tables.map(() => [])
+  for (const info of manifest.chunks) {
+    const chunk = chunks.get(info.sequence) as CommandSystemDonateChunk
+    const data = await decompress(chunk.data)
+    if (await checksum(data) !== info.checksum) {
+      throw new Error(`Chunk ${info.sequence} of donation ${manifest.key} is damaged`)
+    }
+    entries[info.entry].push(new TextDecoder().decode(data))
+  }
+
+  const json = manifest.tables.map((tableId, entry) => `{${JSON.stringify(tableId)}:${entries[entry].join('')}}`)
+  return {
+    __type__: 'CommandSystemDonate',
+    key: manifest.key,
+    json_string: `[${json.join(',')}]`
+  }
+}
+
+async function decompress (data: string): Promise<Uint8Array> {
+  const compressed = Uint8Array.from(atob(data), (character) => character.charCodeAt(0))
+  const stream = new Blob([compressed]).stream().pipeThrough(new (globalThis as any).DecompressionStream('gzip'))
+  return new Uint8Array(await new Response(stream).arrayBuffer())
+}
+
+async function checksum (data: Uint8Array): Promise<string> {
+  const digest = new Uint8Array(await crypto.subtle.digest('SHA-256', data))
+  return Array.from(digest, (byte) => byte.toString(16).padStart(2, '0')).join('')
+}
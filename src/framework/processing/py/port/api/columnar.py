@@ -0,0 +1,156 @@
+"""
+Columnar encoding of the consent tables
+
+DataFrame.to_json writes every cell under its column and index label, so a table of 100k rows
+becomes a string with 100k copies of every label. The columnar encoding writes a table as
+column arrays instead, with the values of a column that repeat (the type column, account names)
+as a dictionary and integer codes, and timestamps as epoch milliseconds:
+
+    {"__type__": "ColumnarTable", "version": 2, "length": 3, "columns": [
+        {"name": "type", "dictionary": ["follower"], "codes": [0, 0, 0]},
+        {"name": "timestamp", "timestamps": [1600000000000, null, 1600000060000]},
+        {"name": "link", "values": ["https://...", "https://...", null]}
+    ]}
+
+A code of -1 and a null are missing values. See columnarRows in the consent form.
+
+The donation is not columnar, to_records gives its rows with the missing values as null.
+
+A paginated consent table sends its first rows with a summary of the whole table (see summarize),
+further rows are sent on request (see port.api.commands.CommandUITablePage).
+"""
+
+import json
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+
+# Version of the encoding, a columnar consent table has the same version (see props.DATA_FORMAT_VERSIONS)
+VERSION = 2
+
+# A text column is dictionary encoded when it has at most this share of distinct values
+MAX_DISTINCT_SHARE = 0.5
+
+
+def _values(values: pd.Series) -> list:
+    """
+    The values of a column as a list, missing values as None
+    """
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def encode_column(name: str, values: pd.Series) -> dict:
+    """
+    The encoding of one column, see the module docstring
+    """
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        if values.dt.tz is None:
+            values = values.dt.tz_localize("UTC")
+        milliseconds = (values - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(milliseconds=1)
+        return {"name": name, "timestamps": _values(milliseconds.astype("Int64"))}
+    if pd.api.types.is_bool_dtype(values.dtype) or pd.api.types.is_numeric_dtype(values.dtype):
+        return {"name": name, "values": _values(values)}
+
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    if len(uniques) <= MAX_DISTINCT_SHARE * len(values):
+        dictionary = [value if isinstance(value, (str, int, float, bool)) else str(value) for value in uniques]
+        return {"name": name, "dictionary": dictionary, "codes": codes.astype(np.int64).tolist()}
+    texts = [value if value is None or isinstance(value, str) else str(value) for value in _values(values)]
+    return {"name": name, "values": texts}
+
+
+def encode_table(df: pd.DataFrame) -> dict:
+    return {
+        "__type__": "ColumnarTable",
+        "version": VERSION,
+        "length": len(df),
+        "columns": [encode_column(str(name), df[name]) for name in df.columns],
+    }
+
+
+def summarize(df: pd.DataFrame) -> list[dict]:
+    """
+    Per column of a table: the number of distinct and missing values,
+    and the first and last timestamp (epoch milliseconds) of a timestamp column
+    """
+    summary = []
+    for name in df.columns:
+        values = df[name]
+        column = {"name": str(name), "distinct": int(values.nunique()), "missing": int(values.isna().sum())}
+        if pd.api.types.is_datetime64_any_dtype(values.dtype) and values.notna().any():
+            timestamps = encode_column(str(name), values.agg(["min", "max"]))["timestamps"]
+            column["first"], column["last"] = timestamps
+        summary.append(column)
+    return summary
+
+
+def _cell(value) -> str:
+    """
+    A value as the consent form shows it (String() in JavaScript)
+    """
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _timestamp_cell(milliseconds) -> str:
+    if milliseconds is None:
+        return "null"
+    return datetime.fromtimestamp(milliseconds / 1000, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def column_cells(df: pd.DataFrame) -> list[tuple[str, list[str]]]:
+    """
+    The text of the cells of every column as the consent form shows them: (column name, cells)
+
+    The cells are decoded from the columnar encoding the way the consent form decodes them,
+    so rows the form never received are searched and donated in the notation of the rows it showed.
+    """
+    columns = []
+    for column in encode_table(df)["columns"]:
+        if "codes" in column:
+            dictionary = [_cell(value) for value in column["dictionary"]]
+            cells = ["null" if code < 0 else dictionary[code] for code in column["codes"]]
+        elif "timestamps" in column:
+            cells = [_timestamp_cell(value) for value in column["timestamps"]]
+        else:
+            cells = [_cell(value) for value in column["values"]]
+        columns.append((column["name"], cells))
+    return columns
+
+
+def _donated(values: pd.Series) -> list[str | None]:
+    """
+    The values of a column as they are donated: missing values as None, timestamps as ISO-8601 in UTC,
+    other values as the text of the cell
+    """
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        utc = values.dt.tz_localize("UTC") if values.dt.tz is None else values.dt.tz_convert("UTC")
+        fraction = ".%f" if (utc.dt.microsecond.fillna(0) != 0).any() else ""
+        return _values(utc.dt.strftime(f"%Y-%m-%dT%H:%M:%S{fraction}Z"))
+    return [None if value is None else _cell(value) for value in _values(values)]
+
+
+def to_records(df: pd.DataFrame) -> list[dict[str, str | None]]:
+    """
+    The rows of a table as they are donated: column name -> the text of the cell, or None if it is missing
+
+    Text columns keep the notation of the export (timestamps as extracted), datetime columns
+    are written as ISO-8601 in UTC ('2024-01-28T13:00:00Z'), other values as the consent form shows them.
+    """
+    names = [str(name) for name in df.columns]
+    columns = [_donated(df[name]) for name in df.columns]
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def to_json(df: pd.DataFrame) -> str:
+    """
+    The columnar encoding of a table as a JSON string
+    """
+    return json.dumps(encode_table(df), ensure_ascii=False, separators=(",", ":"))
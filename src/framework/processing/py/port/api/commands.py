@@ -1,3 +1,6 @@
+import port.api.columnar as columnar
+
+
 class CommandUIRender:
     __slots__ = "page"
 
@@ -11,6 +14,60 @@ class CommandUIRender:
         return dict
 
 
+class CommandUITablePage:
+    """Rows of a paginated consent table, the answer to a PayloadTablePageRequest
+
+    The consent form on screen appends the rows to the table, the page is not rendered again.
+    """
+
+    __slots__ = "table_id", "offset", "data_frame", "total_rows"
+
+    def __init__(self, table_id, offset, data_frame, total_rows):
+        self.table_id = table_id
+        self.offset = offset
+        self.data_frame = data_frame
+        self.total_rows = total_rows
+
+    def toDict(self):
+        dict = {}
+        dict["__type__"] = "CommandUITablePage"
+        dict["table_id"] = self.table_id
+        dict["offset"] = self.offset
+        dict["total_rows"] = self.total_rows
+        dict["data_frame"] = columnar.to_json(self.data_frame)
+        return dict
+
+
+class CommandUITableSearch:
+    """Rows of a paginated consent table that match a search, the answer to a PayloadTableSearch
+
+    The search covers the whole table, not only the rows the consent form has loaded:
+    matches is the number of matching rows, ranges their row ids as half-open ranges,
+    data_frame the first of them with their row ids in row_ids.
+    """
+
+    __slots__ = "table_id", "query", "data_frame", "row_ids", "ranges", "matches"
+
+    def __init__(self, table_id, query, data_frame, row_ids, ranges, matches):
+        self.table_id = table_id
+        self.query = query
+        self.data_frame = data_frame
+        self.row_ids = row_ids
+        self.ranges = ranges
+        self.matches = matches
+
+    def toDict(self):
+        dict = {}
+        dict["__type__"] = "CommandUITableSearch"
+        dict["table_id"] = self.table_id
+        dict["query"] = self.query
+        dict["data_frame"] = columnar.to_json(self.data_frame)
+        dict["row_ids"] = self.row_ids
+        dict["ranges"] = self.ranges
+        dict["matches"] = self.matches
+        return dict
+
+
 class CommandSystemDonate:
     __slots__ = "key", "json_string"
 
@@ -26,6 +83,54 @@ class CommandSystemDonate:
         return dict
 
 
+class CommandSystemDonateChunk:
+    """Part of a chunked donation, see port.donation"""
+
+    __slots__ = "key", "sequence", "entry", "table_id", "data", "size", "checksum"
+
+    def __init__(self, key, sequence, entry, table_id, data, size, checksum):
+        self.key = key
+        self.sequence = sequence
+        self.entry = entry
+        self.table_id = table_id
+        self.data = data
+        self.size = size
+        self.checksum = checksum
+
+    def toDict(self):
+        dict = {}
+        dict["__type__"] = "CommandSystemDonateChunk"
+        dict["key"] = self.key
+        dict["sequence"] = self.sequence
+        dict["entry"] = self.entry
+        dict["table_id"] = self.table_id
+        dict["data"] = self.data
+        dict["size"] = self.size
+        dict["checksum"] = self.checksum
+        return dict
+
+
+class CommandSystemDonateManifest:
+    """Last command of a chunked donation: the table id of every entry, in order, and every chunk, see port.donation"""
+
+    __slots__ = "key", "tables", "chunks"
+
+    def __init__(self, key, tables, chunks):
+        self.key = key
+        self.tables = tables
+        self.chunks = chunks
+
+    def toDict(self):
+        dict = {}
+        dict["__type__"] = "CommandSystemDonateManifest"
+        dict["key"] = self.key
+        dict["compression"] = "gzip"
+        dict["encoding"] = "base64"
+        dict["tables"] = self.tables
+        dict["chunks"] = self.chunks
+        return dict
+
+
 class CommandSystemExit:
     __slots__ = "code", "info"
 
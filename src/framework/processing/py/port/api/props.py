@@ -3,6 +3,12 @@ from typing import Optional, TypedDict
 
 import pandas as pd
 
+import port.api.columnar as columnar
+
+
+# Version of PropsUIPromptConsentFormTable by the format of its data_frame, the consent form reads both
+DATA_FORMAT_VERSIONS = {"pandas": 1, "columnar": columnar.VERSION}
+
 
 class Translations(TypedDict):
     """Typed dict containing text that is  display in a speficic language
@@ -92,6 +98,13 @@ class PropsUIPromptConsentFormTable:
         title: title of the table
         data_frame: table to be shown
         visualizations: optional visualizations to be shown. (see TODO for input format)
+        data_format: how data_frame is sent: "columnar" (version 2, see port.api.columnar)
+            or "pandas" (version 1, DataFrame.to_json)
+        page_size: send only the first page_size rows, with the number of rows and a summary
+            of the table, the consent form asks for further rows with a PayloadTablePageRequest
+            (see port.consent). Only with the columnar format.
+        truncation: how the extraction of the table was cut short on its budget (see port.budget),
+            the consent form tells the participant that the table is incomplete
     """
 
     id: str
@@ -100,16 +113,32 @@ class PropsUIPromptConsentFormTable:
     description: Optional[Translatable] = None
     visualizations: Optional[list] = None
     folded: Optional[bool] = False
+    data_format: str = "columnar"
+    page_size: Optional[int] = None
+    truncation: Optional[dict] = None
 
     def toDict(self):
         dict = {}
         dict["__type__"] = "PropsUIPromptConsentFormTable"
+        dict["version"] = DATA_FORMAT_VERSIONS[self.data_format]
         dict["id"] = self.id
         dict["title"] = self.title.toDict()
-        dict["data_frame"] = self.data_frame.to_json()
+        if self.page_size is not None:
+            if self.data_format != "columnar":
+                raise ValueError("Consent tables are only paginated in the columnar format")
+            dict["data_frame"] = columnar.to_json(self.data_frame.iloc[:self.page_size])
+            dict["total_rows"] = len(self.data_frame)
+            dict["page_size"] = self.page_size
+            dict["summary"] = columnar.summarize(self.data_frame)
+        elif self.data_format == "columnar":
+            dict["data_frame"] = columnar.to_json(self.data_frame)
+        else:
+            # Epoch milliseconds, as the consent form reads version 1 (the default of older pandas)
+            dict["data_frame"] = self.data_frame.to_json(date_format="epoch")
         dict["description"] = self.description.toDict() if self.description else None
         dict["visualizations"] = self.visualizations if self.visualizations else None
         dict["folded"] = self.folded
+        dict["truncation"] = self.truncation
         return dict
 
 
@@ -151,6 +180,29 @@ class PropsUIPromptConsentForm:
         return dict
 
 
+@dataclass
+class PropsUIPromptProgress:
+    """Progress of a step that takes a while, the page answers as soon as it is shown
+
+    Attributes:
+        description: text with an explanation
+        message: what is being done now
+        percentage: how far the step is, from 0 to 100
+    """
+
+    description: Translatable
+    message: Translatable
+    percentage: Optional[int] = None
+
+    def toDict(self):
+        dict = {}
+        dict["__type__"] = "PropsUIPromptProgress"
+        dict["description"] = self.description.toDict()
+        dict["message"] = self.message.toDict()
+        dict["percentage"] = self.percentage
+        return dict
+
+
 @dataclass
 class PropsUIPromptFileInput:
     """Prompt the user to submit a file
@@ -158,16 +210,20 @@ class PropsUIPromptFileInput:
     Attributes:
         description: text with an explanation
         extensions: accepted mime types, example: "application/zip, text/plain"
+        multiple: whether the user can submit several files at once,
+            the result is then a PayloadStringList with the paths of all files
     """
 
     description: Translatable
     extensions: str
+    multiple: Optional[bool] = False
 
     def toDict(self):
         dict = {}
         dict["__type__"] = "PropsUIPromptFileInput"
         dict["description"] = self.description.toDict()
         dict["extensions"] = self.extensions
+        dict["multiple"] = self.multiple
         return dict
 
 
@@ -0,0 +1,285 @@
+import hashlib
+import posixpath
+import re
+import weakref
+import zipfile
+from contextlib import contextmanager
+from collections import defaultdict
+
+
+# 'followers_2.html' is part 2 of 'followers.html'
+_PART = re.compile(r"^(?P<stem>.+)_(?P<number>\d+)(?P<extension>\.[^./]+)$")
+
+
+def part_of(name: str) -> tuple[str, int]:
+    """
+    Returns the family and the part number of a member
+
+    Large exports split a file into numbered parts: followers_1.html, followers_2.html, ...
+    These are the parts of the family followers.html. A member without a number is
+    part 0 of its own family.
+    """
+    match = _PART.match(name)
+    if match is None:
+        return name, 0
+    return match["stem"] + match["extension"], int(match["number"])
+
+
+class ArchiveIndex:
+    """
+    Lookup tables over the members of a zip archive
+
+    The index is built in a single pass over the central directory
+    (zip_file.infolist()), after that every lookup is a dictionary access.
+    Members can be found by:
+    * any trailing part of their path (on path component boundaries),
+      for example 'followers_and_following/followers_1.html'
+    * their basename, for example 'message_1.html'
+    * a directory prefix, for example 'your_instagram_activity/messages/inbox/'
+
+    Members that are numbered parts of one file (see part_of) can be looked up as a family,
+    by any trailing part of the path of the family or of one of its parts.
+    Directories that have no entry of their own in the zip are indexed as well.
+    """
+
+    _cache = weakref.WeakKeyDictionary()
+
+    def __init__(self, infolist: list[zipfile.ZipInfo]):
+        self._infos = {}
+        self._suffixes = {}
+        self._basenames = defaultdict(list)
+        self._directories = defaultdict(list)
+        self._seen_directories = set()
+        self._families = defaultdict(list)
+        self._family_suffixes = {}
+
+        for info in infolist:
+            name = info.filename
+            if name in self._infos:
+                continue
+            self._infos[name] = info
+
+            if name.endswith("/"):
+                self._add_directory(name)
+                continue
+
+            self._add_suffixes(name)
+            self._basenames[posixpath.basename(name)].append(name)
+            family, number = part_of(name)
+            if family not in self._families:
+                self._add_suffixes(family, self._family_suffixes)
+            self._families[family].append((number, name))
+
+            directory = posixpath.dirname(name)
+            while directory:
+                self._directories[directory + "/"].append(name)
+                self._add_directory(directory + "/")
+                directory = posixpath.dirname(directory)
+
+    @classmethod
+    def from_zip(cls, zip_file: zipfile.ZipFile) -> "ArchiveIndex":
+        """
+        Returns the index for an open ZipFile, the index is built once per ZipFile object
+        """
+        index = cls._cache.get(zip_file)
+        if index is None:
+            index = cls(zip_file.infolist())
+            cls._cache[zip_file] = index
+        return index
+
+    def _add_directory(self, directory: str) -> None:
+        if directory in self._seen_directories:
+            return
+        self._seen_directories.add(directory)
+        self._add_suffixes(directory)
+
+    def _add_suffixes(self, name: str, suffixes: dict[str, str] | None = None) -> None:
+        # For 'a/b/c.html' register 'a/b/c.html', 'b/c.html' and 'c.html'
+        # The first member in central directory order wins, like the old linear scan
+        if suffixes is None:
+            suffixes = self._suffixes
+        start = 0
+        while True:
+            suffixes.setdefault(name[start:], name)
+            start = name.find("/", start, len(name) - 1) + 1
+            if start == 0:
+                break
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._infos
+
+    def __len__(self) -> int:
+        return len(self._infos)
+
+    @property
+    def names(self) -> list[str]:
+        """
+        All member names in central directory order
+        """
+        return list(self._infos)
+
+    def info(self, name: str) -> zipfile.ZipInfo | None:
+        """
+        Returns the ZipInfo of a member, or None if there is no such member
+        """
+        return self._infos.get(name)
+
+    def fingerprint(self) -> str:
+        """
+        Returns a hash of the names, CRC-32s and sizes of all members
+
+        Only the central directory is read. The order of the members and the way they are compressed
+        or split over zip files do not matter: the same export zipped again has the same fingerprint.
+        """
+        digest = hashlib.sha256()
+        for name in sorted(self._infos):
+            info = self._infos[name]
+            if not name.endswith("/"):
+                digest.update(f"{name}\0{info.CRC:08x}\0{info.file_size}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def find(self, suffix: str) -> str | None:
+        """
+        Returns the full path of the first member (or directory) whose path ends with suffix,
+        or None if there is no such member
+        """
+        return self._suffixes.get(suffix.lstrip("/"))
+
+    def resolve(self, suffix: str) -> str:
+        """
+        Same as find, but raises a KeyError if there is no such member
+        """
+        path = self.find(suffix)
+        if path is None:
+            raise KeyError(f"There is no item named {suffix!r} in the archive")
+        return path
+
+    def by_basename(self, basename: str) -> list[str]:
+        """
+        Returns all members with the given file name, in central directory order
+        """
+        return list(self._basenames.get(basename, ()))
+
+    def parts(self, name: str) -> list[str]:
+        """
+        Returns all parts of the family of a member, ordered by part number
+        """
+        family, _ = part_of(name)
+        return [part for _, part in sorted(self._families.get(family, ()))] or [name]
+
+    def family(self, suffix: str) -> list[str]:
+        """
+        Returns all parts of the family whose path ends with the family of suffix, ordered by part number,
+        or an empty list if there is no such family
+
+        'followers.html', 'followers_1.html' and 'followers_2.html' find the same family,
+        whether the export has followers.html, followers_1.html or both.
+        """
+        family = self._family_suffixes.get(part_of(suffix.lstrip("/"))[0])
+        if family is None:
+            return []
+        return [part for _, part in sorted(self._families[family])]
+
+    def under(self, directory: str) -> list[str]:
+        """
+        Returns all members below a directory (recursively), in central directory order
+        """
+        if not directory.endswith("/"):
+            directory += "/"
+        return list(self._directories.get(directory, ()))
+
+
+class ArchiveSession:
+    """
+    An opened archive that is shared by all extractors during a donation session
+
+    The session owns the zip file handles and the ArchiveIndex of the archive,
+    so the central directory is read once, no matter how many extractors run.
+    Use it as a context manager, or call close() when done:
+
+        with ArchiveSession(path) as archive:
+            df = extract_followers_html(archive)
+
+    Instagram delivers large exports as several zip files. Given all of them,
+    the session is one virtual archive: the index is built from the central directories
+    of all zips (nothing is extracted) and open() reads a member from the zip that holds it,
+    so extractors do not need to know which zip that is. The parts of an export share
+    its folder layout, a member that is in more than one zip is read from the first.
+    """
+
+    def __init__(self, path: str | list[str]):
+        self.paths = [path] if isinstance(path, str) else list(path)
+        if not self.paths:
+            raise ValueError("No archive to open")
+        self.path = self.paths[0]
+
+        self.zip_files = []
+        try:
+            for part in self.paths:
+                self.zip_files.append(zipfile.ZipFile(part))
+        except Exception:
+            self.close()
+            raise
+
+        if len(self.zip_files) == 1:
+            self.index = ArchiveIndex.from_zip(self.zip_files[0])
+            self._holders = None
+        else:
+            self.index = ArchiveIndex([info for zip_file in self.zip_files for info in zip_file.infolist()])
+            self._holders = {}
+            for zip_file in self.zip_files:
+                for name in zip_file.namelist():
+                    self._holders.setdefault(name, zip_file)
+
+    def __enter__(self) -> "ArchiveSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return all(zip_file.fp is None for zip_file in self.zip_files)
+
+    def close(self) -> None:
+        for zip_file in self.zip_files:
+            zip_file.close()
+
+    def find(self, suffix: str) -> str | None:
+        return self.index.find(suffix)
+
+    def resolve(self, suffix: str) -> str:
+        return self.index.resolve(suffix)
+
+    def holder(self, name: str) -> zipfile.ZipFile:
+        """
+        Returns the zip file that holds a member
+        """
+        if self._holders is None:
+            return self.zip_files[0]
+        try:
+            return self._holders[name]
+        except KeyError:
+            raise KeyError(f"There is no item named {name!r} in the archive") from None
+
+    def open(self, name: str):
+        """
+        Opens a member for reading, name should be a full path as returned by find or resolve
+        """
+        return self.holder(name).open(name)
+
+
+@contextmanager
+def open_archive(source: "str | list[str] | ArchiveSession"):
+    """
+    Yields an ArchiveSession for source
+
+    Extractors accept either a session or the path(s) to the zip file(s) of an export:
+    a session is used as is and stays open, paths are opened here
+    and closed again when the extractor is done.
+    """
+    if isinstance(source, ArchiveSession):
+        yield source
+    else:
+        with ArchiveSession(source) as session:
+            yield session
@@ -0,0 +1,155 @@
+"""
+Profiling an export before extraction
+
+Instagram exports come in two formats (HTML or JSON, chosen by the donor), in the language
+of the account, and in the folder layout of the time they were made. profile_archive finds out
+which from the member listing and the first kilobytes of one small member, so the matching
+extractors and labels can be chosen up front instead of failing table by table.
+"""
+
+import json
+import posixpath
+from dataclasses import dataclass
+
+from port.archive import ArchiveSession, open_archive
+
+
+# How much of the probed member is read
+PROBE_BYTES = 16 * 1024
+
+# Small members that are in every export and carry localized labels, the first one found is probed
+PROBE_MEMBERS = (
+    'personal_information/personal_information/personal_information',
+    'personal_information/information_about_you/account_based_in',
+    'security_and_login_information/login_and_account_creation/login_activity',
+)
+
+# Folder layouts, newest first: the layout is the first one whose directory is in the archive
+LAYOUTS = (
+    ('2023', 'your_instagram_activity/'),
+    ('2022', 'connections/'),
+    ('legacy', 'followers_and_following/'),
+)
+
+# Labels of the export by language: English label -> the label in the language.
+# Every language maps every label the specs look up (the keys of string_map_data in port.extraction_insta),
+# also the labels that read the same
+LABELS: dict[str, dict[str, str]] = {
+    'en': {},
+    'de': {
+        'Author': 'Autor',
+        'City Name': 'Stadtname',
+        'Comment': 'Kommentar',
+        'Last Login': 'Letzte Anmeldung',
+        'Media Owner': 'Medieninhaber',
+        'Name': 'Name',
+        'Private Account': 'Privates Konto',
+        'Private account': 'Privates Konto',
+        'Saved on': 'Gespeichert am',
+        'Search': 'Suche',
+        'Time': 'Zeit',
+        'User Agent': 'User-Agent',
+        'Username': 'Benutzername',
+    },
+}
+
+# Labels that only occur in exports of one language, they tell the languages apart
+_MARKERS = {
+    'en': ('Private Account', 'Private account', 'Username'),
+    'de': ('Privates Konto', 'Benutzername', 'Zeit'),
+}
+
+
+def translations(label: str) -> set[str]:
+    """
+    The label in all known languages
+    """
+    return {labels.get(label, label) for labels in LABELS.values()}
+
+
+def _encoded(marker: str) -> tuple[bytes, ...]:
+    # As written in HTML, and as written in JSON (escaped, and double encoded, see extraction_json.fix_encoding)
+    escaped = json.dumps(marker.encode('utf-8').decode('latin-1'))[1:-1]
+    return tuple({marker.encode('utf-8'), escaped.encode('ascii')})
+
+
+_ENCODED_MARKERS = {
+    language: tuple(encoded for marker in markers for encoded in _encoded(marker))
+    for language, markers in _MARKERS.items()
+}
+
+
+@dataclass(frozen=True)
+class ArchiveProfile:
+    """
+    What kind of export an archive holds
+
+    Attributes:
+        format: "html", "json", "mixed" (both, for example an export that was unpacked and zipped again)
+            or "unknown" (neither)
+        language: language of the labels of the export, a key of LABELS, or "unknown"
+        layout: the folder layout (see LAYOUTS), or "unknown"
+    """
+
+    format: str = 'unknown'
+    language: str = 'unknown'
+    layout: str = 'unknown'
+
+    @property
+    def labels(self) -> dict[str, str]:
+        """
+        English label -> the label of the export, English if the language is unknown
+        """
+        return LABELS.get(self.language, {})
+
+
+def detect_language(sample: bytes) -> str:
+    """
+    The language of a sample of an export, by the labels in it
+    """
+    hits = {
+        language: sum(sample.count(marker) for marker in markers)
+        for language, markers in _ENCODED_MARKERS.items()
+    }
+    language, count = max(hits.items(), key=lambda item: item[1])
+    return language if count > 0 else 'unknown'
+
+
+def profile_archive(zip_file: str | ArchiveSession) -> ArchiveProfile:
+    """
+    Profiles an export: format and layout from the member listing, language from a probe
+
+    Only the first PROBE_BYTES of one member are decompressed.
+    """
+    try:
+        with open_archive(zip_file) as archive:
+            index = archive.index
+            extensions = {}
+            for name in index.names:
+                extension = posixpath.splitext(name)[1].lower()
+                extensions[extension] = extensions.get(extension, 0) + 1
+            html_members, json_members = extensions.get('.html', 0), extensions.get('.json', 0)
+            if html_members and json_members:
+                format = 'mixed'
+            elif html_members or json_members:
+                format = 'html' if html_members else 'json'
+            else:
+                return ArchiveProfile()
+
+            layout = next((name for name, directory in LAYOUTS if index.find(directory) is not None), 'unknown')
+
+            language = 'unknown'
+            candidates = ('.html', '.json') if html_members >= json_members else ('.json', '.html')
+            for member in PROBE_MEMBERS:
+                path = next((path for path in map(index.find, (member + ext for ext in candidates)) if path), None)
+                if path is None:
+                    continue
+                with archive.open(path) as f:
+                    language = detect_language(f.read(PROBE_BYTES))
+                if language != 'unknown':
+                    break
+
+            return ArchiveProfile(format, language, layout)
+    except Exception as e:
+        print(f"Something went wrong: {e}")
+        return ArchiveProfile()
@@ -0,0 +1,214 @@
+"""
+Parity and speed harness for the HTML parser backends (see port.extraction.BACKENDS)
+
+Runs every table on every backend over the same archives and reports, per table and backend,
+the rows, the time, the throughput and the peak memory, and the rows that differ from
+the reference backend. Every measurement runs in a fresh process, so the memory of one
+does not count for the next and the native memory of the parsers is included.
+
+    python -m port.backend_harness export.zip [export2.zip ...] [--backends scan lxml] [--tables followers]
+
+The last line of every table names the fastest backend that gives the rows of the reference.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import port.extraction_insta_html_lxml as extraction_insta_html
+from port.archive import ArchiveSession
+from port.extraction import BACKENDS, extract_html
+
+
+@dataclass
+class Measurement:
+    """
+    One table extracted by one backend from one archive
+    """
+
+    table: str
+    backend: str
+    rows: list[tuple] = field(repr=False)
+    seconds: float
+    peak_bytes: int | None
+    member_bytes: int
+    error: str | None = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return len(self.rows) / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.member_bytes / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class Difference:
+    """
+    The rows of a backend that the reference does not have, and the other way around
+    """
+
+    missing: list[tuple]
+    extra: list[tuple]
+    same_order: bool
+
+    @property
+    def count(self) -> int:
+        return len(self.missing) + len(self.extra)
+
+
+def _resident_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_resident_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _member_bytes(archive: ArchiveSession, table: str) -> int:
+    """
+    The uncompressed size of the members of a table
+    """
+    total = 0
+    for spec in extraction_insta_html.TABLES[table]:
+        try:
+            members = spec.resolve_members(archive.index)
+        except KeyError:
+            continue
+        total += sum(archive.index.info(path).file_size for path, _ in members)
+    return total
+
+
+def _rows(df) -> list[tuple]:
+    return [
+        tuple(None if value != value else value for value in row)
+        for row in df.astype(object).itertuples(index=False)
+    ]
+
+
+def measure(paths: list[str], table: str, backend: str) -> Measurement:
+    """
+    Extracts one table with one backend, meant to run in a process of its own
+    """
+    with ArchiveSession(paths) as archive:
+        member_bytes = _member_bytes(archive, table)
+        before = _resident_bytes()
+        start = time.perf_counter()
+        try:
+            df = extract_html(archive, [table], backend=backend)[table]
+            error = None
+        except Exception as e:
+            df, error = None, str(e)
+        seconds = time.perf_counter() - start
+        peak = _peak_resident_bytes()
+
+    peak_bytes = max(peak - before, 0) if peak is not None and before is not None else None
+    rows = _rows(df) if df is not None else []
+    return Measurement(table, backend, rows, seconds, peak_bytes, member_bytes, error)
+
+
+def compare(reference: list[tuple], rows: list[tuple]) -> Difference:
+    expected, found = Counter(reference), Counter(rows)
+    return Difference(
+        missing=list((expected - found).elements()),
+        extra=list((found - expected).elements()),
+        same_order=reference == rows,
+    )
+
+
+def run(
+    paths: list[str], tables: list[str] | None = None, backends: list[str] | None = None, reference: str = "lxml"
+) -> dict[str, dict[str, tuple[Measurement, Difference]]]:
+    """
+    Measures every table on every backend over one archive (the zip files of one export)
+
+    Returns:
+        table name -> backend -> (measurement, difference with the reference backend)
+    """
+    tables = tables or list(extraction_insta_html.TABLES)
+    backends = backends or list(BACKENDS)
+    if reference not in backends:
+        backends = [reference] + backends
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context, max_tasks_per_child=1) as pool:
+        for table in tables:
+            measurements = {backend: pool.submit(measure, paths, table, backend).result() for backend in backends}
+            expected = measurements[reference].rows
+            results[table] = {
+                backend: (measurement, compare(expected, measurement.rows))
+                for backend, measurement in measurements.items()
+            }
+    return results
+
+
+def fastest_matching(results: dict[str, tuple[Measurement, Difference]]) -> str | None:
+    """
+    The fastest backend of a table that gives the rows of the reference, in the same order
+    """
+    matching = [
+        measurement for measurement, difference in results.values()
+        if measurement.error is None and difference.count == 0 and difference.same_order
+    ]
+    return min(matching, key=lambda measurement: measurement.seconds).backend if matching else None
+
+
+def report(results: dict[str, dict[str, tuple[Measurement, Difference]]], reference: str) -> str:
+    lines = [
+        f"{'table':26} {'backend':16} {'rows':>7} {'seconds':>8} {'rows/s':>10} {'MB/s':>7} {'peak MB':>8}"
+        f"  differences with {reference}"
+    ]
+    for table, backends in results.items():
+        for backend, (measurement, difference) in backends.items():
+            peak = f"{measurement.peak_bytes / 1e6:8.1f}" if measurement.peak_bytes is not None else f"{'?':>8}"
+            if measurement.error is not None:
+                verdict = f"failed: {measurement.error}"
+            elif difference.count:
+                example = (difference.missing or difference.extra)[0]
+                verdict = f"{len(difference.missing)} missing, {len(difference.extra)} extra, e.g. {example}"
+            else:
+                verdict = "same rows" if difference.same_order else "same rows, other order"
+            lines.append(
+                f"{table:26} {backend:16} {len(measurement.rows):7} {measurement.seconds:8.3f} "
+                f"{measurement.rows_per_second:10.0f} {measurement.bytes_per_second / 1e6:7.1f} {peak}  {verdict}"
+            )
+        lines.append(f"{table:26} fastest matching backend: {fastest_matching(backends)}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compares the HTML parser backends on exports")
+    parser.add_argument("archives", nargs="+", help="zip files, every zip file is an export")
+    parser.add_argument("--split", action="store_true", help="the zip files are the parts of one export")
+    parser.add_argument("--tables", nargs="*", help="tables to run (default: all)")
+    parser.add_argument("--backends", nargs="*", choices=list(BACKENDS), help="backends to run (default: all)")
+    parser.add_argument(
+        "--reference", default="lxml", choices=list(BACKENDS), help="backend the others are compared with"
+    )
+    args = parser.parse_args(argv)
+
+    exports = [args.archives] if args.split else [[path] for path in args.archives]
+    for paths in exports:
+        print(f"== {', '.join(paths)}")
+        print(report(run(paths, args.tables, args.backends, args.reference), args.reference))
+
+
+if __name__ == "__main__":
+    main()
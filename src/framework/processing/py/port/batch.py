@@ -0,0 +1,419 @@
+"""
+Offline batch extraction of donated exports, for reprocessing them when an extractor changes
+
+    python -m port.batch exports/ out/ [--workers 8] [--format csv|parquet] [--tables followers likes]
+
+Every zip file in the input directory is an export, and so is every subdirectory with zip files
+(the parts of a split export, see port.archive.ArchiveSession). The exports are extracted
+by a pool of processes with port.extraction.extract_all, the same extraction as in the browser.
+
+Every table is written partitioned by table and export, so exports can be added or redone one by one:
+
+    out/<table>/archive=<export>.csv           the rows, with the name of the export in the column "archive"
+    out/_provenance/archive=<export>.json      where the rows came from: the zip files, the profile
+                                               of the export, the row counts and the time it took
+
+    out/_manifest.jsonl                        what has been extracted, see Manifest
+
+Files are written under a temporary name and renamed when complete.
+The workers write the tables themselves, only a short summary goes back to the main process,
+so the throughput grows with the number of workers up to the number of cores.
+
+Runs resume: an export is identified by the fingerprint of its central directory
+(port.archive.ArchiveIndex.fingerprint), and the manifest records per fingerprint which tables
+were written, with the version of their extractor (port.extraction.VERSIONS). A run skips the exports
+that are done, exports that are the same as another export (uploaded twice), and only redoes the tables
+whose version changed. Use --force to redo everything.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+
+import pandas as pd
+
+import port.extraction as extraction
+from port.archive import ArchiveSession
+from port.archive_profile import profile_archive
+
+
+FORMATS = {
+    'csv': '.csv',
+    # Needs pyarrow, which the browser does not load
+    'parquet': '.parquet',
+}
+
+PROVENANCE_DIRECTORY = '_provenance'
+
+MANIFEST_FILE = '_manifest.jsonl'
+
+
+@dataclass
+class Export:
+    """
+    One export in the input directory: its name and its zip file(s)
+    """
+
+    name: str
+    paths: list[str]
+    fingerprint: str | None = None
+
+
+@dataclass
+class Result:
+    """
+    What a worker did with one export
+    """
+
+    name: str
+    seconds: float = 0.0
+    rows: dict[str, int] = field(default_factory=dict)
+    error: str | None = None
+    # The export that has the same fingerprint, when this one was skipped as a duplicate
+    duplicate_of: str | None = None
+    skipped: bool = False
+
+
+class Manifest:
+    """
+    What has been extracted to an output directory, by export fingerprint
+
+    The manifest is a JSON lines file, a line is appended when an export is done:
+
+        {"fingerprint": ..., "archive": <export>, "files": [...], "format": "csv", "extracted_at": ...,
+         "tables": {<table>: {"version": 1, "rows": 10, "path": "<table>/archive=<export>.csv", "timestamps": "text"}}}
+
+    Only the main process writes it, after the worker finished writing the tables, so a line means
+    the tables in it are complete. A later line for the same fingerprint updates its tables.
+    A run that dies while appending leaves an incomplete last line, which is ignored.
+    """
+
+    def __init__(self, output: str):
+        self.path = os.path.join(output, MANIFEST_FILE)
+        self.entries: dict[str, dict] = {}
+        self._torn = False
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    self._torn = not line.endswith('\n')
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self._merge(entry)
+
+    def _merge(self, entry: dict) -> None:
+        known = self.entries.get(entry['fingerprint'])
+        if known is None or known['archive'] != entry['archive']:
+            self.entries[entry['fingerprint']] = entry
+        else:
+            known['tables'].update(entry['tables'])
+
+    def get(self, fingerprint: str) -> dict | None:
+        return self.entries.get(fingerprint)
+
+    def stale(self, fingerprint: str, names: list[str], format: str, timestamps: str = 'text') -> list[str]:
+        """
+        The tables in names that have not been written for the fingerprint in this format
+        and with these timestamps, with the current version of their extractor
+        """
+        entry = self.entries.get(fingerprint)
+        if entry is None:
+            return list(names)
+        tables = entry['tables']
+        return [
+            name for name in names
+            if name not in tables
+            or tables[name]['version'] != extraction.VERSIONS[name]
+            or tables[name]['path'] != table_path('', name, entry['archive'], format)
+            or tables[name].get('timestamps', 'text') != timestamps
+        ]
+
+    def add(self, export: Export, result: Result, format: str, timestamps: str = 'text') -> None:
+        """
+        Records the tables a worker wrote for an export
+        """
+        entry = {
+            'fingerprint': export.fingerprint,
+            'archive': export.name,
+            'files': [os.path.abspath(path) for path in export.paths],
+            'format': format,
+            'extracted_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'tables': {
+                table: {
+                    'version': extraction.VERSIONS[table],
+                    'rows': rows,
+                    'path': table_path('', table, export.name, format),
+                    'timestamps': timestamps,
+                }
+                for table, rows in result.rows.items()
+            },
+        }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            if self._torn:
+                f.write('\n')
+                self._torn = False
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._merge(entry)
+
+
+def find_exports(directory: str) -> list[Export]:
+    """
+    The exports in a directory, by name: zip files, and subdirectories that hold the zip files of a split export
+    """
+    exports = []
+    for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+        if entry.is_file() and entry.name.lower().endswith('.zip'):
+            exports.append(Export(entry.name[:-4], [entry.path]))
+        elif entry.is_dir():
+            parts = sorted(
+                part.path for part in os.scandir(entry.path)
+                if part.is_file() and part.name.lower().endswith('.zip')
+            )
+            if parts:
+                exports.append(Export(entry.name, parts))
+    return exports
+
+
+def fingerprint_export(export: Export) -> str:
+    """
+    The fingerprint of the central directory of an export, the same for all copies of it
+    """
+    with ArchiveSession(export.paths) as archive:
+        return archive.index.fingerprint()
+
+
+def table_path(output: str, table: str, export: str, format: str) -> str:
+    return os.path.join(output, table, f"archive={export}{FORMATS[format]}")
+
+
+def provenance_path(output: str, export: str) -> str:
+    return os.path.join(output, PROVENANCE_DIRECTORY, f"archive={export}.json")
+
+
+def _write_table(df: pd.DataFrame, path: str, format: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.tmp"
+    if format == 'parquet':
+        df.to_parquet(temporary, index=False)
+    else:
+        df.to_csv(temporary, index=False)
+    os.replace(temporary, path)
+
+
+def _write_json(data: dict, path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(temporary, path)
+
+
+def process_export(
+    export: Export,
+    output: str,
+    format: str = 'csv',
+    names: list[str] | None = None,
+    backend: str = extraction.DEFAULT_BACKEND,
+    timestamps: str = 'text',
+) -> Result:
+    """
+    Extracts the tables in names (all tables by default) of one export and writes them to output, runs in a worker
+    """
+    result = Result(export.name)
+    start = time.perf_counter()
+    try:
+        with ArchiveSession(export.paths) as archive:
+            profile = profile_archive(archive)
+            tables = extraction.extract_all(archive, profile, backend=backend, names=names, timestamps=timestamps)
+
+        for table, df in tables.items():
+            df = df.copy()
+            df.insert(0, 'archive', export.name)
+            _write_table(df, table_path(output, table, export.name, format), format)
+            result.rows[table] = len(df)
+        result.seconds = time.perf_counter() - start
+
+        # A run that redoes some tables keeps the row counts of the others
+        path = provenance_path(output, export.name)
+        rows = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                rows = json.load(f).get('rows', {})
+        rows.update(result.rows)
+
+        _write_json({
+            'archive': export.name,
+            'fingerprint': export.fingerprint,
+            'files': [
+                {'path': os.path.abspath(path), 'bytes': os.path.getsize(path), 'modified': os.path.getmtime(path)}
+                for path in export.paths
+            ],
+            'profile': asdict(profile),
+            'backend': backend,
+            'timestamps': timestamps,
+            'format': format,
+            'rows': rows,
+            'versions': {table: extraction.VERSIONS[table] for table in rows},
+            'seconds': round(result.seconds, 3),
+            'extracted_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        }, path)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        result.seconds = time.perf_counter() - start
+    return result
+
+
+def plan(
+    exports: list[Export],
+    manifest: Manifest,
+    format: str = 'csv',
+    names: list[str] | None = None,
+    force: bool = False,
+    timestamps: str = 'text',
+) -> tuple[list[tuple[Export, list[str]]], list[Result]]:
+    """
+    Fingerprints the exports and decides what to extract
+
+    Returns the exports to extract with the tables to extract of each, and a result for every export
+    that is skipped: done already, a duplicate of another export, or its fingerprint failed.
+    With force, the manifest is ignored and all tables of all exports are extracted.
+    """
+    if names is None:
+        names = list(extraction.VERSIONS)
+
+    todo = []
+    skipped = []
+    seen: dict[str, str] = {}
+    for export in exports:
+        try:
+            export.fingerprint = fingerprint_export(export)
+        except Exception as e:
+            skipped.append(Result(export.name, error=f"{type(e).__name__}: {e}"))
+            continue
+        if force:
+            todo.append((export, list(names)))
+            continue
+
+        entry = manifest.get(export.fingerprint)
+        original = seen.get(export.fingerprint) or (entry['archive'] if entry else export.name)
+        if original != export.name:
+            skipped.append(Result(export.name, duplicate_of=original, skipped=True))
+            continue
+        seen[export.fingerprint] = export.name
+
+        stale = manifest.stale(export.fingerprint, names, format, timestamps)
+        if stale:
+            todo.append((export, stale))
+        else:
+            skipped.append(Result(export.name, skipped=True))
+    return todo, skipped
+
+
+def _status(result: Result) -> str:
+    if result.error:
+        return f"failed: {result.error}"
+    if result.duplicate_of:
+        return f"skipped, same as {result.duplicate_of}"
+    if result.skipped:
+        return "skipped, done"
+    return f"{sum(result.rows.values())} rows"
+
+
+def run(
+    exports: list[Export],
+    output: str,
+    workers: int | None = None,
+    format: str = 'csv',
+    names: list[str] | None = None,
+    backend: str = extraction.DEFAULT_BACKEND,
+    max_tasks_per_child: int | None = None,
+    force: bool = False,
+    timestamps: str = 'text',
+) -> list[Result]:
+    """
+    Extracts the exports with a pool of worker processes (one per core by default), returns the results as they complete
+
+    The manifest in output is read to skip what is done (see plan) and extended as exports complete.
+    """
+    manifest = Manifest(output)
+    todo, results = plan(exports, manifest, format, names, force, timestamps)
+    for result in results:
+        print(f"{result.name}: {_status(result)}", file=sys.stderr)
+    if not todo:
+        return results
+
+    workers = min(workers or os.cpu_count() or 1, len(todo))
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=max_tasks_per_child) as pool:
+        futures = {
+            pool.submit(process_export, export, output, format, tables, backend, timestamps): export
+            for export, tables in todo
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results.append(result)
+            if not result.error:
+                manifest.add(futures[future], result, format, timestamps)
+            print(f"[{done}/{len(todo)}] {result.name}: {_status(result)} in {result.seconds:.2f}s", file=sys.stderr)
+    seconds = time.perf_counter() - start
+    print(
+        f"{len(todo)} exports in {seconds:.1f}s with {workers} workers ({len(todo) / seconds:.2f} exports/s)",
+        file=sys.stderr,
+    )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Extracts the tables of all exports in a directory")
+    parser.add_argument(
+        "input", help="directory with the exports (zip files, or directories with the zip files of one export)"
+    )
+    parser.add_argument("output", help="directory the tables are written to")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="number of worker processes (default: number of cores)"
+    )
+    parser.add_argument("--format", choices=list(FORMATS), default='csv', help="file format of the tables")
+    parser.add_argument("--tables", nargs="*", choices=list(extraction.VERSIONS), help="tables to write (default: all)")
+    parser.add_argument(
+        "--backend", choices=list(extraction.BACKENDS), default=extraction.DEFAULT_BACKEND,
+        help="parser backend for HTML exports",
+    )
+    parser.add_argument(
+        "--max-tasks-per-child", type=int, default=None,
+        help="replace a worker after this many exports, to return its memory",
+    )
+    parser.add_argument(
+        "--timestamps", choices=['text', 'datetime'], default='text',
+        help="write timestamps as in the export, or as UTC date times",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="extract everything again, ignoring the manifest of earlier runs"
+    )
+    args = parser.parse_args(argv)
+
+    if args.format == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("--format parquet needs pyarrow")
+
+    results = run(
+        find_exports(args.input), args.output, args.workers, args.format, args.tables, args.backend,
+        args.max_tasks_per_child, args.force, args.timestamps,
+    )
+    failed = [result for result in results if result.error]
+    for result in failed:
+        print(f"{result.name}: {result.error}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
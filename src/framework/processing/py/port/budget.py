@@ -0,0 +1,125 @@
+"""
+Time and row budgets of an extraction
+
+One pathological member (a huge inbox) should not keep the participant waiting for everything.
+A Budget limits the seconds and rows spent on every table, and the seconds of the whole extraction.
+A table whose budget runs out stops cleanly: the engines skip its remaining members and stop
+reading the member they are in, and the table keeps the rows it has so far.
+
+port.extraction.extract_all_stages meters every table it extracts (see Budget.meters) and flags
+a table that was cut short in df.attrs["truncated"] (see Meter.truncation):
+
+    {"reason": "time", "members_read": 12, "members_total": 30, "coverage": 0.4, "rows": 18000}
+
+coverage is the share of the members of the table that was read, the first 40% of the conversations
+of the inbox. The consent form shows it, and it is donated with the tables (see port.consent).
+"""
+
+import time
+from dataclasses import dataclass, field
+
+
+# The attrs key of a truncated table
+TRUNCATED = 'truncated'
+
+# Rows between two looks at the clock while a member is read
+CLOCK_ROWS = 256
+
+
+@dataclass(frozen=True)
+class Limits:
+    """
+    Seconds and rows a table may take, None is no limit
+    """
+    seconds: float | None = None
+    rows: int | None = None
+
+
+@dataclass
+class Budget:
+    """
+    The limits of an extraction
+
+    Attributes:
+        table: the limits of every table
+        tables: table name -> the limits of that table, instead of table
+        session_seconds: the seconds of the whole extraction, the tables that are not done then are cut short
+    """
+    table: Limits = Limits()
+    tables: dict[str, Limits] = field(default_factory=dict)
+    session_seconds: float | None = None
+
+    def limits(self, name: str) -> Limits:
+        return self.tables.get(name, self.table)
+
+    def meters(self, names: list[str]) -> dict[str, "Meter"]:
+        """
+        A Meter for every table, the session starts now
+        """
+        deadline = None if self.session_seconds is None else time.perf_counter() + self.session_seconds
+        return {name: Meter(self.limits(name), deadline) for name in names}
+
+
+class Meter:
+    """
+    What one table has spent of its limits; reason says why it was cut short (None while it is not)
+    """
+
+    def __init__(self, limits: Limits, deadline: float | None = None):
+        self.limits = limits
+        self.deadline = deadline
+        self.seconds = 0.0
+        self.rows = 0
+        self.members_total = 0
+        self.members_read = 0
+        self.reason: str | None = None
+
+    def _check(self, now: float, running: float = 0.0) -> bool:
+        if self.reason is None:
+            if self.limits.rows is not None and self.rows >= self.limits.rows:
+                self.reason = 'rows'
+            elif self.limits.seconds is not None and self.seconds + running >= self.limits.seconds:
+                self.reason = 'time'
+            elif self.deadline is not None and now >= self.deadline:
+                self.reason = 'session'
+        return self.reason is not None
+
+    def exhausted(self) -> bool:
+        """
+        Whether the table is out of budget, checked before a member is read
+        """
+        return self._check(time.perf_counter())
+
+    def add_rows(self, rows: int, started: float) -> bool:
+        """
+        Counts rows taken from a member whose reading started at started, returns whether to stop
+        """
+        self.rows += rows
+        if self.limits.rows is not None and self.rows >= self.limits.rows:
+            return self._check(time.perf_counter())
+        if self.rows % CLOCK_ROWS < rows:
+            now = time.perf_counter()
+            return self._check(now, now - started)
+        return self.reason is not None
+
+    def add_member(self, seconds: float) -> None:
+        """
+        Counts a member that has been read
+        """
+        self.seconds += seconds
+        self.members_read += 1
+
+    def truncation(self) -> dict | None:
+        """
+        How the table was cut short, None if it was not
+        """
+        if self.reason is None:
+            return None
+        coverage = self.members_read / self.members_total if self.members_total else 1.0
+        return {
+            'reason': self.reason,
+            'members_read': self.members_read,
+            'members_total': self.members_total,
+            'coverage': round(coverage, 3),
+            'rows': self.rows,
+        }
@@ -0,0 +1,180 @@
+"""
+Class-token selectors for the HTML export
+
+Almost every lookup in the export is "the elements with these classes", written in xpath
+as //div[contains(@class, '...')]. Every such query scans the whole (sub)tree and compares
+strings, and it also matches superstrings ('_a6-p' matches '_a6-pq').
+
+ClassIndex tokenizes the class attributes of a tree once and answers class queries
+with dictionary and set lookups. In a document index, the matches of a query are
+also assigned to the records that contain them, so per-record lookups do not
+scan the record subtree again. Matching is on whole tokens.
+"""
+
+from collections import defaultdict
+from typing import Iterable
+
+from lxml import etree
+
+
+# For an element without children both give its text, no need to evaluate the xpath
+_TEXT_PATHS = ("text()", ".//text()")
+
+
+class ClassSelector:
+    """
+    Elements with tag that carry all class tokens of classes
+
+    Token based equivalent of .//tag[contains(@class, 'classes')], optionally followed by
+    an xpath (then) that is applied to every matched element, the results are concatenated.
+    Queries are answered by a ClassIndex, the compiled xpath gives the same results
+    for a single record (while streaming there is no document to index).
+
+    Args:
+        tag: tag name of the elements, for example 'td'
+        classes: space separated class tokens, for example '_2pin _2piu _a6_r'
+        then: xpath relative to the matched elements, for example './/text()',
+            None returns the matched elements themselves
+        first_of_type: only the first match among its siblings counts,
+            like the [1] in .//td[contains(@class, '...')][1]
+    """
+
+    def __init__(self, tag: str, classes: str, then: str | None = None, first_of_type: bool = False):
+        self.tag = tag
+        self.classes = classes
+        self.tokens = frozenset(classes.split())
+        if not self.tokens:
+            raise ValueError(f"No classes to select {tag} elements by")
+        self.then = etree.XPath(then, smart_strings=False) if then is not None else None
+        self._text_only = then in _TEXT_PATHS
+
+        # The same query as a relative xpath, for records that are not in an indexed document
+        condition = " and ".join(
+            f"contains(concat(' ', normalize-space(@class), ' '), ' {token} ')" for token in sorted(self.tokens)
+        )
+        path = f".//{tag}[{condition}]" + ("[1]" if first_of_type else "")
+        if then is not None:
+            path += f"/{then}"
+        self.xpath = etree.XPath(path, smart_strings=False)
+        self.first_of_type = first_of_type
+
+    def __repr__(self) -> str:
+        return f"ClassSelector({self.tag!r}, {self.classes!r})"
+
+    def matches(self, element: etree._Element) -> bool:
+        if element.tag != self.tag:
+            return False
+        attribute = element.get("class")
+        return attribute is not None and self.tokens.issubset(attribute.split())
+
+    def _keep(self, element: etree._Element) -> bool:
+        return not any(self.matches(sibling) for sibling in element.itersiblings(self.tag, preceding=True))
+
+    def results(self, elements: Iterable[etree._Element]) -> list:
+        """
+        Applies first_of_type and then to the matched elements
+        """
+        if self.first_of_type:
+            elements = [element for element in elements if self._keep(element)]
+        if self.then is None:
+            return list(elements)
+        results = []
+        for element in elements:
+            if self._text_only and len(element) == 0:
+                if element.text:
+                    results.append(element.text)
+            else:
+                results.extend(self.then(element))
+        return results
+
+
+class ClassIndex:
+    """
+    class token -> elements of a tree, built in one pass
+
+    Elements are grouped by their class attribute, a page only uses a handful of
+    different class attributes. Every attribute is tokenized once, a query for a set
+    of tokens is an intersection of the attributes that carry each token.
+
+    assign tells the index which elements are the records of the document:
+    select_within then answers from a mapping record -> matches that is computed
+    once per selector, a match belongs to the closest record that contains it.
+    """
+
+    def __init__(self, root: etree._Element):
+        self.root = root
+        # root.iter() is a plain walk, an xpath would also sort its results in document order
+        self._by_attribute = {}
+        for element in root.iter():
+            attribute = element.get("class")
+            if attribute is not None:
+                elements = self._by_attribute.get(attribute)
+                if elements is None:
+                    self._by_attribute[attribute] = [element]
+                else:
+                    elements.append(element)
+        self._by_token = defaultdict(set)
+        for attribute in self._by_attribute:
+            for token in attribute.split():
+                self._by_token[token].add(attribute)
+
+        self._selected = {}
+        self._records = set()
+        self._within = {}
+
+    def assign(self, records: Iterable[etree._Element]) -> None:
+        """
+        Sets the record containers of the document
+        """
+        self._records = set(records)
+        self._within = {}
+
+    def _attributes(self, selector: ClassSelector) -> set[str]:
+        return set.intersection(*(self._by_token.get(token, set()) for token in selector.tokens))
+
+    def _with_attributes(self, tag: str, attributes: set[str]) -> list[etree._Element]:
+        if len(attributes) == 1:
+            candidates = self._by_attribute[next(iter(attributes))]
+        elif attributes:
+            candidates = [element for element in self.root.iter() if element.get("class") in attributes]
+        else:
+            candidates = []
+        return [element for element in candidates if element.tag == tag]
+
+    def select(self, selector: ClassSelector) -> list[etree._Element]:
+        """
+        All elements matched by selector, in document order
+        """
+        selected = self._selected.get(selector)
+        if selected is None:
+            selected = self._with_attributes(selector.tag, self._attributes(selector))
+            self._selected[selector] = selected
+        return selected
+
+    def select_any(self, selectors: Iterable[ClassSelector]) -> list[etree._Element]:
+        """
+        All elements matched by any of selectors (with the same tag), in document order
+        """
+        selectors = list(selectors)
+        if len(selectors) == 1:
+            return self.select(selectors[0])
+        tags = {selector.tag for selector in selectors}
+        if len(tags) != 1:
+            raise ValueError(f"Selectors {selectors} do not select the same tag")
+        return self._with_attributes(tags.pop(), set().union(*(self._attributes(selector) for selector in selectors)))
+
+    def select_within(self, record: etree._Element, selector: ClassSelector) -> list:
+        """
+        The results of selector below record (one of the assigned records)
+        """
+        grouped = self._within.get(selector)
+        if grouped is None:
+            grouped = defaultdict(list)
+            for element in self.select(selector):
+                parent = element.getparent()
+                while parent is not None and parent not in self._records:
+                    parent = parent.getparent()
+                if parent is not None:
+                    grouped[parent].append(element)
+            self._within[selector] = grouped
+        return selector.results(grouped.get(record, ()))
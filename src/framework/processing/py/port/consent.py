@@ -0,0 +1,152 @@
+"""
+Paginated consent tables, and the donation of what the participant consented to
+
+The consent form gets the first page of every table (see PropsUIPromptConsentFormTable.page_size),
+the tables themselves stay here until the donation. When the participant wants to see more rows
+of a table, the form resolves the consent page with a PayloadTablePageRequest
+
+    {"__type__": "PayloadTablePageRequest", "value": {"table_id": "...", "offset": 100, "limit": 500}}
+
+and script.process answers with a CommandUITablePage (table_page) while the page stays on screen.
+
+The form has loaded only some rows of a table, so a search of a paginated table is done here,
+in the whole table: the form sends a PayloadTableSearch
+
+    {"__type__": "PayloadTableSearch", "value": {"table_id": "...", "query": "alice", "limit": 500}}
+
+and gets a CommandUITableSearch (table_search) with all matching row ids, and the first matching rows.
+Deleting all matches of a search deletes the rows that were never loaded as well.
+
+The rows of a table are referred to by their row number (the index of the extracted tables,
+port.extraction.ROW_ID). When the participant donates, the form only sends the rows they deleted,
+as half-open ranges of row numbers per table, and the meta tables it holds, in a PayloadConsentEdits:
+
+    {"__type__": "PayloadConsentEdits", "value": "{\"deleted\": {\"zip_contents_0\": [[3, 5], [9, 10]]}, \"meta\": []}"}
+
+donation_entries builds the donation from the tables here, without the deleted rows.
+The tables that were cut short on their extraction budget are listed in the donation (see port.budget).
+"""
+
+import json
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+import port.api.columnar as columnar
+from port.api.commands import CommandUITablePage, CommandUITableSearch
+from port.budget import TRUNCATED
+
+
+# Rows of a consent table sent at once
+PAGE_SIZE = 500
+
+# Rows of a table turned into records for the donation at once
+RECORD_ROWS = 10_000
+
+
+def _field(value, name: str):
+    # The payload is a dict, or a proxy of a JavaScript object in the browser worker
+    return value[name] if isinstance(value, dict) else getattr(value, name)
+
+
+def table_page(tables: dict[str, pd.DataFrame], request) -> CommandUITablePage:
+    """
+    The rows of a table (table id -> DataFrame) asked for by a PayloadTablePageRequest
+    """
+    table_id = str(_field(request, "table_id"))
+    offset = max(0, int(_field(request, "offset")))
+    limit = max(0, int(_field(request, "limit")))
+    df = tables.get(table_id)
+    if df is None:
+        print(f"Page of unknown consent table {table_id} requested")
+        return CommandUITablePage(table_id, offset, pd.DataFrame(), 0)
+    return CommandUITablePage(table_id, offset, df.iloc[offset:offset + limit], len(df))
+
+
+def row_ranges(row_ids: np.ndarray) -> list[list[int]]:
+    """
+    Sorted row numbers as half-open ranges: [3, 4, 9] -> [[3, 5], [9, 10]]
+    """
+    if len(row_ids) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(row_ids) != 1) + 1
+    starts = np.concatenate(([row_ids[0]], row_ids[breaks]))
+    ends = np.concatenate((row_ids[breaks - 1], [row_ids[-1]])) + 1
+    return [[int(start), int(end)] for start, end in zip(starts, ends)]
+
+
+def table_search(tables: dict[str, pd.DataFrame], request, texts: dict | None = None) -> CommandUITableSearch:
+    """
+    The rows of a table (table id -> DataFrame) that match a PayloadTableSearch: a cell contains
+    the query, ignoring case, in the text the consent form shows (see port.api.columnar.column_cells)
+
+    texts keeps the lower case text of the cells of the tables searched before (table id -> columns),
+    so a participant who types a search does not have every table decoded again.
+    """
+    table_id = str(_field(request, "table_id"))
+    query = str(_field(request, "query"))
+    limit = max(0, int(_field(request, "limit")))
+    df = tables.get(table_id)
+    if df is None:
+        print(f"Search in unknown consent table {table_id} requested")
+        return CommandUITableSearch(table_id, query, pd.DataFrame(), [], [], 0)
+
+    if texts is None:
+        texts = {}
+    if table_id not in texts:
+        texts[table_id] = [pd.Series(cells, dtype=object).str.lower() for _, cells in columnar.column_cells(df)]
+    mask = np.zeros(len(df), dtype=bool)
+    needle = query.strip().lower()
+    if needle:
+        for cells in texts[table_id]:
+            mask |= cells.str.contains(needle, regex=False).to_numpy(dtype=bool)
+    row_ids = np.flatnonzero(mask)
+    first = row_ids[:limit]
+    return CommandUITableSearch(
+        table_id, query, df.iloc[first], [int(row_id) for row_id in first], row_ranges(row_ids), len(row_ids)
+    )
+
+
+def deleted_mask(ranges: list, length: int) -> np.ndarray:
+    """
+    The rows of a table of length rows in the half-open ranges [start, end) of row numbers
+    """
+    mask = np.zeros(length, dtype=bool)
+    for start, end in ranges:
+        mask[max(0, int(start)):max(0, int(end))] = True
+    return mask
+
+
+def _records(df: pd.DataFrame) -> Iterator[dict[str, str]]:
+    for start in range(0, len(df), RECORD_ROWS):
+        yield from columnar.to_records(df.iloc[start:start + RECORD_ROWS])
+
+
+def donation_entries(json_string: str, tables: dict[str, pd.DataFrame]) -> list[dict]:
+    """
+    The entries of the donation (see port.donation) of the tables (table id -> DataFrame)
+    without the rows deleted in the consent edits
+
+    The rows of a table are produced when the donation is written, a slice of the table at a time.
+    """
+    edits = json.loads(json_string)
+    deleted = edits.get("deleted", {})
+
+    entries = []
+    omissions = []
+    truncated = {}
+    for table_id, df in tables.items():
+        if df.attrs.get(TRUNCATED):
+            truncated[table_id] = df.attrs[TRUNCATED]
+        mask = deleted_mask(deleted.get(table_id, []), len(df))
+        count = int(mask.sum())
+        if count:
+            df = df[~mask]
+            omissions.append(f"User deleted {count} rows from table: {table_id}")
+        entries.append({table_id: _records(df)})
+    entries.extend(edits.get("meta", []))
+    entries.append({"user_omissions": json.dumps(omissions)})
+    if truncated:
+        entries.append({"truncated_tables": json.dumps(truncated)})
+    return entries
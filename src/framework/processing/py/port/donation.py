@@ -0,0 +1,159 @@
+"""
+Donation of the consented tables in compressed chunks
+
+A donation is a list of entries, one per table and one per piece of meta data:
+
+    [{"zip_contents_0": [{"type": "...", ...}, ...]}, ..., {"user_omissions": "[...]"}]
+
+and used to be sent as one CommandSystemDonate with the whole list as a JSON string,
+written by JSON.stringify in the consent form. The JSON written here is the same, byte for byte.
+For heavy donors that string is tens of megabytes, built in one piece and sent in one message.
+donation_commands writes the JSON of the entries row by row instead. A donation of at most
+SINGLE_MESSAGE_BYTES is still sent as one CommandSystemDonate. A larger donation is sent as
+a CommandSystemDonateChunk per CHUNK_BYTES of JSON, gzip compressed and base64 encoded:
+
+    {"__type__": "CommandSystemDonateChunk", "key": "...", "sequence": 0, "entry": 0, "table_id": "zip_contents_0",
+     "data": "<base64 of gzip>", "size": 1048576, "checksum": "<sha256 of the JSON of the chunk>"}
+
+followed by a CommandSystemDonateManifest with the table id of every entry, in order, and the entry, size
+and checksum of every chunk. Chunks belong to an entry by its position: entries can share an id
+(meta tables, user_omissions). The JSON of the chunks of an entry, in sequence order, is the JSON
+of its value, so the receiver rebuilds the donation as [{tables[entry]: JSON.parse(text of its chunks)}, ...]
+and can tell a missing or damaged chunk from the manifest.
+
+Hosts that do not read chunks get the donation as one CommandSystemDonate: the live bridge
+reassembles the chunks unless the host asks for them (see src/live_bridge.ts).
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+from typing import Iterable, Iterator
+
+from port.api.commands import CommandSystemDonate, CommandSystemDonateChunk, CommandSystemDonateManifest
+
+
+# Donations up to this size are sent as one CommandSystemDonate, as before
+SINGLE_MESSAGE_BYTES = 1024 * 1024
+
+# JSON per chunk, before compression
+CHUNK_BYTES = 1024 * 1024
+
+
+def _dumps(value) -> str:
+    # The notation of JSON.stringify
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _pieces(entries: Iterable[dict]) -> Iterator[tuple[int, str, str]]:
+    """
+    (entry number, table id, JSON text) of the entries, the JSON of a list value a row at a time
+    """
+    number = 0
+    for entry in entries:
+        for table_id, value in entry.items():
+            if isinstance(value, (str, dict)) or value is None:
+                yield number, table_id, _dumps(value)
+            else:
+                separator = "["
+                for row in value:
+                    yield number, table_id, separator + _dumps(row)
+                    separator = ","
+                yield number, table_id, "[]" if separator == "[" else "]"
+            number += 1
+
+
+def _chunks(pieces: Iterable[tuple[int, str, str]], size: int) -> Iterator[tuple[int, str, bytes]]:
+    """
+    (entry number, table id, UTF-8 JSON) of at most about size bytes, a chunk holds the JSON of one entry
+    """
+    current = None
+    buffer: list[bytes] = []
+    length = 0
+    for number, table_id, text in pieces:
+        if buffer and (number != current[0] or length >= size):
+            yield current[0], current[1], b"".join(buffer)
+            buffer, length = [], 0
+        current = number, table_id
+        data = text.encode("utf-8")
+        buffer.append(data)
+        length += len(data)
+    if buffer:
+        yield current[0], current[1], b"".join(buffer)
+
+
+def donation_commands(
+    key: str, entries: Iterable[dict], single_message_bytes: int = SINGLE_MESSAGE_BYTES, chunk_bytes: int = CHUNK_BYTES
+) -> Iterator:
+    """
+    The commands that donate the entries under key, see the module docstring
+    """
+    pieces = _pieces(entries)
+    head: list[tuple[int, str, str]] = []
+    length = 0
+    for piece in pieces:
+        head.append(piece)
+        length += len(piece[2])
+        if length > single_message_bytes:
+            break
+    else:
+        yield CommandSystemDonate(key, _single_message(head))
+        return
+
+    def remaining():
+        yield from head
+        yield from pieces
+
+    tables: list[str] = []
+    chunks = []
+    for sequence, (entry, table_id, data) in enumerate(_chunks(remaining(), chunk_bytes)):
+        if entry == len(tables):
+            tables.append(table_id)
+        checksum = hashlib.sha256(data).hexdigest()
+        chunks.append({
+            "sequence": sequence, "entry": entry, "table_id": table_id, "size": len(data), "checksum": checksum,
+        })
+        encoded = base64.b64encode(gzip.compress(data, compresslevel=6)).decode("ascii")
+        yield CommandSystemDonateChunk(key, sequence, entry, table_id, encoded, len(data), checksum)
+    yield CommandSystemDonateManifest(key, tables, chunks)
+
+
+def _single_message(pieces: list[tuple[int, str, str]]) -> str:
+    """
+    The JSON string of a donation as one list of entries
+    """
+    entries = []
+    for number, table_id, text in pieces:
+        if number == len(entries):
+            entries.append([f"{{{_dumps(table_id)}:"])
+        entries[-1].append(text)
+    return "[" + ",".join("".join(entry) + "}" for entry in entries) + "]"
+
+
+def reassemble(commands: Iterable) -> str:
+    """
+    The donation of a CommandSystemDonate, or of the chunks and manifest of a chunked donation,
+    as one JSON string, checking the chunks against the manifest (for tests and offline tools)
+    """
+    chunks = {}
+    for command in commands:
+        if isinstance(command, CommandSystemDonate):
+            return command.json_string
+        if isinstance(command, CommandSystemDonateChunk):
+            chunks[command.sequence] = command
+            continue
+        entries = [[] for _ in command.tables]
+        for chunk in command.chunks:
+            received = chunks.get(chunk["sequence"])
+            if received is None:
+                raise ValueError(f"Chunk {chunk['sequence']} of donation {command.key} is missing")
+            data = gzip.decompress(base64.b64decode(received.data))
+            if hashlib.sha256(data).hexdigest() != chunk["checksum"] or received.entry != chunk["entry"]:
+                raise ValueError(f"Chunk {chunk['sequence']} of donation {command.key} is damaged")
+            entries[chunk["entry"]].append(data)
+        return "[" + ",".join(
+            f"{{{_dumps(table_id)}:{b''.join(parts).decode('utf-8')}}}"
+            for table_id, parts in zip(command.tables, entries)
+        ) + "]"
+    raise ValueError("The donation has no manifest")
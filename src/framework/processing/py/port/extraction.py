@@ -0,0 +1,313 @@
+"""
+Extraction of all tables of an export, in whatever format the donor chose
+
+The archive is profiled first (see port.archive_profile), then the extractors of its format
+run with the labels of its language: the HTML extractors or the JSON extractors
+(port.extraction_insta). Both produce the same tables.
+
+The HTML export can be parsed by several backends (see BACKENDS), chosen for all tables
+or per table. port.backend_harness compares them on real archives.
+
+Timestamps are text in the notation of the HTML export, or datetime64 with timestamps="datetime"
+(see port.timestamps).
+
+extract_all_stages extracts in stages, it yields the Progress of the extraction after every member
+it has read (see port.progress), so the caller can show it. With a Budget it cuts tables that take
+too long short, and flags them (see port.budget).
+
+The rows of every table are numbered from 0 in the index (ROW_ID). The consent form refers to rows
+by these numbers, so the deletions of the participant are applied to the tables here (see port.consent).
+"""
+
+from typing import Callable, Generator
+
+import pandas as pd
+
+import port.extraction_insta as extraction_insta_json
+import port.extraction_insta_html as extraction_insta_html_bs4
+import port.extraction_insta_html_lxml as extraction_insta_html
+from port.archive import ArchiveSession, open_archive
+from port.archive_profile import ArchiveProfile, profile_archive
+from port.budget import TRUNCATED, Budget, Meter
+from port.extraction_cache import ResultCache, member_key
+from port.progress import MemberDone, Progress, run_stages
+from port.schema import apply_schemas, intern_accounts
+from port.timestamps import normalize_timestamps
+
+
+# Parser backends for the HTML export: name -> extracts the tables in names from an opened archive
+BACKENDS: dict[str, Callable[[ArchiveSession, list[str], bool | None], dict[str, pd.DataFrame]]] = {
+    # The spec engine, with the byte scanner for the uniform pages (see port.html_scanner)
+    'scan': lambda archive, names, stream: extraction_insta_html.extract_all_html(archive, names, stream, scan=True),
+    # The spec engine, every page parsed with lxml
+    'lxml': lambda archive, names, stream: extraction_insta_html.extract_all_html(archive, names, stream, scan=False),
+    # The BeautifulSoup extractors, with the parser of the name
+    'bs4/lxml': lambda archive, names, stream: extraction_insta_html_bs4.extract_all_html(archive, names, 'lxml'),
+    'bs4/html.parser': lambda archive, names, stream: extraction_insta_html_bs4.extract_all_html(
+        archive, names, 'html.parser'
+    ),
+}
+
+# The backends that extract in stages (see port.progress), the others report their tables at once when done
+# and are not cut short on a budget (see port.budget)
+STAGED_BACKENDS = {
+    'scan': lambda archive, names, stream, meters: extraction_insta_html.extract_all_html_stages(
+        archive, names, stream, scan=True, meters=meters
+    ),
+    'lxml': lambda archive, names, stream, meters: extraction_insta_html.extract_all_html_stages(
+        archive, names, stream, scan=False, meters=meters
+    ),
+}
+
+DEFAULT_BACKEND = 'scan'
+
+# The name of the index of the tables, the row number
+ROW_ID = 'row_id'
+
+# Version of the extraction of every table, in both formats. Bump the version of a table
+# when a change to its extractors changes its rows: port.batch redoes the tables whose version changed
+VERSIONS: dict[str, int] = {
+    'followers': 1,
+    'following': 1,
+    'saved_posts': 1,
+    'your_topics': 1,
+    'likes': 1,
+    'account_setting': 1,
+    'account_location': 1,
+    'posts_viewed': 1,
+    'ads_viewed': 1,
+    'ads_clicked': 2,
+    'videos_watched': 1,
+    'suggested_acc_viewed': 1,
+    'advertisers_using_info': 1,
+    'ads_setting': 1,
+    'account_searches': 1,
+    'word_or_phrase_searches': 1,
+    'off_meta_activity': 1,
+    'used_devices': 1,
+    'login_activity': 1,
+    'post_comments': 1,
+    'reel_comments': 1,
+    'links_shared_in_dms': 2,
+}
+
+
+def extract_html(
+    zip_file: str | ArchiveSession,
+    names: list[str] | None = None,
+    stream: bool | None = None,
+    backend: str | dict[str, str] = DEFAULT_BACKEND,
+) -> dict[str, pd.DataFrame]:
+    """
+    Extracts the tables in names (all tables by default) of an HTML export, returns table name -> DataFrame
+    (see extract_html_stages)
+
+    Args:
+        zip_file: an opened archive, or the path to one
+        names: the tables to extract
+        stream: force (True) or prevent (False) streaming, None decides per member on its size
+            (only the spec engine streams)
+        backend: the backend for all tables, or table name -> backend,
+            tables that are not in the dict use DEFAULT_BACKEND
+    """
+    with open_archive(zip_file) as archive:
+        return run_stages(extract_html_stages(archive, names, stream, backend))
+
+
+def extract_html_stages(
+    archive: ArchiveSession,
+    names: list[str] | None = None,
+    stream: bool | None = None,
+    backend: str | dict[str, str] = DEFAULT_BACKEND,
+    meters: dict[str, Meter] | None = None,
+) -> Generator[MemberDone, None, dict[str, pd.DataFrame]]:
+    """
+    extract_html in stages: yields a MemberDone after every member, returns the tables
+    (the tables of the staged backends are cut short on the budgets of the meters, see port.budget)
+    """
+    if names is None:
+        names = list(extraction_insta_html.TABLES)
+    if isinstance(backend, str):
+        chosen = dict.fromkeys(names, backend)
+    else:
+        chosen = {name: backend.get(name, DEFAULT_BACKEND) for name in names}
+    unknown = set(chosen.values()) - set(BACKENDS)
+    if unknown:
+        raise ValueError(f"Unknown backends {sorted(unknown)}, the backends are {list(BACKENDS)}")
+
+    tables = {}
+    for name in dict.fromkeys(chosen.values()):
+        subset = [table for table in names if chosen[table] == name]
+        if name in STAGED_BACKENDS:
+            tables.update((yield from STAGED_BACKENDS[name](archive, subset, stream, meters)))
+        else:
+            tables.update(BACKENDS[name](archive, subset, stream))
+            specs = [spec for table in subset for spec in extraction_insta_html.TABLES[table]]
+            yield MemberDone('', tuple(subset), _member_bytes(specs, archive))
+    return {name: tables[name] for name in names}
+
+
+def _member_bytes(specs: list, archive: ArchiveSession) -> int:
+    """
+    The uncompressed size of the members the specs are extracted from
+    """
+    return sum(size for _, _, size in member_key(tuple(specs), archive.index))
+
+
+def _track(stages: Generator[MemberDone, None, dict], progress: Progress) -> Generator[Progress, None, dict]:
+    """
+    Runs the stages of an engine, yields the progress after every member
+    """
+    while True:
+        try:
+            member = next(stages)
+        except StopIteration as stop:
+            return stop.value
+        progress.advance(member)
+        yield progress
+
+
+def _available(specs: tuple, archive: ArchiveSession) -> bool:
+    """
+    Whether the export has a member for the specs of a table
+    """
+    for spec in specs:
+        try:
+            if spec.resolve_members(archive.index):
+                return True
+        except KeyError:
+            pass
+    return False
+
+
+def extract_all(
+    zip_file: str | ArchiveSession,
+    profile: ArchiveProfile | None = None,
+    stream: bool | None = None,
+    backend: str | dict[str, str] = DEFAULT_BACKEND,
+    names: list[str] | None = None,
+    cache: ResultCache | None = None,
+    timestamps: str = 'text',
+    keep_original: bool = False,
+    compact: bool = True,
+    report: bool = False,
+    budget: Budget | None = None,
+) -> dict[str, pd.DataFrame]:
+    """
+    Extracts the tables in names (all tables by default) of an export, returns table name -> DataFrame
+
+    Args:
+        zip_file: an opened archive, or the path to one
+        profile: the profile of the archive, it is profiled if not given
+        stream: force (True) or prevent (False) streaming, None decides per member on its size
+        backend: the backend(s) for the HTML export, see extract_html
+        names: the tables to extract
+        cache: tables from earlier extractions, only the tables that are not in it are extracted
+            (see port.extraction_cache)
+        timestamps: "text" keeps the timestamps in the notation of the HTML export ('Jan 28, 2024 1:00pm'),
+            "datetime" converts them to datetime64[ns, UTC] (see port.timestamps)
+        keep_original: with "datetime", keep the timestamps as extracted in <column>_original
+        compact: convert the columns to the compact types of their schema (see port.schema),
+            the account columns of all tables share one dictionary of account names (see port.schema.intern_accounts)
+        report: print the memory of every table before and after compact
+        budget: the seconds and rows the tables may take, a table that is cut short has
+            how in df.attrs["truncated"] and is not cached (see port.budget)
+    """
+    return run_stages(extract_all_stages(
+        zip_file, profile, stream, backend, names, cache, timestamps, keep_original, compact, report, budget
+    ))
+
+
+def extract_all_stages(
+    zip_file: str | ArchiveSession,
+    profile: ArchiveProfile | None = None,
+    stream: bool | None = None,
+    backend: str | dict[str, str] = DEFAULT_BACKEND,
+    names: list[str] | None = None,
+    cache: ResultCache | None = None,
+    timestamps: str = 'text',
+    keep_original: bool = False,
+    compact: bool = True,
+    report: bool = False,
+    budget: Budget | None = None,
+) -> Generator[Progress, None, dict[str, pd.DataFrame]]:
+    """
+    extract_all in stages, with the same arguments: yields the Progress of the extraction before
+    the first member and after every member, returns the tables
+
+    The progress is the share of the bytes (uncompressed) of the members of the tables
+    that are not in the cache that has been read.
+    """
+    if timestamps not in ('text', 'datetime'):
+        raise ValueError(f"Unknown timestamps {timestamps!r}, use 'text' or 'datetime'")
+    if names is None:
+        names = list(extraction_insta_html.TABLES)
+    with open_archive(zip_file) as archive:
+        if profile is None:
+            profile = profile_archive(archive)
+
+        # Both formats: every table from the format that has its members, HTML if both have
+        if profile.format == 'json':
+            json_names = list(names)
+        elif profile.format != 'mixed':
+            json_names = []
+        else:
+            json_names = [
+                name for name in names
+                if not _available(extraction_insta_html.TABLES[name], archive)
+                and _available(extraction_insta_json.TABLES[name], archive)
+            ]
+
+        tables = {}
+        keys = {}
+        if cache is not None:
+            for name in names:
+                if name in json_names:
+                    extractor, specs = 'json', extraction_insta_json.TABLES[name]
+                else:
+                    extractor = backend if isinstance(backend, str) else backend.get(name, DEFAULT_BACKEND)
+                    specs = extraction_insta_html.TABLES[name]
+                keys[name] = (
+                    name, VERSIONS[name], extractor, profile.language, timestamps, keep_original, compact,
+                    member_key(specs, archive.index),
+                )
+                df = cache.get(keys[name])
+                if df is not None:
+                    tables[name] = df
+
+        html_names = [name for name in names if name not in json_names and name not in tables]
+        json_names = [name for name in json_names if name not in tables]
+        specs = [spec for name in html_names for spec in extraction_insta_html.TABLES[name]] \
+            + [spec for name in json_names for spec in extraction_insta_json.TABLES[name]]
+        progress = Progress(_member_bytes(specs, archive))
+        meters = budget.meters(html_names + json_names) if budget is not None else {}
+        yield progress
+
+        extracted = {}
+        if html_names:
+            extracted.update((yield from _track(
+                extract_html_stages(archive, html_names, stream, backend, meters), progress
+            )))
+        if json_names:
+            extracted.update((yield from _track(extraction_insta_json.extract_all_json_stages(
+                archive, json_names, stream, profile.labels, 'epoch' if timestamps == 'datetime' else 'text', meters
+            ), progress)))
+        truncated = {name: meter.truncation() for name, meter in meters.items() if meter.truncation() is not None}
+        if timestamps == 'datetime':
+            normalize_timestamps(extracted, profile.language, keep_original)
+        if compact:
+            apply_schemas(extracted, report)
+        for df in extracted.values():
+            df.index = pd.RangeIndex(len(df), name=ROW_ID)
+        tables.update(extracted)
+
+        if cache is not None:
+            for name in html_names + json_names:
+                if name not in truncated:
+                    cache.put(keys[name], tables[name])
+        tables = {name: tables[name] for name in names}
+        if compact:
+            intern_accounts(tables)
+        for name, truncation in truncated.items():
+            tables[name].attrs[TRUNCATED] = truncation
+        return tables
@@ -0,0 +1,91 @@
+"""
+Cache of extracted tables, shared by the donation sessions of a worker
+
+When the participant is sent back to the file prompt and selects the same export again,
+or another export that shares members with it, the tables whose members did not change
+are returned from the cache instead of being extracted again.
+
+A table is cached under the members it is extracted from, each by path, CRC-32 and size
+from the central directory, and the version of its extractor (port.extraction.VERSIONS),
+so nothing has to be read from the archive to find a table in the cache. The cache holds
+at most max_bytes of DataFrames, the least recently used tables are evicted first.
+"""
+
+from collections import OrderedDict
+from typing import Hashable
+
+import pandas as pd
+
+from port.archive import ArchiveIndex
+
+
+# Fits a few exports, well below the memory of the browser worker
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+
+def member_key(specs: tuple, index: ArchiveIndex) -> tuple[tuple[str, int, int], ...]:
+    """
+    (path, CRC-32, size) of every member the specs of a table are extracted from, in path order
+    """
+    paths = set()
+    for spec in specs:
+        try:
+            paths.update(path for path, _ in spec.resolve_members(index))
+        except KeyError:
+            pass
+    key = []
+    for path in sorted(paths):
+        info = index.info(path)
+        key.append((path, info.CRC, info.file_size))
+    return tuple(key)
+
+
+class ResultCache:
+    """
+    Least recently used cache of extracted tables, bounded by the memory of the DataFrames
+
+    Tables are copied in and out, so callers can change the tables they get
+    without changing the cache.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._tables: OrderedDict[Hashable, tuple[pd.DataFrame, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._tables
+
+    def get(self, key: Hashable) -> pd.DataFrame | None:
+        entry = self._tables.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._tables.move_to_end(key)
+        return entry[0].copy()
+
+    def put(self, key: Hashable, df: pd.DataFrame) -> None:
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if key in self._tables:
+            self.bytes -= self._tables.pop(key)[1]
+        if size > self.max_bytes:
+            return
+        self._tables[key] = (df.copy(), size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, evicted) = self._tables.popitem(last=False)
+            self.bytes -= evicted
+
+    def clear(self) -> None:
+        self._tables.clear()
+        self.bytes = 0
+
+
+# The cache of this worker, script.process extracts through it
+CACHE = ResultCache()
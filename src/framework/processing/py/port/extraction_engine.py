@@ -0,0 +1,753 @@
+"""
+Generic extraction engine for the HTML export
+
+Every table is described by one or more ExtractorSpec objects: which member(s) to read,
+which elements are the records and which Fields to take from every record.
+The engine opens the member, iterates over the records (see port.html_records)
+and turns every record into a row, so adding a table means adding a spec.
+extract_tables extracts several tables at once: every member is parsed once and
+its records are handed to all specs that read the member. extract_tables_stages does the same
+and reports every member it has read (see port.progress).
+
+The driver (extract_source_stages) does not depend on the export format: a RecordSource reads
+the members of a format into Projections, HtmlRecords reads the HTML export and
+port.extraction_json.JsonRecords the JSON export.
+
+All xpaths are compiled once, when the spec is created. Fields that select elements by class
+use a ClassSelector (see port.class_selectors) instead of an xpath with contains(@class, ...),
+they are answered from the class index of the document.
+Specs of pages whose records all have the same markup can carry a RecordTemplate
+(see port.html_scanner): their members are scanned as bytes, and only parsed
+with lxml if the member does not fit the template.
+"""
+
+import fnmatch
+import heapq
+import io
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field as dataclass_field
+from itertools import chain, groupby
+from typing import Any, Callable, Generator, Iterable
+
+import pandas as pd
+from lxml import etree
+
+from port.archive import ArchiveIndex, ArchiveSession, open_archive, part_of
+from port.budget import Meter
+from port.html_records import RecordSelector, index_document, iter_records, should_stream
+from port.class_selectors import ClassIndex, ClassSelector
+from port.html_scanner import RecordTemplate
+from port.progress import MemberDone, run_stages
+from port.timestamps import ABBREVIATIONS as ENGLISH_MONTHS, MONTHS
+
+
+# Returned by Field.pick when the xpath found nothing at index
+MISSING = object()
+
+# Members are parsed by this many threads, where the runtime has threads (Pyodide has not)
+PARSE_WORKERS = min(4, os.cpu_count() or 1)
+
+# Month name (or abbreviation) of any language of the export -> number, see port.timestamps.MONTHS
+_MONTHS = {
+    name.lower(): ENGLISH_MONTHS.index(abbreviation) + 1
+    for names in MONTHS.values() for name, abbreviation in names.items()
+}
+# 'Jan 28, 2024 1:00pm' (English), '28. Jan. 2024, 13:00' or '28.01.2024, 13:00' (German)
+_TIMESTAMPS = (
+    re.compile(
+        r"(?P<month>[^\W\d_]+)\.? (?P<day>\d{1,2}), (?P<year>\d{4})"
+        r"(?:,? (?P<hour>\d{1,2}):(?P<minute>\d{2})\s*(?P<half>[AaPp][Mm])?)?"
+    ),
+    re.compile(
+        r"(?P<day>\d{1,2})\.\s*(?:(?P<month>[^\W\d_]+)\.?|(?P<number>\d{1,2})\.)\s*(?P<year>\d{4})"
+        r"(?:,? (?P<hour>\d{1,2}):(?P<minute>\d{2}))?"
+    ),
+)
+
+
+def text_of(element: etree._Element) -> str | None:
+    """
+    Post-processor: the text of an element, like element.text
+    """
+    return element.text
+
+
+def drop_narrow_nbsp(value: str) -> str:
+    """
+    Post-processor: removes the narrow no-break space Instagram puts between time and am/pm
+    """
+    return value.replace("\u202f", "")
+
+
+def join_stripped(values: list[str]) -> str | None:
+    """
+    Post-processor for index=None fields: all text joined and stripped, None if there is no text
+    """
+    return "".join(values).strip() if values else None
+
+
+def timestamp_key(value: Any) -> tuple:
+    """
+    Sort key for the timestamps of the export, such as 'Jan 28, 2024 1:00pm' or 'Jan 28, 2024',
+    in the notation of every language of the export ('28. Jan. 2024, 13:00', see port.timestamps)
+
+    Values that are not a timestamp sort before all timestamps.
+    """
+    if not isinstance(value, str):
+        return (0,)
+    for pattern in _TIMESTAMPS:
+        match = pattern.match(value)
+        if match is not None:
+            break
+    else:
+        return (0,)
+    if match["month"] is not None:
+        month = _MONTHS.get(match["month"].lower())
+    else:
+        month = int(match["number"])
+    if month is None or not 1 <= month <= 12:
+        return (0,)
+    hour, minute = 0, 0
+    if match["hour"] is not None:
+        hour, minute = int(match["hour"]), int(match["minute"])
+        half = match.groupdict().get("half")
+        if half is not None:
+            hour = hour % 12 + (12 if half.lower() == "pm" else 0)
+    return (1, int(match["year"]), month, int(match["day"]), hour, minute)
+
+
+def resolve_members(member: str, index: ArchiveIndex) -> list[tuple[str, str]]:
+    """
+    Returns (path, path relative to the pattern directory) for every member that matches member
+    (a path or a pattern, see ExtractorSpec.member), the parts of a member follow each other in part order.
+    A path finds its family (see ArchiveIndex.family), whichever of its parts the export has
+    """
+    if "*" not in member:
+        parts = index.family(member)
+        if not parts:
+            raise KeyError(f"There is no item named {member!r} in the archive")
+        return [(part, "") for part in parts]
+
+    directory, _, pattern = member.rpartition("/")
+    while "*" in directory:
+        directory, _, head = directory.rpartition("/")
+        pattern = f"{head}/{pattern}"
+    base = index.resolve(directory + "/")
+    families = {}
+    for path in index.under(base):
+        if fnmatch.fnmatchcase(path[len(base):], pattern):
+            families.setdefault(part_of(path)[0], []).append(path)
+    return [
+        (path, path[len(base):])
+        for parts in families.values()
+        for path in sorted(parts, key=part_of)
+    ]
+
+
+@dataclass(frozen=True)
+class Field:
+    """
+    A value taken from every record
+
+    Attributes:
+        name: name of the field, output columns refer to fields by name
+        path: xpath selecting the value, relative to the element given by scope,
+            or a ClassSelector
+        index: which result of the xpath to take, None takes the list of all results
+        clean: post-processor applied to the value (if there is a value)
+        required: records for which the xpath finds nothing are skipped
+        scope: what path is evaluated against
+            "record": the record container
+            "document": the document root, the result at the position of the record is taken,
+                for pages that store the columns of a table as separate lists
+            "context": the first context element of the document (see ExtractorSpec.context)
+            "member": no xpath, clean is called with the member path relative to the member pattern
+            "constant": no xpath, the value is the constant
+        value: the value of a constant field
+    """
+
+    name: str
+    path: str | ClassSelector | None = None
+    index: int | None = 0
+    clean: Callable[[Any], Any] | None = None
+    required: bool = False
+    scope: str = "record"
+    value: Any = None
+    xpath: etree.XPath | None = dataclass_field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if isinstance(self.path, str):
+            object.__setattr__(self, "xpath", etree.XPath(self.path, smart_strings=False))
+
+    def select(self, element: etree._Element, index: ClassIndex | None) -> list:
+        """
+        Evaluates path against element, class selectors are looked up in index (if there is one)
+        """
+        if self.xpath is not None:
+            return self.xpath(element)
+        if index is None:
+            return self.path.xpath(element)
+        if self.scope == "document":
+            return self.path.results(index.select(self.path))
+        return index.select_within(element, self.path)
+
+    def pick(self, results: list) -> Any:
+        if self.index is None:
+            value = results
+        elif 0 <= self.index < len(results):
+            value = results[self.index]
+        else:
+            return MISSING
+        if self.clean is not None:
+            value = self.clean(value)
+        return value
+
+
+def constant(name: str, value: Any) -> Field:
+    return Field(name, scope="constant", value=value)
+
+
+def from_member(name: str, clean: Callable[[str], Any]) -> Field:
+    return Field(name, scope="member", clean=clean)
+
+
+@dataclass(frozen=True)
+class ExtractorSpec:
+    """
+    How to extract the rows of a table from one member (pattern) of the export
+
+    Attributes:
+        member: path of the member (the trailing part is enough),
+            or a pattern such as 'messages/inbox/*.html' that selects every matching member.
+            All numbered parts of a member are read (followers_1.html, followers_2.html, ...)
+        records: selects the record containers
+        fields: the fields taken from every record
+        columns: names of the fields that make up the output rows, in order
+        context: selects an element that precedes the records and holds document level values
+            for fields with scope "context", for example the conversation header of a chat
+        post: post-processors applied to every row (a dict with all fields),
+            they return the (changed) row or None to drop it
+        explode: name of a list field (index=None), one row is emitted per value in the list
+        limit: only the first limit records are considered
+        streamable: whether the records can be processed while streaming,
+            False for pages whose fields look outside of the record container
+        merge_on: the column the rows of the parts of a member are merged on, newest first
+            (see timestamp_key), None keeps the rows in part order
+        template: the markup of the records, for pages that can be scanned without lxml,
+            it has a placeholder for every record field, the post-processors of these fields take the text
+    """
+
+    member: str
+    records: RecordSelector
+    fields: tuple[Field, ...]
+    columns: tuple[str, ...]
+    context: RecordSelector | None = None
+    post: tuple[Callable[[dict], dict | None], ...] = ()
+    explode: str | None = None
+    limit: int | None = None
+    streamable: bool = True
+    merge_on: str | None = "timestamp"
+    template: RecordTemplate | None = None
+
+    def __post_init__(self):
+        names = {field.name for field in self.fields}
+        missing = [column for column in self.columns if column not in names]
+        if missing:
+            raise ValueError(f"Columns {missing} of {self.member} have no field")
+        if self.template is not None:
+            unscanned = [
+                field.name for field in self.fields
+                if field.scope not in ("constant", "member")
+                and (field.scope != "record" or field.index != 0 or field.name not in self.template.fields)
+            ]
+            if unscanned or self.context is not None or self.template.records != self.records:
+                raise ValueError(f"The template of {self.member} does not cover {unscanned or 'the records'}")
+        if self.merge_on not in self.columns:
+            object.__setattr__(self, "merge_on", None)
+        if any(field.scope == "document" for field in self.fields):
+            object.__setattr__(self, "streamable", False)
+
+    def resolve_members(self, index: ArchiveIndex) -> list[tuple[str, str]]:
+        return resolve_members(self.member, index)
+
+
+class Projection:
+    """
+    The rows one spec takes from one member
+
+    The part every export format shares: constant and member fields, the record limit,
+    post-processors, explode and the budget. The projections of a RecordSource turn
+    the records of their format into rows and hand them to emit.
+    """
+
+    def __init__(self, spec: Any, path: str, relative: str):
+        self.spec = spec
+        self.path = path
+        self.family, _ = part_of(path)
+        self.base = {}
+        for field in spec.fields:
+            if field.scope == "constant":
+                self.base[field.name] = field.value
+            elif field.scope == "member":
+                self.base[field.name] = field.clean(relative)
+        self.position = -1
+        self.rows = []
+        self.done = False
+        self.failed = False
+        # The budget of the table (see port.budget), and when reading the member started
+        self.meter: Meter | None = None
+        self.started = 0.0
+
+    def next_record(self) -> bool:
+        """
+        Counts a record, False (and done) once the limit of the spec is reached
+        """
+        self.position += 1
+        if self.spec.limit is not None and self.position >= self.spec.limit:
+            self.done = True
+            return False
+        return True
+
+    def emit(self, row: dict) -> None:
+        """
+        Post-processes a row (a dict with all fields) and adds it to the rows
+        """
+        spec = self.spec
+        for post in spec.post:
+            row = post(row)
+            if row is None:
+                return
+        count = len(self.rows)
+        if spec.explode is None:
+            self.rows.append(tuple(row[column] for column in spec.columns))
+        else:
+            for value in row[spec.explode]:
+                row[spec.explode] = value
+                self.rows.append(tuple(row[column] for column in spec.columns))
+        if self.meter is not None and self.meter.add_rows(len(self.rows) - count, self.started):
+            self.done = True
+
+
+class RecordSource:
+    """
+    How the members of one export format are read, see extract_source_stages
+
+    Attributes:
+        parallel: whether members can be read in threads, for formats that are parsed without holding the GIL
+    """
+
+    parallel = False
+
+    def projection(self, spec: Any, path: str, relative: str) -> Projection:
+        """
+        The projection of spec on the member path
+        """
+        raise NotImplementedError
+
+    def read_member(
+        self, archive: ArchiveSession, path: str, projections: list[Projection], stream: bool | None
+    ) -> None:
+        """
+        Extracts the rows of all projections of a member
+        """
+        raise NotImplementedError
+
+    def merge_key(self, value: Any) -> Any:
+        """
+        Sort key of the values of spec.merge_on, the parts of a member are merged on it
+        """
+        return value
+
+    def finish(self, df: pd.DataFrame, specs: tuple) -> pd.DataFrame:
+        """
+        Converts the DataFrame of a table once all its rows are in
+        """
+        return df
+
+
+def feed_records(projections: list[Projection], records: Iterable[Any], feed: Callable[[Any, Any], None]) -> None:
+    """
+    Hands every record to every projection with feed(projection, record), until all projections are done
+
+    A projection that fails is reported and takes no further records.
+    """
+    active = list(projections)
+    for record in records:
+        finished = False
+        for projection in active:
+            try:
+                feed(projection, record)
+            except Exception as e:
+                print(f"Something went wrong with {projection.path}: {e}")
+                projection.failed = True
+                projection.done = True
+            finished = finished or projection.done
+        if finished:
+            active = [projection for projection in active if not projection.done]
+            if not active:
+                break
+
+
+def count_member(projections: list[Projection], seconds: float) -> None:
+    """
+    Counts a member that has been read against the budgets of the tables of its projections
+    """
+    meters = {id(projection.meter): projection.meter for projection in projections if projection.meter is not None}
+    for meter in meters.values():
+        meter.add_member(seconds)
+
+
+class _HtmlProjection(Projection):
+    """
+    The rows one spec takes from one member of the HTML export
+    """
+
+    def __init__(self, spec: ExtractorSpec, path: str, relative: str):
+        super().__init__(spec, path, relative)
+        self.record_fields = [field for field in spec.fields if field.scope in ("record", "document")]
+        self.context_fields = [field for field in spec.fields if field.scope == "context"]
+        self.aligned = {}
+        self.context = None
+
+    def feed(
+        self, record: etree._Element, evaluate: Callable[[Field, etree._Element], list], index: ClassIndex | None
+    ) -> None:
+        """
+        Turns a record (or a context element) into rows, evaluate gives the results of a field for an element
+        """
+        spec = self.spec
+        if spec.context is not None and spec.context.matches(record) and not spec.records.matches(record):
+            if self.context is None:
+                self.context = {field.name: field.pick(evaluate(field, record)) for field in self.context_fields}
+                if any(value is MISSING for value in self.context.values()):
+                    raise ValueError(f"No context found in {self.path}")
+            return
+        if spec.context is not None and self.context is None:
+            # Records without the preceding context cannot be interpreted
+            self.done = True
+            return
+
+        if not self.next_record():
+            return
+
+        row = dict(self.base)
+        if self.context is not None:
+            row.update(self.context)
+        for field in self.record_fields:
+            try:
+                if field.scope == "document":
+                    if field.name not in self.aligned:
+                        self.aligned[field.name] = field.select(record.getroottree(), index)
+                    value = field.pick(self.aligned[field.name][self.position:self.position + 1])
+                else:
+                    value = field.pick(evaluate(field, record))
+            except Exception:
+                value = MISSING
+            if value is MISSING:
+                if field.required:
+                    return
+                value = None
+            row[field.name] = value
+
+        self.emit(row)
+
+    def feed_scanned(self, values: dict[str, str | None]) -> None:
+        """
+        Turns the texts of a scanned record (see RecordTemplate.scan) into rows
+        """
+        if not self.next_record():
+            return
+
+        row = dict(self.base)
+        for field in self.record_fields:
+            value = values[field.name]
+            if value is None:
+                if field.required:
+                    return
+            elif field.clean is not None:
+                value = field.clean(value)
+            row[field.name] = value
+        self.emit(row)
+
+
+def _feed(projections: list[_HtmlProjection], records: Iterable[etree._Element], index: ClassIndex | None) -> None:
+    """
+    Hands every record to every projection that shares the layout
+
+    The results of a path are computed once per record, projections (and fields)
+    that use the same path share them.
+    """
+    results = {}
+
+    def evaluate(field: Field, element: etree._Element) -> list:
+        value = results.get(field.path)
+        if value is None:
+            value = results[field.path] = field.select(element, index)
+        return value
+
+    def fresh(records: Iterable[etree._Element]) -> Iterable[etree._Element]:
+        for record in records:
+            results.clear()
+            yield record
+
+    feed_records(projections, fresh(records), lambda projection, record: projection.feed(record, evaluate, index))
+
+
+def _feed_scanned(projections: list[_HtmlProjection], scanned: list[dict[str, str | None]]) -> None:
+    """
+    Hands the texts of every scanned record to every projection
+    """
+    for projection in projections:
+        try:
+            for values in scanned:
+                projection.feed_scanned(values)
+                if projection.done:
+                    break
+        except Exception as e:
+            print(f"Something went wrong with {projection.path}: {e}")
+            projection.failed = True
+
+
+class HtmlRecords(RecordSource):
+    """
+    Reads the members of the HTML export (see port.html_records)
+
+    Members of specs with a template are scanned first (see RecordTemplate.scan), the bytes that were read
+    are parsed with lxml if the member does not fit. Whether a member is streamed is decided first,
+    on its size: a streamed member is scanned a chunk at a time (see RecordTemplate.scan_file)
+    and read again, streaming, if it does not fit.
+    In DOM mode the member is parsed and indexed once, for all layouts (record and context selectors)
+    of its projections. While streaming nothing of the document is kept, so every layout reads
+    the member on its own. lxml parses without holding the GIL, so members are read in parallel.
+
+    Args:
+        scan: scan the members of specs with a template, False always parses with lxml
+    """
+
+    parallel = True
+
+    def __init__(self, scan: bool = True):
+        self.scan = scan
+
+    def projection(self, spec: ExtractorSpec, path: str, relative: str) -> _HtmlProjection:
+        return _HtmlProjection(spec, path, relative)
+
+    def read_member(
+        self, archive: ArchiveSession, path: str, projections: list[_HtmlProjection], stream: bool | None
+    ) -> None:
+        stream = all(projection.spec.streamable for projection in projections) \
+            and should_stream(archive.index.info(path).file_size, stream)
+
+        def open_member():
+            return archive.open(path)
+
+        templates = {projection.spec.template for projection in projections}
+        if self.scan and len(templates) == 1 and None not in templates:
+            template = templates.pop()
+            if stream:
+                with archive.open(path) as f:
+                    scanned = template.scan_file(f)
+            else:
+                with archive.open(path) as f:
+                    data = f.read()
+                scanned = template.scan(data)
+
+                def open_member():
+                    return io.BytesIO(data)
+
+            if scanned is not None:
+                _feed_scanned(projections, scanned)
+                return
+
+        layouts = {}
+        for projection in projections:
+            layouts.setdefault((projection.spec.records, projection.spec.context), []).append(projection)
+
+        if stream:
+            for (records, context), group in layouts.items():
+                selector = records | context if context is not None else records
+                with open_member() as f:
+                    _feed(group, iter_records(f, selector, stream=True), None)
+            return
+
+        with open_member() as f:
+            index = index_document(f)
+        for (records, context), group in layouts.items():
+            selector = records | context if context is not None else records
+            elements = selector.select(index) if index is not None else []
+            if index is not None:
+                index.assign(elements)
+            _feed(group, elements, index)
+
+    def merge_key(self, value: Any) -> tuple:
+        return timestamp_key(value)
+
+
+def _scan_members(
+    archive: ArchiveSession, members: dict[str, list[Projection]], tables: dict[str, tuple[str, ...]],
+    source: RecordSource, stream: bool | None,
+) -> Generator[MemberDone, None, None]:
+    """
+    Reads every member, in archive order, yields a MemberDone (with the tables of the member) after every member
+
+    The members are independent of each other: where the runtime has threads and the source
+    allows it (see RecordSource.parallel) they are read in parallel.
+    The projections of tables that are out of budget are skipped (see port.budget).
+    """
+    def process(path: str) -> MemberDone:
+        projections = [
+            projection for projection in members[path]
+            if projection.meter is None or not projection.meter.exhausted()
+        ]
+        if projections:
+            started = time.perf_counter()
+            for projection in projections:
+                projection.started = started
+            try:
+                source.read_member(archive, path, projections, stream)
+            except Exception as e:
+                print(f"Something went wrong with {path}: {e}")
+                for projection in projections:
+                    projection.failed = True
+            count_member(projections, time.perf_counter() - started)
+        return MemberDone(path, tables[path], archive.index.info(path).file_size)
+
+    paths = sorted(members, key=lambda path: archive.index.info(path).header_offset)
+    if not source.parallel or sys.platform == "emscripten" or PARSE_WORKERS < 2 or len(paths) < 2:
+        for path in paths:
+            yield process(path)
+    else:
+        with ThreadPoolExecutor(max_workers=PARSE_WORKERS) as pool:
+            yield from pool.map(process, paths)
+
+
+def _merge_parts(projections: list[Projection], key: Callable[[Any], Any]) -> Iterable[tuple]:
+    """
+    The rows of the parts of one member: a k-way merge of the (sorted) parts on spec.merge_on
+    """
+    projections = [projection for projection in projections if not projection.failed]
+    spec = projections[0].spec if projections else None
+    if len(projections) < 2 or spec.merge_on is None:
+        return chain.from_iterable(projection.rows for projection in projections)
+
+    column = spec.columns.index(spec.merge_on)
+    return heapq.merge(
+        *(projection.rows for projection in projections),
+        key=lambda row: key(row[column]),
+        reverse=True,
+    )
+
+
+def extract_source_stages(
+    source: RecordSource,
+    tables: dict[str, tuple],
+    zip_file: str | ArchiveSession,
+    stream: bool | None = None,
+    meters: dict[str, Meter] | None = None,
+) -> Generator[MemberDone, None, dict[str, pd.DataFrame]]:
+    """
+    Extracts several tables in one pass over the archive, reading the members with source
+
+    The specs of all tables are resolved to members first. Every member is then read once,
+    in archive order, and its records are handed to every spec that reads it.
+    The rows of the parts of a member are merged (see ExtractorSpec.merge_on),
+    so the table does not depend on the order the parts were processed in.
+    A member (or a spec on a member) that cannot be processed is reported and skipped,
+    the rest is still extracted. A MemberDone is yielded after every member.
+
+    Args:
+        source: reads the members of the export format of the specs (see RecordSource)
+        tables: table name -> the specs of the table, the specs of a table should have the same columns
+        zip_file: an opened archive, or the path to one
+        stream: force (True) or prevent (False) streaming, None decides per member on its size
+        meters: table name -> the budget of the table (see port.budget), a table out of budget
+            keeps the rows it has so far
+
+    Returns:
+        table name -> DataFrame, an empty DataFrame if something went wrong
+    """
+    dfs = {name: pd.DataFrame() for name in tables}
+    try:
+        with open_archive(zip_file) as archive:
+            members = {}
+            member_tables = {}
+            projections = {name: [] for name in tables}
+            for name, specs in tables.items():
+                for spec in specs:
+                    try:
+                        resolved = spec.resolve_members(archive.index)
+                    except Exception as e:
+                        print(f"Something went wrong: {e}")
+                        continue
+                    for path, relative in resolved:
+                        projection = source.projection(spec, path, relative)
+                        projection.meter = meters.get(name) if meters else None
+                        members.setdefault(path, []).append(projection)
+                        projections[name].append(projection)
+                        member_tables[path] = tuple(dict.fromkeys(member_tables.get(path, ()) + (name,)))
+
+            for name, meter in (meters or {}).items():
+                if name in projections:
+                    meter.members_total = len({projection.path for projection in projections[name]})
+
+            yield from _scan_members(archive, members, member_tables, source, stream)
+
+            for name, specs in tables.items():
+                data = []
+                parts_of = groupby(projections[name], key=lambda projection: (id(projection.spec), projection.family))
+                for _, parts in parts_of:
+                    parts = list(parts)
+                    data.extend(_merge_parts(parts, source.merge_key))
+                    for projection in parts:
+                        projection.rows = []
+                dfs[name] = source.finish(pd.DataFrame(data, columns=list(specs[0].columns)), specs)
+    except Exception as e:
+        print(f"Something went wrong: {e}")
+
+    return dfs
+
+
+def extract_tables(
+    tables: dict[str, tuple[ExtractorSpec, ...]],
+    zip_file: str | ArchiveSession,
+    stream: bool | None = None,
+    scan: bool = True,
+) -> dict[str, pd.DataFrame]:
+    """
+    Extracts several tables in one pass over the archive, see extract_tables_stages
+    """
+    return run_stages(extract_tables_stages(tables, zip_file, stream, scan))
+
+
+def extract_tables_stages(
+    tables: dict[str, tuple[ExtractorSpec, ...]],
+    zip_file: str | ArchiveSession,
+    stream: bool | None = None,
+    scan: bool = True,
+    meters: dict[str, Meter] | None = None,
+) -> Generator[MemberDone, None, dict[str, pd.DataFrame]]:
+    """
+    Extracts several tables of the HTML export in one pass over the archive, see extract_source_stages
+
+    Args:
+        scan: scan the members of specs with a template (see ExtractorSpec.template), False always parses with lxml
+    """
+    return (yield from extract_source_stages(HtmlRecords(scan), tables, zip_file, stream, meters))
+
+
+def extract_table(
+    specs: tuple[ExtractorSpec, ...], zip_file: str | ArchiveSession, stream: bool | None = None
+) -> pd.DataFrame:
+    """
+    Extracts a table, the rows of all specs are concatenated
+
+    Args:
+        specs: the specs of the table, they should all have the same columns
+        zip_file: an opened archive, or the path to one
+        stream: force (True) or prevent (False) streaming, None decides per member on its size
+    """
+    return extract_tables({"table": specs}, zip_file, stream)["table"]
@@ -1,153 +1,347 @@
+import posixpath
+
 import pandas as pd
-import zipfile
-import json
+from port.archive import ArchiveSession, open_archive
+from port.archive_profile import profile_archive
+from port.extraction_json import (
+    JsonSpec, JsonField, constant, from_member, extract_table, extract_tables, extract_tables_stages,
+)
+
+# Most records of the JSON export keep their values in a list or a map of labeled values:
+# {"title": ..., "string_list_data": [{"href": ..., "value": ..., "timestamp": ...}]}
+# {"string_map_data": {"Time": {"timestamp": ...}, "Author": {"value": ...}}}
+LIST_DATA = 'string_list_data'
+MAP_DATA = 'string_map_data'
+
+
+def _connections(member: str, records: str | None, type: str) -> JsonSpec:
+    return JsonSpec(
+        member=member,
+        records=records,
+        fields=(
+            constant('type', type),
+            JsonField('timestamp', (LIST_DATA, 0, 'timestamp'), unit='s', required=True),
+            JsonField('user_name', (LIST_DATA, 0, 'value')),
+            JsonField('link', (LIST_DATA, 0, 'href')),
+        ),
+        columns=('type', 'timestamp', 'user_name', 'link'),
+    )
+
+
+def _likes(member: str, records: str, type: str) -> JsonSpec:
+    return JsonSpec(
+        member=member,
+        records=records,
+        fields=(
+            constant('type', type),
+            JsonField('timestamp', (LIST_DATA, 0, 'timestamp'), unit='s', required=True),
+            JsonField('user_name', ('title',)),
+            JsonField('link', (LIST_DATA, 0, 'href'), required=True),
+        ),
+        columns=('type', 'timestamp', 'user_name', 'link'),
+    )
+
+
+def _seen(member: str, records: str, type: str, label: str = 'Author', user_column: str = 'from_user') -> JsonSpec:
+    return JsonSpec(
+        member=member,
+        records=records,
+        fields=(
+            constant('type', type),
+            JsonField('timestamp', (MAP_DATA, 'Time', 'timestamp'), unit='s'),
+            JsonField(user_column, (MAP_DATA, label, 'value')),
+        ),
+        columns=('type', 'timestamp', user_column),
+    )
+
 
-def extract_account_setting(zip_file: str) -> pd.DataFrame:
+def _searches(member: str, records: str, type: str, column: str) -> JsonSpec:
+    return JsonSpec(
+        member=member,
+        records=records,
+        fields=(
+            constant('type', type),
+            JsonField('timestamp', (MAP_DATA, 'Time', 'timestamp'), unit='s'),
+            JsonField(column, (MAP_DATA, 'Search', 'value')),
+        ),
+        columns=('type', 'timestamp', column),
+    )
+
+
+def _comments(member: str, records: str | None, type: str) -> JsonSpec:
+    return JsonSpec(
+        member=member,
+        records=records,
+        fields=(
+            constant('type', type),
+            JsonField('timestamp', (MAP_DATA, 'Time', 'timestamp'), unit='s'),
+            JsonField('text', (MAP_DATA, 'Comment', 'value')),
+            JsonField('media_owner', (MAP_DATA, 'Media Owner', 'value')),
+        ),
+        columns=('type', 'timestamp', 'text', 'media_owner'),
+    )
+
+
+def _dm_sender(row: dict) -> dict:
+    row['sender'] = 'other' if row['sender'] == row['partner_name'] else 'self'
+    return row
+
+
+# Registry of all tables of the JSON export, with the names and columns of the tables of the HTML export
+# (see port.extraction_insta_html_lxml.TABLES)
+TABLES: dict[str, tuple[JsonSpec, ...]] = {
+    'followers': (
+        _connections('connections/followers_and_following/followers_1.json', None, 'follower'),
+    ),
+    'following': (
+        _connections('connections/followers_and_following/following.json', 'relationships_following', 'following'),
+    ),
+    'saved_posts': (
+        JsonSpec(
+            member='your_instagram_activity/saved/saved_posts.json',
+            records='saved_saved_media',
+            fields=(
+                constant('type', 'saved_post'),
+                JsonField('timestamp', (MAP_DATA, 'Saved on', 'timestamp'), unit='s'),
+                JsonField('user_name', ('title',)),
+                JsonField('link', (MAP_DATA, 'Saved on', 'href')),
+            ),
+            columns=('type', 'timestamp', 'user_name', 'link'),
+        ),
+    ),
+    'your_topics': (
+        JsonSpec(
+            member='preferences/your_topics/your_topics.json',
+            records='topics_your_topics',
+            fields=(
+                constant('type', 'assigned_topic'),
+                JsonField('name', (MAP_DATA, 'Name', 'value'), required=True),
+            ),
+            columns=('type', 'name'),
+        ),
+    ),
+    'likes': (
+        _likes('your_instagram_activity/likes/liked_posts.json', 'likes_media_likes', 'liked_post'),
+        _likes('your_instagram_activity/likes/liked_comments.json', 'likes_comment_likes', 'liked_comment'),
+    ),
+    'account_setting': (
+        JsonSpec(
+            member='personal_information/personal_information/personal_information.json',
+            records='profile_user',
+            fields=(
+                constant('type', 'account_private'),
+                JsonField('value', (MAP_DATA, ('Private Account', 'Private account'), 'value'), required=True),
+            ),
+            columns=('type', 'value'),
+        ),
+    ),
+    'account_location': (
+        JsonSpec(
+            member='personal_information/information_about_you/account_based_in.json',
+            records='inferred_data_primary_location',
+            fields=(
+                constant('type', 'account_based_in'),
+                JsonField('value', (MAP_DATA, 'City Name', 'value'), required=True),
+            ),
+            columns=('type', 'value'),
+            limit=1,
+        ),
+    ),
+    'posts_viewed': (
+        _seen('ads_information/ads_and_topics/posts_viewed.json', 'impressions_history_posts_seen', 'post_seen'),
+    ),
+    'ads_viewed': (
+        _seen('ads_information/ads_and_topics/ads_viewed.json', 'impressions_history_ads_seen', 'ad_seen'),
+    ),
+    'ads_clicked': (
+        JsonSpec(
+            member='ads_information/ads_and_topics/ads_clicked.json',
+            records='impressions_history_ads_clicked',
+            fields=(
+                constant('type', 'ad_clicked'),
+                JsonField('timestamp', (LIST_DATA, 0, 'timestamp'), unit='s'),
+                JsonField('from_user', ('title',)),
+            ),
+            columns=('type', 'timestamp', 'from_user'),
+        ),
+    ),
+    'videos_watched': (
+        _seen(
+            'ads_information/ads_and_topics/videos_watched.json', 'impressions_history_videos_watched', 'video_watched'
+        ),
+    ),
+    'suggested_acc_viewed': (
+        _seen(
+            'ads_information/ads_and_topics/suggested_accounts_viewed.json', 'impressions_history_chaining_seen',
+            'suggested_acc_viewed', label='Username', user_column='user_name',
+        ),
+    ),
+    'advertisers_using_info': (
+        JsonSpec(
+            member='ads_information/instagram_ads_and_businesses/advertisers_using_your_activity_or_information.json',
+            records='ig_custom_audiences_all_types',
+            fields=(
+                constant('type', 'advertiser_using_info'),
+                JsonField('user', ('advertiser_name',)),
+            ),
+            columns=('type', 'user'),
+        ),
+    ),
+    'ads_setting': (
+        JsonSpec(
+            member='ads_information/instagram_ads_and_businesses/subscription_for_no_ads.json',
+            records='label_values',
+            fields=(
+                constant('type', 'subscription_no_ads'),
+                JsonField('status', ('value',)),
+            ),
+            columns=('type', 'status'),
+            limit=1,
+        ),
+    ),
+    'account_searches': (
+        _searches(
+            'logged_information/recent_searches/account_searches.json', 'searches_user', 'account_searched', 'user_name'
+        ),
+    ),
+    'word_or_phrase_searches': (
+        _searches(
+            'logged_information/recent_searches/word_or_phrase_searches.json', 'searches_keyword', 'phrase_searched',
+            'phrase',
+        ),
+    ),
+    'off_meta_activity': (
+        JsonSpec(
+            member='apps_and_websites_off_of_instagram/apps_and_websites/your_activity_off_meta_technologies.json',
+            records='apps_and_websites_off_meta_activity',
+            fields=(
+                constant('type', 'off_meta_activity'),
+                JsonField('platform', ('name',)),
+            ),
+            columns=('type', 'platform'),
+        ),
+    ),
+    'used_devices': (
+        JsonSpec(
+            member='personal_information/device_information/devices.json',
+            records='devices_devices',
+            fields=(
+                constant('type', 'device_detected'),
+                JsonField('last_login', (MAP_DATA, 'Last Login', 'timestamp'), unit='s'),
+                JsonField('device', (MAP_DATA, 'User Agent', 'value')),
+            ),
+            columns=('type', 'last_login', 'device'),
+        ),
+    ),
+    'login_activity': (
+        JsonSpec(
+            member='security_and_login_information/login_and_account_creation/login_activity.json',
+            records='account_history_login_history',
+            fields=(
+                constant('type', 'login'),
+                JsonField('timestamp', (MAP_DATA, 'Time', 'timestamp'), unit='s'),
+                JsonField('via', (MAP_DATA, 'User Agent', 'value')),
+            ),
+            columns=('type', 'timestamp', 'via'),
+        ),
+    ),
+    'post_comments': (
+        _comments('your_instagram_activity/comments/post_comments_1.json', None, 'post_comment'),
+    ),
+    'reel_comments': (
+        _comments('your_instagram_activity/comments/reels_comments.json', 'comments_reels_comments', 'reel_comment'),
+    ),
+    'links_shared_in_dms': (
+        # Every chat file (message_1.json, message_2.json, ...) of every conversation, one row per shared link.
+        # The name of the partner is the title of the chat, which follows the messages in the file
+        JsonSpec(
+            member='your_instagram_activity/messages/inbox/*.json',
+            records='messages',
+            fields=(
+                constant('type', 'link_shared_in_dm'),
+                JsonField('partner_name', ('title',), scope='document'),
+                JsonField('sender', ('sender_name',), required=True),
+                JsonField('timestamp', ('timestamp_ms',), unit='ms', required=True),
+                JsonField('link', ('share', 'link'), required=True),
+                from_member('conversation_partner', posixpath.dirname),
+            ),
+            columns=('type', 'timestamp', 'link', 'sender', 'conversation_partner'),
+            post=(_dm_sender,),
+        ),
+    ),
+}
+
+
+def extract_all_json(
+    zip_file: str | ArchiveSession,
+    names: list[str] | None = None,
+    stream: bool | None = None,
+    labels: dict[str, str] | None = None,
+    timestamps: str = 'text',
+) -> dict[str, pd.DataFrame]:
+    """
+    extracts the tables in names (all tables by default) in one pass over the export,
+    returns table name -> DataFrame
+    labels are the labels of the export language (see port.archive_profile), English by default
+    timestamps "epoch" keeps the timestamps as epoch numbers instead of text (see port.extraction_json.extract_tables)
+    """
+    if names is None:
+        names = list(TABLES)
+    return extract_tables({name: TABLES[name] for name in names}, zip_file, stream, labels, timestamps)
+
+def extract_all_json_stages(
+    zip_file: str | ArchiveSession,
+    names: list[str] | None = None,
+    stream: bool | None = None,
+    labels: dict[str, str] | None = None,
+    timestamps: str = 'text',
+    meters: dict | None = None,
+):
+    """
+    extract_all_json in stages: yields a MemberDone after every member, returns the tables (see port.progress),
+    the tables are cut short on the budgets of the meters (see port.budget)
+    """
+    if names is None:
+        names = list(TABLES)
+    return extract_tables_stages({name: TABLES[name] for name in names}, zip_file, stream, labels, timestamps, meters)
+
+def extract_account_setting(zip_file: str | ArchiveSession) -> pd.DataFrame:
     """
     extracts whether account is set to private
-    NOTE: There's a German and English version depending on the download language...
-    """
-    df = pd.DataFrame()
-    try:
-        file = zipfile.ZipFile(zip_file)
-        data = []
-        with file.open('personal_information/personal_information/personal_information.json') as f:
-            temp_file = f.read()
-            json_file = json.loads(temp_file)
-            if 'Privates Konto' in json_file['profile_user'][0]['string_map_data']:
-                data.append(("account_private",json_file['profile_user'][0]['string_map_data']['Privates Konto']['value']))
-            elif 'Private account' in json_file['profile_user'][0]['string_map_data']:
-                data.append(("account_private",json_file['profile_user'][0]['string_map_data']['Privates Konto']['value']))
-            
-            df = pd.DataFrame(data, columns=["type","setting"])
-    except Exception as e:
-        print(f"Something went wrong: {e}")
-
-    return df
-def extract_likes(zip_file: str) -> pd.DataFrame:
+    NOTE: There's a German and English version depending on the download language, see port.archive_profile
+    """
+    with open_archive(zip_file) as archive:
+        labels = profile_archive(archive).labels
+        return extract_tables({'account_setting': TABLES['account_setting']}, archive, labels=labels)['account_setting']
+
+def extract_likes(zip_file: str | ArchiveSession, stream: bool | None = None) -> pd.DataFrame:
     """
     extracts user's liked comments and posts
     NOTE/TEST: Are liked posts and comments all you can like?
-    NOTE: What about the keys?
-    """
-    df = pd.DataFrame()
-    try:
-        file = zipfile.ZipFile(zip_file)
-        data = []
-        with file.open('your_instagram_activity/likes/liked_posts.json') as f:
-            temp_file = f.read()
-            json_file = json.loads(temp_file)
-            for key in json_file.keys():
-                for entry in json_file[key]:
-                    data.append((key,entry['string_list_data'][0]['timestamp'], 
-                        entry['title'],entry['string_list_data'][0]['href']))
-
-
-    except Exception as e:
-        print(f"Something went wrong: {e}")
-        
-    try:
-        file = zipfile.ZipFile(zip_file)
-        with file.open('your_instagram_activity/likes/liked_comments.json') as f:
-            temp_file = f.read()
-            json_file = json.loads(temp_file)
-            for key in json_file.keys():
-                for entry in json_file[key]:
-                    data.append((key,entry['string_list_data'][0]['timestamp'], entry['title'],
-                                 entry['string_list_data'][0]['href']))
-    except Exception as e:
-        print(f"Something went wrong: {e}")
-        
-    df = pd.DataFrame(data, columns=["type","timestamp","user_name","link"])
-
-    return df
-
-def extract_following(zip_file: str) -> pd.DataFrame:
+    """
+    return extract_table(TABLES['likes'], zip_file, stream)
+
+def extract_following(zip_file: str | ArchiveSession, stream: bool | None = None) -> pd.DataFrame:
     """
     extracts list of users that the donor follows
-    NOTE: What about the keys?
     """
-    df = pd.DataFrame()
-    try:
-        file = zipfile.ZipFile(zip_file)
-        data = []
-        with file.open('connections/followers_and_following/following.json') as f:
-            temp_file = f.read()
-            json_file = json.loads(temp_file)
-            for key in json_file.keys():
-                for entry in json_file[key]:
-                    data.append((key,entry['string_list_data'][0]['timestamp'], 
-                        entry['string_list_data'][0]['value'],entry['string_list_data'][0]['href']))
+    return extract_table(TABLES['following'], zip_file, stream)
 
-            df = pd.DataFrame(data, columns=["type","timestamp","name","link"])
-    except Exception as e:
-        print(f"Something went wrong: {e}")
-
-    return df
-
-def extract_followers(zip_file: str) -> pd.DataFrame:
+def extract_followers(zip_file: str | ArchiveSession, stream: bool | None = None) -> pd.DataFrame:
     """
     extracts list of followers of the donor
-    NOTE/TEST: for large followings, is there another file called e.g. followers_2.json?
+    large followings are split over followers_1.json, followers_2.json, ..., all parts are read
     """
-    df = pd.DataFrame()
-    try:
-        file = zipfile.ZipFile(zip_file)
-        data = []
-        with file.open('connections/followers_and_following/followers_1.json') as f:
-            temp_file = f.read()
-            json_file = json.loads(temp_file)
-            for entry in json_file:
-                data.append(("follower",entry['string_list_data'][0]['timestamp'], 
-                    entry['string_list_data'][0]['value'],entry['string_list_data'][0]['href']))
-
-            df = pd.DataFrame(data, columns=["type","timestamp","name","link"])
-    except Exception as e:
-        print(f"Something went wrong: {e}")
-
-    return df
+    return extract_table(TABLES['followers'], zip_file, stream)
 
-def extract_your_topics(zip_file: str) -> pd.DataFrame:
+def extract_your_topics(zip_file: str | ArchiveSession) -> pd.DataFrame:
     """
     extracts topics Instagram thinks the user is interested in
     """
-    df = pd.DataFrame()
-    try:
-        file = zipfile.ZipFile(zip_file)
-        data = []
-        with file.open('preferences/your_topics/your_topics.json') as f:
-            temp_file = f.read()
-            json_file = json.loads(temp_file)
-            for key in json_file.keys():
-                for entry in json_file[key]:
-                    data.append((key,entry['string_map_data']['Name']['value']))
+    return extract_table(TABLES['your_topics'], zip_file)
 
-            df = pd.DataFrame(data, columns=["type","topic"])
-    except Exception as e:
-        print(f"Something went wrong: {e}")
-
-    return df
-
-def extract_saved_posts(zip_file: str) -> pd.DataFrame:
+def extract_saved_posts(zip_file: str | ArchiveSession, stream: bool | None = None) -> pd.DataFrame:
     """
     extracts list of saved posts of the donor
-    NOTE: What about the keys?
-    """
-    df = pd.DataFrame()
-    try:
-        file = zipfile.ZipFile(zip_file)
-        data = []
-        with file.open('your_instagram_activity/saved/saved_posts.json') as f:
-            temp_file = f.read()
-            json_file = json.loads(temp_file)
-            for key in json_file.keys():
-                for entry in json_file[key]:
-                    data.append((key,entry['string_map_data']['Saved on']['timestamp'],entry['title'],
-                        entry['string_map_data']['Saved on']['href']))
-
-        df = pd.DataFrame(data, columns=["type","timestamp","name","link"])
-    except Exception as e:
-        print(f"Something went wrong: {e}")
-
-    return df
-
+    """
+    return extract_table(TABLES['saved_posts'], zip_file, stream)
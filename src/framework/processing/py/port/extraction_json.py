@@ -0,0 +1,343 @@
+"""
+Generic extraction engine for the JSON export
+
+The JSON counterpart of port.extraction_engine, with the same table contract:
+every table is described by one or more JsonSpec objects and extract_tables
+returns table name -> DataFrame with the columns of the HTML table.
+The tables are extracted by the driver of port.extraction_engine, JsonRecords reads the members.
+
+A JSON record is a decoded object, so a JsonField is a path of keys into it rather than an xpath.
+Every member is read once, the records are streamed (see port.json_records) unless a spec
+needs a value from outside the records. Timestamps are epoch numbers in the JSON export:
+they are kept as numbers while the rows are collected, so the parts of a member are merged
+on them directly, and are converted for a whole column at once when the DataFrame is built.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Generator
+
+import numpy as np
+import pandas as pd
+
+from port.archive import ArchiveIndex, ArchiveSession
+from port.budget import Meter
+from port.extraction_engine import (
+    MISSING, Projection, RecordSource, extract_source_stages, feed_records, resolve_members,
+)
+from port.html_records import should_stream
+from port.json_records import iter_records, load_document, records_of
+from port.progress import MemberDone, run_stages
+
+
+_MONTH_NAMES = {number: month for number, month in enumerate(
+    ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), start=1
+)}
+
+
+def fix_encoding(value: str) -> str:
+    """
+    Undoes the double encoding of the JSON export
+
+    Meta writes the UTF-8 bytes of a text as separate latin-1 characters ('\\u00c3\\u00a4' for 'ä').
+    """
+    if value.isascii():
+        return value
+    try:
+        return value.encode("latin-1").decode("utf-8")
+    except UnicodeError:
+        return value
+
+
+def format_timestamps(values: pd.Series, unit: str = "s") -> pd.Series:
+    """
+    Converts a column of epoch timestamps to the notation of the HTML export, 'Jan 28, 2024 1:00pm' (UTC)
+
+    Values that are not a timestamp become missing values.
+    """
+    numbers = pd.to_numeric(values, errors="coerce")
+    valid = numbers.notna()
+    if not valid.any():
+        return pd.Series([None] * len(values), index=values.index, dtype=object)
+    times = pd.to_datetime(numbers[valid], unit=unit, utc=True).reindex(values.index)
+
+    def number(component: pd.Series) -> pd.Series:
+        return component.astype("Int64").astype(str)
+
+    hour = times.dt.hour
+    text = (
+        times.dt.month.map(_MONTH_NAMES) + " " + number(times.dt.day) + ", " + number(times.dt.year) + " "
+        + number((hour + 11) % 12 + 1) + ":" + number(times.dt.minute).str.zfill(2)
+        + pd.Series(np.where(hour < 12, "am", "pm"), index=values.index)
+    )
+    return text.where(valid, None)
+
+
+@dataclass(frozen=True)
+class JsonField:
+    """
+    A value taken from every record
+
+    Attributes:
+        name: name of the field, output columns refer to fields by name
+        path: keys (and list indices) leading to the value, relative to the element given by scope.
+            A key can be a tuple of alternatives, the first one the object has is taken,
+            for labels that differ between export languages
+        clean: post-processor applied to the value (if there is a value)
+        required: records for which the path finds nothing are skipped
+        scope: what path is evaluated against
+            "record": the record
+            "document": the decoded member, for values outside of the records
+            "member": no path, clean is called with the member path relative to the member pattern
+            "constant": no path, the value is the constant
+        value: the value of a constant field
+        unit: the unit of an epoch timestamp ("s" or "ms"),
+            the column is converted with format_timestamps
+    """
+
+    name: str
+    path: tuple = ()
+    clean: Callable[[Any], Any] | None = None
+    required: bool = False
+    scope: str = "record"
+    value: Any = None
+    unit: str | None = None
+
+    def localize(self, labels: dict[str, str]) -> "JsonField":
+        """
+        The field for an export in another language, labels maps English labels to the labels of the export
+        """
+        def translate(step):
+            if isinstance(step, tuple):
+                return tuple(dict.fromkeys(labels.get(key, key) for key in step))
+            return labels.get(step, step) if isinstance(step, str) else step
+
+        return replace(self, path=tuple(translate(step) for step in self.path))
+
+    def pick(self, element: Any) -> Any:
+        value = element
+        try:
+            for step in self.path:
+                if isinstance(step, tuple):
+                    step = next((key for key in step if key in value), step[0])
+                value = value[step]
+        except (KeyError, IndexError, TypeError):
+            return MISSING
+        if isinstance(value, str):
+            value = fix_encoding(value)
+        if self.clean is not None:
+            value = self.clean(value)
+        return value
+
+
+def constant(name: str, value: Any) -> JsonField:
+    return JsonField(name, scope="constant", value=value)
+
+
+def from_member(name: str, clean: Callable[[str], Any]) -> JsonField:
+    return JsonField(name, scope="member", clean=clean)
+
+
+@dataclass(frozen=True)
+class JsonSpec:
+    """
+    How to extract the rows of a table from one member (pattern) of the JSON export
+
+    Attributes:
+        member: path of the member (the trailing part is enough), or a pattern,
+            see ExtractorSpec.member. All numbered parts of a member are read
+        records: the key of the array of records in the top-level object,
+            None if the member is the array
+        fields: the fields taken from every record
+        columns: names of the fields that make up the output rows, in order
+        post: post-processors applied to every row (a dict with all fields),
+            they return the (changed) row or None to drop it
+        explode: name of a list field, one row is emitted per value in the list
+        limit: only the first limit records are considered
+        merge_on: the column the rows of the parts of a member are merged on, newest first,
+            None keeps the rows in part order
+    """
+
+    member: str
+    records: str | None
+    fields: tuple[JsonField, ...]
+    columns: tuple[str, ...]
+    post: tuple[Callable[[dict], dict | None], ...] = ()
+    explode: str | None = None
+    limit: int | None = None
+    merge_on: str | None = "timestamp"
+
+    def __post_init__(self):
+        names = {field.name for field in self.fields}
+        missing = [column for column in self.columns if column not in names]
+        if missing:
+            raise ValueError(f"Columns {missing} of {self.member} have no field")
+        if self.merge_on not in self.columns:
+            object.__setattr__(self, "merge_on", None)
+
+    @property
+    def streamable(self) -> bool:
+        return all(field.scope != "document" for field in self.fields)
+
+    def localize(self, labels: dict[str, str]) -> "JsonSpec":
+        """
+        The spec for an export in another language, see JsonField.localize
+        """
+        if not labels:
+            return self
+        return replace(self, fields=tuple(field.localize(labels) for field in self.fields))
+
+    def resolve_members(self, index: ArchiveIndex) -> list[tuple[str, str]]:
+        return resolve_members(self.member, index)
+
+
+class _JsonProjection(Projection):
+    """
+    The rows one spec takes from one member of the JSON export
+    """
+
+    def __init__(self, spec: JsonSpec, path: str, relative: str):
+        super().__init__(spec, path, relative)
+        self.record_fields = [field for field in spec.fields if field.scope == "record"]
+        self.document_fields = [field for field in spec.fields if field.scope == "document"]
+
+    def set_document(self, document: Any) -> None:
+        for field in self.document_fields:
+            value = field.pick(document)
+            self.base[field.name] = None if value is MISSING else value
+
+    def feed(self, record: Any) -> None:
+        """
+        Turns a record into a row
+        """
+        if not self.next_record():
+            return
+
+        row = dict(self.base)
+        for field in self.record_fields:
+            value = field.pick(record)
+            if value is MISSING:
+                if field.required:
+                    return
+                value = None
+            row[field.name] = value
+        self.emit(row)
+
+
+def _epoch_key(value: Any) -> float:
+    return value if isinstance(value, (int, float)) else float("-inf")
+
+
+class JsonRecords(RecordSource):
+    """
+    Reads the members of the JSON export (see port.json_records)
+
+    Without streaming the member is decoded once, for all projections. While streaming
+    only the array of the records is decoded, once for every array the projections read.
+    Decoding holds the GIL, so members are read one after the other.
+
+    Args:
+        timestamps: "text" converts epoch timestamps to the notation of the HTML export (see format_timestamps),
+            "epoch" keeps them as numbers, for port.timestamps
+    """
+
+    def __init__(self, timestamps: str = "text"):
+        self.timestamps = timestamps
+
+    def projection(self, spec: JsonSpec, path: str, relative: str) -> _JsonProjection:
+        return _JsonProjection(spec, path, relative)
+
+    def read_member(
+        self, archive: ArchiveSession, path: str, projections: list[_JsonProjection], stream: bool | None
+    ) -> None:
+        stream = all(projection.spec.streamable for projection in projections) \
+            and should_stream(archive.index.info(path).file_size, stream)
+
+        arrays = {}
+        for projection in projections:
+            arrays.setdefault(projection.spec.records, []).append(projection)
+
+        if stream:
+            for key, group in arrays.items():
+                with archive.open(path) as f:
+                    feed_records(group, iter_records(f, key, stream=True), _JsonProjection.feed)
+            return
+
+        with archive.open(path) as f:
+            document = load_document(f)
+        for key, group in arrays.items():
+            for projection in group:
+                projection.set_document(document)
+            feed_records(group, records_of(document, key), _JsonProjection.feed)
+
+    def merge_key(self, value: Any) -> float:
+        return _epoch_key(value)
+
+    def finish(self, df: pd.DataFrame, specs: tuple[JsonSpec, ...]) -> pd.DataFrame:
+        """
+        Converts the timestamp columns (see JsonField.unit) once per table
+        """
+        for field in specs[0].fields:
+            if field.unit is not None and field.name in df.columns:
+                if self.timestamps == "epoch":
+                    df[field.name] = pd.to_numeric(df[field.name], errors="coerce").astype("float64")
+                else:
+                    df[field.name] = format_timestamps(df[field.name], field.unit)
+        return df
+
+
+def extract_tables(
+    tables: dict[str, tuple[JsonSpec, ...]],
+    zip_file: str | ArchiveSession,
+    stream: bool | None = None,
+    labels: dict[str, str] | None = None,
+    timestamps: str = "text",
+) -> dict[str, pd.DataFrame]:
+    """
+    Extracts several tables in one pass over the archive, see extract_tables_stages
+    """
+    return run_stages(extract_tables_stages(tables, zip_file, stream, labels, timestamps))
+
+
+def extract_tables_stages(
+    tables: dict[str, tuple[JsonSpec, ...]],
+    zip_file: str | ArchiveSession,
+    stream: bool | None = None,
+    labels: dict[str, str] | None = None,
+    timestamps: str = "text",
+    meters: dict[str, Meter] | None = None,
+) -> Generator[MemberDone, None, dict[str, pd.DataFrame]]:
+    """
+    Extracts several tables in one pass over the archive
+
+    The JSON export read by the driver of port.extraction_engine, see extract_source_stages.
+    Timestamp columns are converted once per table (see JsonField.unit).
+
+    Args:
+        tables: table name -> the specs of the table, the specs of a table should have the same columns
+        zip_file: an opened archive, or the path to one
+        stream: force (True) or prevent (False) streaming, None decides per member on its size
+        labels: English label -> label of the export, the specs are localized once before extraction
+            (see port.archive_profile.ArchiveProfile.labels)
+        timestamps: "text" converts epoch timestamps to the notation of the HTML export (see format_timestamps),
+            "epoch" keeps them as numbers, for port.timestamps
+
+    Returns:
+        table name -> DataFrame, an empty DataFrame if something went wrong
+    """
+    if labels:
+        tables = {name: tuple(spec.localize(labels) for spec in specs) for name, specs in tables.items()}
+    return (yield from extract_source_stages(JsonRecords(timestamps), tables, zip_file, stream, meters))
+
+
+def extract_table(
+    specs: tuple[JsonSpec, ...], zip_file: str | ArchiveSession, stream: bool | None = None
+) -> pd.DataFrame:
+    """
+    Extracts a table, the rows of all specs are concatenated
+
+    Args:
+        specs: the specs of the table, they should all have the same columns
+        zip_file: an opened archive, or the path to one
+        stream: force (True) or prevent (False) streaming, None decides per member on its size
+    """
+    return extract_tables({"table": specs}, zip_file, stream)["table"]
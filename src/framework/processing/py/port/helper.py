@@ -1,24 +1,21 @@
-
 import os
 import zipfile
 
+from port.archive import ArchiveIndex
+
 def read_file_from_zip(zip_file, target_filename):
     """
-    Reads the content of a file within a ZIP archive, 
+    Resolves the path of a file within a ZIP archive,
     searching through subdirectories.
 
+    The lookup goes through the ArchiveIndex of the archive,
+    which is built once per ZipFile, so repeated lookups do not rescan the archive.
+
     Args:
-        zip_filename: The name of the ZIP file.
-        target_filename: The name of the file to read.
+        zip_file: The opened ZipFile.
+        target_filename: The (trailing part of the) path of the file to find.
 
     Returns:
-        The file content as bytes, or None if the file is not found.
+        The full path of the file in the archive, or None if the file is not found.
     """
-    for info in zip_file.infolist():
-        #print(info.filename, target_filename)
-
-        if info.filename.endswith(target_filename):  # Match filename at the end
-            #print("ENDFILENAME MATCH")
-            path = info.filename
-            return path  # Read and return file content
-    return None  # File not found in the ZIP
+    return ArchiveIndex.from_zip(zip_file).find(target_filename)
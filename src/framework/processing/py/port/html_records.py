@@ -0,0 +1,133 @@
+"""
+Record iteration over the HTML members of an export
+
+The Instagram HTML export stores one record (a viewed post, a login, a message, ...)
+per container element, for example <div class="pam _3-95 _2ph- _a6-g uiBoxWhite noborder">.
+iter_records yields these containers in document order in one of two modes:
+
+* DOM mode: the whole member is parsed with etree.parse and its class attributes are
+  indexed (see port.class_selectors.ClassIndex), the records are looked up in the index
+* streaming mode: the member is parsed incrementally with etree.iterparse,
+  every container is yielded as soon as it is complete and cleared afterwards,
+  so memory use does not grow with the size of the member
+
+Per-record queries (relative xpaths such as ".//td//text()") give the same
+results in both modes, document-wide queries are not available while streaming.
+"""
+
+from typing import IO, Iterator
+
+from lxml import etree
+
+from port.class_selectors import ClassIndex, ClassSelector
+
+
+# Members larger than this (uncompressed) are streamed when the mode is left to the extractor
+STREAM_THRESHOLD_BYTES = 4 * 1024 * 1024
+
+
+def should_stream(file_size: int, stream: bool | None = None) -> bool:
+    """
+    Decides on the parse mode for a member, stream=None means: decide on file size
+    """
+    if stream is None:
+        return file_size > STREAM_THRESHOLD_BYTES
+    return stream
+
+
+class RecordSelector:
+    """
+    Selects record containers: elements with tag that carry all class tokens of one of classes
+
+    Without classes every element with tag is a record.
+    """
+
+    def __init__(self, tag: str, classes: str | tuple[str, ...] = ()):
+        if isinstance(classes, str):
+            classes = (classes,)
+        self.tag = tag
+        self.classes = classes
+        self.class_selectors = tuple(ClassSelector(tag, cls) for cls in classes)
+        self.xpath = etree.XPath(f"//{tag}")
+
+    def __repr__(self) -> str:
+        return f"RecordSelector({self.tag!r}, {self.classes!r})"
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, RecordSelector) and (self.tag, self.classes) == (other.tag, other.classes)
+
+    def __hash__(self) -> int:
+        return hash((self.tag, self.classes))
+
+    def __or__(self, other: "RecordSelector") -> "RecordSelector":
+        if other.tag != self.tag or not (self.classes and other.classes):
+            raise ValueError(f"Cannot combine {self!r} and {other!r}")
+        return RecordSelector(self.tag, self.classes + other.classes)
+
+    def matches(self, element: etree._Element) -> bool:
+        if element.tag != self.tag:
+            return False
+        if not self.classes:
+            return True
+        return any(selector.matches(element) for selector in self.class_selectors)
+
+    def select(self, index: ClassIndex) -> list[etree._Element]:
+        """
+        All records of an indexed document, in document order
+        """
+        if not self.classes:
+            return self.xpath(index.root)
+        return index.select_any(self.class_selectors)
+
+
+def index_document(f: IO[bytes]) -> ClassIndex | None:
+    """
+    DOM mode: parses the member and indexes its class attributes, None for an empty member
+
+    The records of one or more selectors are then looked up with RecordSelector.select.
+    """
+    # Parsing from bytes, rather than from the file object, runs without the GIL
+    data = f.read()
+    if not data.strip():
+        return None
+    root = etree.fromstring(data, etree.HTMLParser())
+    if root is None:
+        return None
+    return ClassIndex(root)
+
+
+def iter_records(f: IO[bytes], selector: RecordSelector, stream: bool = False) -> Iterator[etree._Element]:
+    """
+    Yields all elements matched by selector, in document order
+
+    Args:
+        f: the opened HTML member
+        selector: selects the record containers
+        stream: parse incrementally and clear every record after it has been processed
+    """
+    if not stream:
+        index = index_document(f)
+        if index is not None:
+            yield from selector.select(index)
+        return
+
+    for _, element in etree.iterparse(f, events=("end",), tag=selector.tag, html=True):
+        if not selector.matches(element):
+            continue
+
+        # A record nested in another record is yielded after its ancestor,
+        # in document order, like the DOM mode does
+        if any(selector.matches(ancestor) for ancestor in element.iterancestors(selector.tag)):
+            continue
+
+        yield element
+        for nested in element.iterdescendants(selector.tag):
+            if selector.matches(nested):
+                yield nested
+
+        # The record is processed: drop it, and everything before it, from the tree
+        element.clear(keep_tail=True)
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
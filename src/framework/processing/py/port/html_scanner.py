@@ -0,0 +1,217 @@
+"""
+Byte-level record scanner for the uniform pages of the HTML export
+
+The export is machine generated: on pages such as posts_viewed.html or devices.html every
+record has exactly the same markup, only the texts differ. For these pages a RecordTemplate
+describes the markup of one record, and scan finds the records and their texts with one
+regular expression over the bytes of the member, without building a tree.
+
+The scanner only answers when it is sure to give what lxml gives. Anything it does not
+expect (a record that does not fit the template, comments or scripts in the body,
+an entity or character that lxml might read differently, no UTF-8 declaration)
+makes scan return None, and the member is parsed with lxml instead.
+scan_file does the same for a member that is streamed, reading it a chunk at a time.
+"""
+
+import re
+from typing import IO
+
+from port.html_records import RecordSelector
+
+
+# Texts with other entities are left to lxml
+_NAMED_ENTITIES = {b"amp": "&", b"lt": "<", b"gt": ">", b"quot": '"', b"apos": "'", b"nbsp": "\xa0"}
+_ENTITY = re.compile(rb"&(?:#(?P<decimal>\d{1,7})|#[xX](?P<hex>[0-9a-fA-F]{1,6})|(?P<name>[A-Za-z]+));")
+_UNEXPECTED_CHARACTERS = re.compile(rb"[\x00-\x08\x0b-\x1f\x7f]")
+_UTF8_DECLARATION = re.compile(rb"<meta[^>]*charset=[\"']?utf-8", re.IGNORECASE)
+# Parts of a body in which markup is not what it seems
+_UNEXPECTED_MARKUP = (b"<!--", b"<script", b"<textarea", b"<![CDATA[")
+
+# Bytes read at once by RecordTemplate.scan_file
+SCAN_CHUNK_BYTES = 1024 * 1024
+
+_PLACEHOLDER = re.compile(r"\{(?P<name>\w*)\}|<(?P<tag>\w+)\.\.\.>")
+
+
+class UnexpectedMarkup(Exception):
+    pass
+
+
+def _character(number: int) -> str:
+    # Code points lxml and the HTML standard treat differently are left to lxml
+    if number < 0x20 and number not in (0x09, 0x0a) or 0x7f <= number <= 0x9f \
+            or 0xd800 <= number <= 0xdfff or number > 0x10ffff:
+        raise UnexpectedMarkup(f"character reference {number}")
+    return chr(number)
+
+
+def _entity(match: re.Match) -> str:
+    if match["decimal"] is not None:
+        return _character(int(match["decimal"]))
+    if match["hex"] is not None:
+        return _character(int(match["hex"], 16))
+    try:
+        return _NAMED_ENTITIES[match["name"]]
+    except KeyError:
+        raise UnexpectedMarkup(f"entity {match['name']!r}") from None
+
+
+def unescape(text: bytes) -> str:
+    """
+    The text of a text node as lxml reads it, raises UnexpectedMarkup where it cannot be sure
+    """
+    if _UNEXPECTED_CHARACTERS.search(text) is not None:
+        raise UnexpectedMarkup("control character")
+    if b"&" in text:
+        if text.count(b"&") != len(_ENTITY.findall(text)):
+            raise UnexpectedMarkup("bare ampersand")
+        return _ENTITY.sub(lambda match: _entity(match).encode("utf-8"), text).decode("utf-8")
+    return text.decode("utf-8")
+
+
+class RecordTemplate:
+    """
+    The markup of one record, as in the export, with placeholders:
+
+    * {name}: a text (that can be empty), the value of the field name,
+      {} is a text that is not used
+    * <tag...>: a start tag with any attributes
+
+    Everything else has to be in the member exactly as written. The fields of the template
+    give the first text of the xpath of the field in a record that fits the template,
+    None where the text is empty (there is no text node).
+    """
+
+    def __init__(self, records: RecordSelector, markup: str):
+        self.records = records
+        self.markup = markup
+        self.fields = []
+        pattern = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(markup):
+            pattern.append(re.escape(markup[position:match.start()]))
+            if match["tag"] is not None:
+                pattern.append(f"<{match['tag']}(?:\\s[^>]*)?>")
+            elif match["name"]:
+                self.fields.append(match["name"])
+                pattern.append(f"(?P<{match['name']}>[^<]*)")
+            else:
+                pattern.append("[^<]*")
+            position = match.end()
+        pattern.append(re.escape(markup[position:]))
+        self.pattern = re.compile("".join(pattern).encode("utf-8"))
+        # How every record starts: the markup up to the first placeholder, or the tag of a start tag placeholder
+        first = _PLACEHOLDER.search(markup)
+        start = markup[:first.start()] if first is not None else markup
+        if not start and first["tag"] is not None:
+            start = f"<{first['tag']}"
+        self.start = (start or "<").encode("utf-8")
+        self.tokens = [token.encode("utf-8") for selector in records.class_selectors for token in selector.tokens]
+
+    def __repr__(self) -> str:
+        return f"RecordTemplate({self.records!r}, {self.markup!r})"
+
+    def scan(self, data: bytes) -> list[dict[str, str | None]] | None:
+        """
+        The field values of all records of a member in document order, None if the member does not fit
+        """
+        try:
+            return self._scan(data)
+        except (UnexpectedMarkup, UnicodeDecodeError):
+            return None
+
+    def scan_file(self, f: IO[bytes], chunk_size: int = SCAN_CHUNK_BYTES) -> list[dict[str, str | None]] | None:
+        """
+        scan for a member that is not read whole: the member is read chunk_size bytes at a time,
+        only the bytes after the last record found are kept for the next chunk
+        """
+        try:
+            return self._scan_file(f, chunk_size)
+        except (UnexpectedMarkup, UnicodeDecodeError):
+            return None
+
+    def _scan_file(self, f: IO[bytes], chunk_size: int) -> list[dict[str, str | None]]:
+        head = b""
+        while b"<body" not in head:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise UnexpectedMarkup("no UTF-8 document")
+            head += chunk
+        body_start = head.find(b"<body")
+        if _UTF8_DECLARATION.search(head, 0, body_start) is None:
+            raise UnexpectedMarkup("no UTF-8 document")
+
+        records = []
+        counts = {token: 0 for token in self.tokens}
+        buffer = head[body_start:]
+        end = False
+        while True:
+            if b"\r" in buffer:
+                raise UnexpectedMarkup("carriage return")
+            if any(marker in buffer for marker in _UNEXPECTED_MARKUP):
+                raise UnexpectedMarkup("comment or script")
+            matches = list(self.pattern.finditer(buffer))
+            if end:
+                consumed = len(buffer)
+            else:
+                # A record can continue in the next chunk: only records that end before the end
+                # of the buffer are taken. The rest is kept from where the last record can start,
+                # and scanned again with the next chunk: the last start of a record, else a start
+                # cut by the end of the buffer, else the last tag. It is cut at a "<", so no class token is cut
+                while matches and matches[-1].end() == len(buffer):
+                    matches.pop()
+                consumed = matches[-1].end() if matches else 0
+                start = buffer.rfind(self.start, consumed)
+                if start < 0:
+                    start = buffer.find(b"<", max(consumed, len(buffer) - len(self.start) + 1))
+                if start < 0:
+                    start = buffer.rfind(b"<", consumed)
+                consumed = max(consumed, start)
+            # The token count of scan, for the part of the body that is done
+            for token in self.tokens:
+                counts[token] += buffer.count(token, 0, consumed) - sum(
+                    match.group(0).count(token) for match in matches
+                )
+            for match in matches:
+                records.append({
+                    name: unescape(text) if text else None
+                    for name, text in match.groupdict().items()
+                })
+            if end:
+                break
+            buffer = buffer[consumed:]
+            chunk = f.read(chunk_size)
+            end = not chunk
+            buffer += chunk
+
+        if not any(count == 0 for count in counts.values()):
+            raise UnexpectedMarkup("a record that does not fit the template")
+        return records
+
+    def _scan(self, data: bytes) -> list[dict[str, str | None]]:
+        body_start = data.find(b"<body")
+        if body_start < 0 or _UTF8_DECLARATION.search(data, 0, body_start) is None:
+            raise UnexpectedMarkup("no UTF-8 document")
+        if b"\r" in data:
+            raise UnexpectedMarkup("carriage return")
+        body = data[body_start:]
+        if any(marker in body for marker in _UNEXPECTED_MARKUP):
+            raise UnexpectedMarkup("comment or script")
+
+        matches = list(self.pattern.finditer(body))
+
+        # Every record of the member has to be matched: records that do not fit the template still carry
+        # the class tokens of the records. It is enough that one token occurs nowhere outside the matches
+        if not any(
+            body.count(token) == sum(match.group(0).count(token) for match in matches)
+            for token in self.tokens
+        ):
+            raise UnexpectedMarkup("a record that does not fit the template")
+
+        records = []
+        for match in matches:
+            records.append({
+                name: unescape(text) if text else None
+                for name, text in match.groupdict().items()
+            })
+        return records
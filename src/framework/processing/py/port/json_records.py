@@ -0,0 +1,167 @@
+"""
+Record iteration over the JSON members of an export
+
+The JSON export stores the records of a page as one array: either the document itself
+(followers_1.json) or the value of a key of the top-level object
+({"likes_media_likes": [...]}). iter_records yields the elements of that array in order:
+
+* document mode: the member is decoded with json.loads and the array is taken from it
+* streaming mode: the member is decoded in chunks and every element is decoded with
+  json.JSONDecoder.raw_decode as soon as it is complete, the rest of the document is skipped,
+  so memory use does not grow with the length of the array
+
+Both modes yield the same records.
+"""
+
+import codecs
+import json
+import re
+from typing import IO, Any, Iterator
+
+
+CHUNK_SIZE = 64 * 1024
+
+_DECODER = json.JSONDecoder()
+_NON_WHITESPACE = re.compile(r"[^ \t\n\r]")
+
+
+class _Reader:
+    """
+    A window over the decoded text of a member, it is refilled as values are consumed
+    """
+
+    def __init__(self, f: IO[bytes], chunk_size: int):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """
+        Appends the next chunk to what is left of the buffer, False at the end of the member
+
+        A value that does not fit is read in chunks as large as the buffer,
+        so it is decoded a logarithmic number of times.
+        """
+        if self.eof:
+            return False
+        chunk = self._f.read(max(self._chunk_size, len(self.buffer) - self.position))
+        self.eof = not chunk
+        self.buffer = self.buffer[self.position:] + self._decoder.decode(chunk, final=self.eof)
+        self.position = 0
+        return not self.eof
+
+    def peek(self) -> str:
+        """
+        The next character that is not whitespace, "" at the end of the member
+        """
+        while True:
+            match = _NON_WHITESPACE.search(self.buffer, self.position)
+            if match is not None:
+                self.position = match.start()
+                return self.buffer[self.position]
+            self.position = len(self.buffer)
+            if not self.fill():
+                return ""
+
+    def expect(self, character: str) -> None:
+        found = self.peek()
+        if found != character:
+            raise ValueError(f"Expected {character!r} but found {found or 'the end of the member'!r}")
+        self.position += 1
+
+    def value(self) -> Any:
+        """
+        Decodes the next value
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number at the end of the buffer can go on in the next chunk
+            if end == len(self.buffer) and self.fill():
+                continue
+            self.position = end
+            return value
+
+
+def _elements(reader: _Reader) -> Iterator[Any]:
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.position += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.peek() == "]":
+            reader.position += 1
+            return
+        reader.expect(",")
+
+
+def _stream(f: IO[bytes], key: str | None, chunk_size: int) -> Iterator[Any]:
+    reader = _Reader(f, chunk_size)
+    if reader.peek() == "":
+        return
+    if key is None:
+        yield from _elements(reader)
+        return
+
+    reader.expect("{")
+    if reader.peek() != "}":
+        while True:
+            name = reader.value()
+            reader.expect(":")
+            if name == key:
+                yield from _elements(reader)
+                return
+            reader.value()
+            if reader.peek() == "}":
+                break
+            reader.expect(",")
+    raise KeyError(f"There is no {key!r} in the member")
+
+
+def load_document(f: IO[bytes]) -> Any:
+    """
+    Document mode: decodes the whole member, None for an empty member
+    """
+    data = f.read()
+    if not data.strip():
+        return None
+    return json.loads(data)
+
+
+def records_of(document: Any, key: str | None) -> list:
+    """
+    The records of a decoded member: the document itself or the array under key
+    """
+    if document is None:
+        return []
+    records = document if key is None else document[key]
+    if not isinstance(records, list):
+        raise ValueError(f"Expected an array of records, found {type(records).__name__}")
+    return records
+
+
+def iter_records(
+    f: IO[bytes], key: str | None = None, stream: bool = False, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Any]:
+    """
+    Yields the records of a JSON member, in document order
+
+    Args:
+        f: the opened JSON member
+        key: the key of the array in the top-level object, None if the document is the array
+        stream: decode the records one at a time, without decoding the rest of the document
+        chunk_size: how many bytes are read at once while streaming
+    """
+    if not stream:
+        yield from records_of(load_document(f), key)
+        return
+    yield from _stream(f, key, chunk_size)
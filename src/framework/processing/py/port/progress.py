@@ -0,0 +1,95 @@
+"""
+Progress of the extraction
+
+The engines have a staged variant of extract_tables: a generator that yields a MemberDone after
+every member it has read and returns the tables (see port.extraction.extract_all_stages).
+The stages of an extraction are run to the end by run_stages, or one by one by script.process,
+which renders the Progress in between so the participant does not look at a frozen page.
+A render costs a round trip to the page, Throttle keeps it to a small share of the extraction time.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Generator, TypeVar
+
+
+T = TypeVar('T')
+
+
+@dataclass
+class MemberDone:
+    """
+    A member has been read: its path, the tables it was read for and its uncompressed size
+    """
+    path: str
+    tables: tuple[str, ...]
+    size: int
+
+
+@dataclass
+class Progress:
+    """
+    How far the extraction of an archive is: the bytes of the members to extract that have been read
+    """
+    bytes_total: int
+    bytes_done: int = 0
+    table: str | None = None
+    started: float = field(default_factory=time.perf_counter)
+
+    def advance(self, member: MemberDone) -> None:
+        self.bytes_done = min(self.bytes_total, self.bytes_done + member.size)
+        if member.tables:
+            self.table = member.tables[0]
+
+    @property
+    def percentage(self) -> int:
+        if self.bytes_total == 0:
+            return 100
+        return int(100 * self.bytes_done / self.bytes_total)
+
+    @property
+    def eta(self) -> float | None:
+        """
+        Seconds left at the rate so far, None before anything has been read
+        """
+        if self.bytes_done == 0:
+            return None
+        elapsed = time.perf_counter() - self.started
+        return elapsed * (self.bytes_total - self.bytes_done) / self.bytes_done
+
+
+def run_stages(stages: Generator[object, None, T]) -> T:
+    """
+    Runs the stages to the end, returns what they return
+    """
+    while True:
+        try:
+            next(stages)
+        except StopIteration as stop:
+            return stop.value
+
+
+class Throttle:
+    """
+    Decides when progress is rendered: at most every min_interval seconds, and rarely enough
+    that the renders take at most max_share of the time (a render that took 50 ms with
+    max_share 0.05 is followed by one second without renders)
+    """
+
+    def __init__(self, min_interval: float = 0.25, max_share: float = 0.05):
+        self.min_interval = min_interval
+        self.max_share = max_share
+        self._last: float | None = None
+        self._cost = 0.0
+
+    def due(self) -> bool:
+        if self._last is None:
+            return True
+        return time.perf_counter() - self._last >= max(self.min_interval, self._cost / self.max_share)
+
+    def rendered(self, cost: float) -> None:
+        """
+        A render took cost seconds, it ended now
+        """
+        self._last = time.perf_counter()
+        self._cost = cost
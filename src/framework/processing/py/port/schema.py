@@ -0,0 +1,142 @@
+"""
+Column types of the extracted tables
+
+The extractors build every table from rows of Python strings, so every column is an object
+column with a string per row, even the type column that holds the same value in every row.
+SCHEMAS declares per table what each column holds, and apply_schemas gives the columns
+compact types once the tables are built:
+
+    CATEGORY    few distinct values (the type column, settings), stored as a pandas categorical
+    DICTIONARY  values that repeat (account names), dictionary encoded as a pandas categorical too:
+                every distinct string is stored once, the rows are small integer codes
+    TIMESTAMP   datetime64[ns, UTC] when the timestamps are normalized (see port.timestamps),
+                otherwise text in the notation the consent form shows, dictionary encoded:
+                the export has minute resolution, so timestamps repeat too
+    ACCOUNT     account names, a categorical whose categories are shared by the account columns
+                of all tables of an archive (see intern_accounts), so the codes are account IDs.
+                Only columns that hold usernames: a value in them is taken to be an account
+    TEXT        mostly distinct values (links, comments), kept as object
+
+Columns that are not in the schema of their table are kept as they are.
+"""
+
+import pandas as pd
+
+
+CATEGORY = 'category'
+DICTIONARY = 'dictionary'
+TIMESTAMP = 'timestamp'
+TEXT = 'text'
+ACCOUNT = 'account'
+
+# A DICTIONARY column is only encoded when it has at most this share of distinct values,
+# otherwise the codes cost more than they save
+MAX_DISTINCT_SHARE = 0.5
+
+_USER_TABLE = {'type': CATEGORY, 'timestamp': TIMESTAMP, 'user_name': ACCOUNT, 'link': TEXT}
+_VIEWED_TABLE = {'type': CATEGORY, 'timestamp': TIMESTAMP, 'from_user': ACCOUNT}
+_COMMENT_TABLE = {'type': CATEGORY, 'timestamp': TIMESTAMP, 'text': TEXT, 'media_owner': ACCOUNT}
+
+# Table name -> column -> what the column holds
+SCHEMAS: dict[str, dict[str, str]] = {
+    'followers': _USER_TABLE,
+    'following': _USER_TABLE,
+    'saved_posts': _USER_TABLE,
+    'your_topics': {'type': CATEGORY, 'name': TEXT},
+    'likes': _USER_TABLE,
+    'account_setting': {'type': CATEGORY, 'value': CATEGORY},
+    'account_location': {'type': CATEGORY, 'value': CATEGORY},
+    'posts_viewed': _VIEWED_TABLE,
+    'ads_viewed': _VIEWED_TABLE,
+    # from_user holds the title of the ad
+    'ads_clicked': {'type': CATEGORY, 'timestamp': TIMESTAMP, 'from_user': CATEGORY},
+    'videos_watched': _VIEWED_TABLE,
+    'suggested_acc_viewed': {'type': CATEGORY, 'timestamp': TIMESTAMP, 'user_name': ACCOUNT},
+    'advertisers_using_info': {'type': CATEGORY, 'user': TEXT},
+    'ads_setting': {'type': CATEGORY, 'status': CATEGORY},
+    'account_searches': {'type': CATEGORY, 'timestamp': TIMESTAMP, 'user_name': ACCOUNT},
+    'word_or_phrase_searches': {'type': CATEGORY, 'timestamp': TIMESTAMP, 'phrase': DICTIONARY},
+    'off_meta_activity': {'type': CATEGORY, 'platform': TEXT},
+    'used_devices': {'type': CATEGORY, 'last_login': TIMESTAMP, 'device': DICTIONARY},
+    'login_activity': {'type': CATEGORY, 'timestamp': TIMESTAMP, 'via': DICTIONARY},
+    'post_comments': _COMMENT_TABLE,
+    'reel_comments': _COMMENT_TABLE,
+    # sender is 'self' or 'other', conversation_partner the name of the folder of the conversation in the inbox
+    'links_shared_in_dms': {
+        'type': CATEGORY, 'timestamp': TIMESTAMP, 'link': TEXT, 'sender': CATEGORY, 'conversation_partner': CATEGORY,
+    },
+}
+
+
+def memory_usage(df: pd.DataFrame) -> int:
+    """
+    Bytes held by a DataFrame, including the strings of object columns
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _is_text(values: pd.Series) -> bool:
+    return pd.api.types.is_object_dtype(values.dtype) or pd.api.types.is_string_dtype(values.dtype)
+
+
+def apply_schema(df: pd.DataFrame, schema: dict[str, str]) -> pd.DataFrame:
+    """
+    Converts the columns of a table to the types of its schema, the DataFrame is changed and returned
+    """
+    for column, kind in schema.items():
+        if column not in df.columns or not _is_text(df[column]):
+            continue
+        values = df[column]
+        if kind in (CATEGORY, ACCOUNT):
+            df[column] = values.astype('category')
+        elif kind in (DICTIONARY, TIMESTAMP) and values.nunique() <= MAX_DISTINCT_SHARE * len(values):
+            df[column] = values.astype('category')
+    return df
+
+
+def apply_schemas(tables: dict[str, pd.DataFrame], report: bool = False) -> dict[str, pd.DataFrame]:
+    """
+    Converts the tables (table name -> DataFrame) to the types of their SCHEMAS, changes and returns them
+
+    With report, the memory of every table with rows before and after is printed.
+    """
+    for name, df in tables.items():
+        schema = SCHEMAS.get(name)
+        if schema is None:
+            continue
+        before = memory_usage(df) if report else 0
+        apply_schema(df, schema)
+        if report and len(df):
+            print(f"{name}: {len(df)} rows, {before / 1024:.0f} KiB -> {memory_usage(df) / 1024:.0f} KiB")
+    return tables
+
+
+def intern_accounts(tables: dict[str, pd.DataFrame]) -> pd.Index:
+    """
+    Gives the account columns (ACCOUNT) of the tables of an archive one shared dictionary, returns it
+
+    Every account column becomes a categorical with the same categories: all account names of the archive,
+    sorted. The codes of a column (df[column].cat.codes) are then account IDs that are the same
+    in every table, so tables can be joined and accounts counted on integers. The tables are changed.
+    """
+    columns = [
+        (df, column) for name, df in tables.items() for column, kind in SCHEMAS.get(name, {}).items()
+        if kind == ACCOUNT and column in df.columns
+    ]
+    names = [
+        df[column].cat.categories if isinstance(df[column].dtype, pd.CategoricalDtype)
+        else pd.Index(df[column].dropna().unique())
+        for df, column in columns
+    ]
+    if not names:
+        return pd.Index([], dtype=object)
+    accounts = names[0].append(names[1:]).unique().sort_values()
+
+    for df, column in columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Recodes the codes through the old categories, the strings of the rows are not looked at
+            df[column] = values.cat.set_categories(accounts)
+        else:
+            df[column] = pd.Categorical(values, categories=accounts)
+    return accounts
@@ -4,8 +4,19 @@ from port.api.commands import (CommandSystemDonate, CommandUIRender, CommandSyst
 import pandas as pd
 import zipfile
 import json
+import time
 
-import port.extraction_insta_html_lxml as extraction_insta_html
+import port.extraction as extraction
+from port.archive import ArchiveSession
+from port.budget import TRUNCATED, Budget, Limits
+from port.extraction_cache import CACHE
+import port.consent as consent
+from port.donation import donation_commands
+from port.progress import Progress, Throttle
+
+
+# A table may take a minute, the extraction five: the participant gets what has been read by then
+EXTRACTION_BUDGET = Budget(table=Limits(seconds=60), session_seconds=300)
 
 
 def process(session_id: str):
@@ -19,11 +30,16 @@ def process(session_id: str):
         file_prompt_result = yield render_page(platform, file_prompt)
 
         # If the participant submitted a file: continue
-        if file_prompt_result.__type__ == 'PayloadString':
+        # Large exports are split over several zip files, the participant can submit all of them
+        if file_prompt_result.__type__ in ('PayloadString', 'PayloadStringList'):
+            if file_prompt_result.__type__ == 'PayloadString':
+                files = [file_prompt_result.value]
+            else:
+                files = list(file_prompt_result.value)
 
             # Validate the file the participant submitted
             # In general this is wise to do 
-            is_data_valid = validate_the_participants_input(file_prompt_result.value)
+            is_data_valid = validate_the_participants_input(files)
 
             # Happy flow:
             # The file the participant submitted is valid
@@ -32,31 +48,41 @@ def process(session_id: str):
                 # Extract the data you as a researcher are interested in, and put it in a pandas DataFrame
                 # Show this data to the participant in a table on screen
                 # The participant can now decide to donate
-                extracted_ads_viewed = extraction_insta_html.extract_ads_viewed_html(file_prompt_result.value)
-                extracted_posts_viewed = extraction_insta_html.extract_posts_viewed_html(file_prompt_result.value)
-                extracted_ads_clicked = extraction_insta_html.extract_ads_clicked_html(file_prompt_result.value)
-                extracted_suggested_accs_viewed = extraction_insta_html.extract_suggested_acc_viewed_html(file_prompt_result.value)
-                extracted_videos_watched = extraction_insta_html.extract_videos_watched_html(file_prompt_result.value)
-                extracted_advertisers_using_info = extraction_insta_html.extract_advertisers_using_info_html(file_prompt_result.value)
-                extracted_no_ads = extraction_insta_html.extract_ads_setting_html(file_prompt_result.value)
-                extracted_off_meta_activity = extraction_insta_html.extract_off_meta_activity_html(file_prompt_result.value)
-                extracted_followers = extraction_insta_html.extract_followers_html(file_prompt_result.value)
-                extracted_following = extraction_insta_html.extract_following_html(file_prompt_result.value)
-                extracted_acc_searches = extraction_insta_html.extract_account_searches_html(file_prompt_result.value)
-                extracted_phrase_searches = extraction_insta_html.extract_word_or_phrase_searches_html(file_prompt_result.value)
-                extracted_devices = extraction_insta_html.extract_used_devices_html(file_prompt_result.value)
-                extracted_location = extraction_insta_html.extract_account_location_html(file_prompt_result.value)
-                extracted_topics = extraction_insta_html.extract_your_topics_html(file_prompt_result.value)
-                extracted_logins = extraction_insta_html.extract_login_activity_html(file_prompt_result.value)
-                extracted_post_comments = extraction_insta_html.extract_post_comments_html(file_prompt_result.value)
-                extracted_reels_comments = extraction_insta_html.extract_reel_comments_html(file_prompt_result.value)
+                # The archive is opened once and shared by all extractors,
+                # the zip files of a split export are read as one archive
+                with ArchiveSession(files) as archive:
+                    # All tables in one pass: every member is parsed once,
+                    # by the extractors of the format (HTML or JSON) and language of the export
+                    # A participant who retries with the same export gets the tables from the cache
+                    # The columns get compact types (see port.schema)
+                    # The participant sees the progress of the extraction while it runs
+                    # Tables that take too long are cut short (see port.budget)
+                    stages = extraction.extract_all_stages(archive, cache=CACHE, budget=EXTRACTION_BUDGET)
+                    tables = yield from render_progress(platform, stages)
+
+                extracted_ads_viewed = tables['ads_viewed']
+                extracted_posts_viewed = tables['posts_viewed']
+                extracted_ads_clicked = tables['ads_clicked']
+                extracted_suggested_accs_viewed = tables['suggested_acc_viewed']
+                extracted_videos_watched = tables['videos_watched']
+                extracted_advertisers_using_info = tables['advertisers_using_info']
+                extracted_no_ads = tables['ads_setting']
+                extracted_off_meta_activity = tables['off_meta_activity']
+                extracted_followers = tables['followers']
+                extracted_following = tables['following']
+                extracted_acc_searches = tables['account_searches']
+                extracted_phrase_searches = tables['word_or_phrase_searches']
+                extracted_devices = tables['used_devices']
+                extracted_location = tables['account_location']
+                extracted_topics = tables['your_topics']
+                extracted_logins = tables['login_activity']
+                extracted_post_comments = tables['post_comments']
+                extracted_reels_comments = tables['reel_comments']
                 #extracted_insta_live ??
-                extracted_liked_posts = extraction_insta_html.extract_likes_html(file_prompt_result.value)
-                extracted_acc_setting = extraction_insta_html.extract_account_setting_html(file_prompt_result.value)
-                extracted_links_in_dms = extraction_insta_html.extract_links_shared_in_dms_html(file_prompt_result.value)
-                extracted_saved_posts = extraction_insta_html.extract_saved_posts_html(file_prompt_result.value)
-
-
+                extracted_liked_posts = tables['likes']
+                extracted_acc_setting = tables['account_setting']
+                extracted_links_in_dms = tables['links_shared_in_dms']
+                extracted_saved_posts = tables['saved_posts']
 
                 # extracted_favorites = extraction.extract_favorites(file_prompt_result.value)
                 # extracted_follower = extraction.extract_follower(file_prompt_result.value)
@@ -99,12 +125,28 @@ def process(session_id: str):
                                                         extracted_acc_setting,
                                                         extracted_links_in_dms,
                                                         extracted_saved_posts)
-                
+
+                # The consent form gets the first page of every table, the tables stay here
+                consent_tables = {table.id: table.data_frame for table in consent_prompt.tables}
+                search_texts = {}
                 consent_prompt_result = yield render_page(platform, consent_prompt)
 
-                # If the participant wants to donate the data gets donated
-                if consent_prompt_result.__type__ == "PayloadJSON":
-                    yield donate(f"{session_id}-{platform}", consent_prompt_result.value)
+                # The participant looks at further rows of a table, or searches a table:
+                # send the rows, the page stays on screen
+                while consent_prompt_result.__type__ in ("PayloadTablePageRequest", "PayloadTableSearch"):
+                    if consent_prompt_result.__type__ == "PayloadTablePageRequest":
+                        command = consent.table_page(consent_tables, consent_prompt_result.value)
+                    else:
+                        command = consent.table_search(consent_tables, consent_prompt_result.value, search_texts)
+                    consent_prompt_result = yield command
+
+                # If the participant wants to donate the data gets donated:
+                # the consent form sends the rows the participant deleted, the donation is built from the tables here
+                # A large donation is sent in compressed chunks (see port.donation)
+                if consent_prompt_result.__type__ == "PayloadConsentEdits":
+                    entries = consent.donation_entries(consent_prompt_result.value, consent_tables)
+                    for command in donation_commands(f"{session_id}-{platform}", entries):
+                        yield command
 
                 break
 
@@ -183,9 +225,9 @@ def process(session_id: str):
     return watch_df'''
 
 
-def validate_the_participants_input(zip_file: str) -> bool:
+def validate_the_participants_input(zip_file: str | list[str]) -> bool:
     """
-    Check if the participant actually submitted a zipfile
+    Check if the participant actually submitted a zipfile (or only zipfiles, for a split export)
     Returns True if participant submitted a zipfile, otherwise False
 
     In reality you need to do a lot more validation.
@@ -194,9 +236,12 @@ def validate_the_participants_input(zip_file: str) -> bool:
     - If the files are in the correct language
     """
 
+    paths = [zip_file] if isinstance(zip_file, str) else zip_file
     try:
-        with zipfile.ZipFile(zip_file) as zf:
-            return True
+        for path in paths:
+            with zipfile.ZipFile(path) as zf:
+                pass
+        return len(paths) > 0
     except zipfile.BadZipFile:
         return False
 
@@ -209,6 +254,25 @@ def render_end_page():
     return CommandUIRender(page)
 
 
+def render_progress(platform: str, stages):
+    """
+    Runs the stages of an extraction (see port.extraction.extract_all_stages), returns the tables
+
+    The progress is rendered now and then in between, a Throttle keeps the renders
+    to a small share of the time the extraction takes.
+    """
+    throttle = Throttle()
+    while True:
+        try:
+            progress = next(stages)
+        except StopIteration as stop:
+            return stop.value
+        if throttle.due():
+            start = time.perf_counter()
+            yield render_page(platform, generate_progress_prompt(platform, progress))
+            throttle.rendered(time.perf_counter() - start)
+
+
 def render_page(platform: str, body):
     """
     Renders the UI components
@@ -219,6 +283,25 @@ def render_page(platform: str, body):
     return CommandUIRender(page)
 
 
+def generate_progress_prompt(platform: str, progress: Progress) -> props.PropsUIPromptProgress:
+    description = props.Translatable({
+        "en": f"One moment please. We are reading the data in your {platform} file, "
+              "large files can take a few minutes.",
+        "nl": f"Een moment geduld. We lezen de gegevens in uw {platform} bestand, "
+              "grote bestanden kunnen een paar minuten duren."
+    })
+    table = progress.table.replace("_", " ") if progress.table else None
+    message = {
+        "en": f"Reading {table or 'your file'}: {progress.percentage}%",
+        "nl": f"Bezig met {table or 'uw bestand'}: {progress.percentage}%"
+    }
+    if progress.eta is not None and progress.percentage < 100:
+        minutes = int(progress.eta // 60)
+        message["en"] += f", about {minutes} min left" if minutes else ", less than a minute left"
+        message["nl"] += f", nog ongeveer {minutes} min" if minutes else ", nog minder dan een minuut"
+    return props.PropsUIPromptProgress(description, props.Translatable(message), progress.percentage)
+
+
 def generate_retry_prompt(platform: str) -> props.PropsUIPromptConfirm:
     text = props.Translatable({
         "en": f"Unfortunately, we cannot process your {platform} file. Continue, if you are sure that you selected the right file. Try again to select a different file.",
@@ -237,10 +320,14 @@ def generate_retry_prompt(platform: str) -> props.PropsUIPromptConfirm:
 
 def generate_file_prompt(platform, extensions) -> props.PropsUIPromptFileInput:
     description = props.Translatable({
-        "en": f"Please follow the download instructions and choose the file that you stored on your device. Click “Skip” at the right bottom, if you do not have a {platform} file. ",
-        "nl": f"Volg de download instructies en kies het bestand dat u opgeslagen heeft op uw apparaat. Als u geen {platform} bestand heeft klik dan op “Overslaan” rechts onder."
+        "en": "Please follow the download instructions and choose the file that you stored on your device. "
+              "If you received several files, choose all of them. "
+              f"Click “Skip” at the right bottom, if you do not have a {platform} file. ",
+        "nl": "Volg de download instructies en kies het bestand dat u opgeslagen heeft op uw apparaat. "
+              "Heeft u meerdere bestanden ontvangen, kies ze dan allemaal. "
+              f"Als u geen {platform} bestand heeft klik dan op “Overslaan” rechts onder."
     })
-    return props.PropsUIPromptFileInput(description, extensions)
+    return props.PropsUIPromptFileInput(description, extensions, multiple=True)
 
 
 
@@ -293,7 +380,9 @@ def generate_consent_prompt(*args: pd.DataFrame) -> props.PropsUIPromptConsentFo
             #"en": f"Your Data Donations content (Table {index + 1}/{len(args)})",
             "nl": "De inhoud van uw zip bestand"
         })
-        tables.append(props.PropsUIPromptConsentFormTable(f"zip_contents_{index}", table_title, df))
+        tables.append(props.PropsUIPromptConsentFormTable(
+            f"zip_contents_{index}", table_title, df, page_size=consent.PAGE_SIZE, truncation=df.attrs.get(TRUNCATED)
+        ))
 
     return props.PropsUIPromptConsentForm(
        tables,
@@ -0,0 +1,140 @@
+"""
+Benchmark of the ways to build the DataFrame of an extracted table
+
+The engines collect the merged rows of a table in a list of tuples and call pd.DataFrame(rows, columns=...)
+once per table (see port.extraction_engine.extract_source_stages). A columnar table type was tried
+in their place and dropped, this benchmark compares the ways on synthetic rows shaped like
+the rows of the engines (a constant, an epoch timestamp, a repeated user name and a unique link):
+
+    list of tuples   the engines: one list of row tuples, converted by pandas in C
+    row blocks       the dropped type: rows taken a chunk at a time into 2-D object arrays
+    column buffers   a list per column, the numeric columns in typed (float64) arrays
+
+Every way is measured in a fresh process, once for the time and once under tracemalloc for the peak,
+which includes the rows while they are collected. All ways must build the same DataFrame, dtypes included.
+
+    python -m port.table_benchmark [--rows 1000000] [--repeat 3]
+"""
+
+import argparse
+import gc
+import multiprocessing
+import time
+import tracemalloc
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+COLUMNS = ("type", "timestamp", "from_user", "link")
+NUMERIC = ("timestamp",)
+
+# Rows taken into a block at once by the row blocks way
+BLOCK_ROWS = 4096
+
+
+def synthetic_rows(count: int) -> Iterable[tuple]:
+    for number in range(count):
+        yield ("post_seen", 1_600_000_000 + number, f"user{number % 5000}", f"https://www.instagram.com/p/{number}")
+
+
+def _numeric(df: pd.DataFrame) -> pd.DataFrame:
+    for column in NUMERIC:
+        df[column] = pd.to_numeric(df[column], errors="coerce").astype("float64")
+    return df
+
+
+def list_of_tuples(rows: Iterable[tuple]) -> pd.DataFrame:
+    return _numeric(pd.DataFrame(list(rows), columns=list(COLUMNS)))
+
+
+def row_blocks(rows: Iterable[tuple]) -> pd.DataFrame:
+    rows = iter(rows)
+    blocks = []
+    while chunk := list(islice(rows, BLOCK_ROWS)):
+        block = np.empty((len(chunk), len(COLUMNS)), dtype=object)
+        block[:] = chunk
+        blocks.append(block)
+    data = np.concatenate(blocks) if blocks else np.empty((0, len(COLUMNS)), dtype=object)
+    return _numeric(pd.DataFrame(data, columns=list(COLUMNS)).infer_objects())
+
+
+def column_buffers(rows: Iterable[tuple]) -> pd.DataFrame:
+    buffers = [array("d") if column in NUMERIC else [] for column in COLUMNS]
+    appends = [buffer.append for buffer in buffers]
+    for row in rows:
+        for append, value in zip(appends, row):
+            append(value)
+    return pd.DataFrame({
+        column: np.frombuffer(buffer, dtype="float64") if isinstance(buffer, array) else buffer
+        for column, buffer in zip(COLUMNS, buffers)
+    })
+
+
+WAYS: dict[str, Callable[[Iterable[tuple]], pd.DataFrame]] = {
+    "list of tuples": list_of_tuples,
+    "row blocks": row_blocks,
+    "column buffers": column_buffers,
+}
+
+
+def measure(way: str, count: int, repeat: int) -> tuple[float, int]:
+    """
+    The best of repeat times and the peak bytes of building the DataFrame of count rows the given way
+    (tracemalloc slows the allocations down, so the peak is measured in a separate run)
+    """
+    build = WAYS[way]
+    seconds = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        df = build(synthetic_rows(count))
+        seconds.append(time.perf_counter() - start)
+        del df
+
+    gc.collect()
+    tracemalloc.start()
+    build(synthetic_rows(count))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(seconds), peak
+
+
+def run(count: int, repeat: int) -> dict[str, tuple[float, int]]:
+    """
+    way -> (seconds, peak bytes), every way in a fresh process
+    """
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context, max_tasks_per_child=1) as pool:
+        return {way: pool.submit(measure, way, count, repeat).result() for way in WAYS}
+
+
+def report(results: dict[str, tuple[float, int]], count: int) -> str:
+    reference_seconds, reference_peak = results["list of tuples"]
+    lines = [f"{'way':16} {'rows':>9} {'seconds':>8} {'peak MB':>8} {'time':>6} {'peak':>6}"]
+    for way, (seconds, peak) in results.items():
+        lines.append(
+            f"{way:16} {count:9} {seconds:8.3f} {peak / 1e6:8.1f} "
+            f"{seconds / reference_seconds:5.2f}x {peak / reference_peak:5.2f}x"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compares the ways to build the DataFrame of an extracted table")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="number of synthetic rows")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per way, the best one counts")
+    args = parser.parse_args(argv)
+
+    expected = list_of_tuples(synthetic_rows(1000))
+    for way, build in WAYS.items():
+        pd.testing.assert_frame_equal(build(synthetic_rows(1000)), expected, obj=way)
+    print(report(run(args.rows, args.repeat), args.rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Normalization of the timestamp columns of the extracted tables to datetime64[ns, UTC]
+
+The HTML export writes timestamps as display text in the language of the account
+('Jan 28, 2024 1:00pm'), the JSON export as epoch numbers. normalize_timestamps
+converts the timestamp columns of all tables of an archive at once: the date format is
+detected once from a sample of the values of all tables, then every column is parsed
+with that explicit format in one call, without guessing per value.
+Epoch columns (see port.extraction_json, timestamps="epoch") are converted directly.
+Times without a time zone are taken to be UTC, like the JSON export.
+"""
+
+import re
+
+import pandas as pd
+
+
+# Columns that hold a timestamp, in any table
+TIMESTAMP_COLUMNS = ('timestamp', 'last_login')
+
+# Formats of the display text, a format is only tried if it parses values in the sample
+FORMATS = (
+    '%b %d, %Y %I:%M%p',        # Jan 28, 2024 1:00pm (the narrow no-break space removed)
+    '%b %d, %Y, %I:%M%p',       # Jan 28, 2024, 1:00pm
+    '%b %d, %Y %H:%M',          # Jan 28, 2024 13:00
+    '%d. %b %Y, %H:%M',         # 28. Jan 2024, 13:00
+    '%d. %b %Y',                # 28. Jan 2024
+    '%d.%m.%Y, %H:%M',          # 28.01.2024, 13:00
+    '%b %d, %Y',                # Jan 28, 2024
+    '%d.%m.%Y',                 # 28.01.2024
+)
+
+# The month abbreviations %b parses
+ABBREVIATIONS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def _month_names(names: tuple[tuple[str, ...], ...]) -> dict[str, str]:
+    return {name: abbreviation for abbreviation, forms in zip(ABBREVIATIONS, names) for name in forms}
+
+
+# Month names of the export by language: name in the language -> English abbreviation.
+# The full names and the common abbreviations, an abbreviation may be written with a dot ('Sept.')
+MONTHS: dict[str, dict[str, str]] = {
+    'en': _month_names((
+        ('January', 'Jan'), ('February', 'Feb'), ('March', 'Mar'), ('April', 'Apr'), ('May',), ('June', 'Jun'),
+        ('July', 'Jul'), ('August', 'Aug'), ('September', 'Sept', 'Sep'), ('October', 'Oct'),
+        ('November', 'Nov'), ('December', 'Dec'),
+    )),
+    'de': _month_names((
+        ('Januar', 'Jan'), ('Februar', 'Feb'), ('März', 'Mär', 'Mrz'), ('April', 'Apr'), ('Mai',), ('Juni', 'Jun'),
+        ('Juli', 'Jul'), ('August', 'Aug'), ('September', 'Sept', 'Sep'), ('Oktober', 'Okt'),
+        ('November', 'Nov'), ('Dezember', 'Dez'),
+    )),
+}
+
+# Values the format is detected from
+SAMPLE_SIZE = 200
+
+# Epochs above this are in milliseconds (in seconds it would be after the year 5000)
+_MILLISECONDS = 10 ** 11
+
+_SPACES = re.compile(r"\s+")
+
+
+def _alternatives(names) -> str:
+    return "|".join(sorted(map(re.escape, names), key=len, reverse=True))
+
+
+def _month_pattern(months: dict[str, str]) -> re.Pattern:
+    # The month names that are not the abbreviation, and the abbreviations written with a dot:
+    # values that already have the abbreviation are left alone
+    other = [name for name, abbreviation in months.items() if name != abbreviation]
+    same = [name for name, abbreviation in months.items() if name == abbreviation]
+    return re.compile(rf"\b(?:({_alternatives(other)})\.?|({_alternatives(same)})\.)(?=\s|,|$)")
+
+
+_MONTH_PATTERNS = {language: _month_pattern(months) for language, months in MONTHS.items()}
+
+
+def _clean(values: pd.Series, language: str = 'en') -> pd.Series:
+    """
+    The text of a column ready to parse: narrow no-break spaces removed, whitespace collapsed,
+    month names in English
+    """
+    text = (
+        values.astype('string').str.replace('\u202f', '', regex=False)
+        .str.replace(_SPACES, ' ', regex=True).str.strip()
+    )
+    months = MONTHS.get(language, MONTHS['en'])
+    pattern = _MONTH_PATTERNS.get(language, _MONTH_PATTERNS['en'])
+    return text.str.replace(pattern, lambda match: months[match[1] or match[2]], regex=True)
+
+
+def _is_text(values: pd.Series) -> bool:
+    return not (pd.api.types.is_numeric_dtype(values.dtype) or pd.api.types.is_datetime64_any_dtype(values.dtype))
+
+
+def _parse(text: pd.Series, format: str) -> pd.Series:
+    return pd.to_datetime(text, format=format, errors='coerce', utc=True)
+
+
+def detect_formats(text: pd.Series) -> list[str]:
+    """
+    The FORMATS that parse values of a sample of cleaned text, the one that parses the most values first
+    """
+    sample = text.dropna()
+    if len(sample) > SAMPLE_SIZE:
+        sample = sample.sample(SAMPLE_SIZE, random_state=0)
+    counts = {format: int(_parse(sample, format).notna().sum()) for format in FORMATS}
+    return sorted((format for format in FORMATS if counts[format]), key=lambda format: -counts[format])
+
+
+def parse_timestamps(values: pd.Series, formats: list[str], language: str = 'en') -> pd.Series:
+    """
+    Converts a column to datetime64[ns, UTC]
+
+    Epoch numbers are converted by their magnitude (seconds or milliseconds), text is parsed
+    with the formats in order, each one only for the values the formats before it did not parse.
+    Values that are not a timestamp become NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        times = pd.to_datetime(values, utc=True)
+    elif pd.api.types.is_numeric_dtype(values.dtype):
+        numbers = values.astype('float64')
+        milliseconds = numbers.abs() > _MILLISECONDS
+        times = pd.to_datetime(numbers.where(~milliseconds, numbers / 1000), unit='s', utc=True)
+    else:
+        text = _clean(values, language)
+        times = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns, UTC]')
+        for format in formats:
+            missing = times.isna() & text.notna()
+            if not missing.any():
+                break
+            times[missing] = _parse(text[missing], format)
+    return times.astype('datetime64[ns, UTC]')
+
+
+def normalize_timestamps(
+    tables: dict[str, pd.DataFrame], language: str = 'en', keep_original: bool = False
+) -> dict[str, pd.DataFrame]:
+    """
+    Converts the timestamp columns (TIMESTAMP_COLUMNS) of the tables of one archive to datetime64[ns, UTC]
+
+    Args:
+        tables: table name -> DataFrame, the DataFrames are changed
+        language: the language of the export (see port.archive_profile), for the month names
+        keep_original: keep the column as extracted as <column>_original, next to the converted column
+    """
+    columns = [
+        (df, column) for df in tables.values() for column in TIMESTAMP_COLUMNS
+        if column in df.columns and _is_text(df[column])
+    ]
+    formats = []
+    if columns:
+        formats = detect_formats(pd.concat([_clean(df[column].head(SAMPLE_SIZE), language) for df, column in columns]))
+
+    for df in tables.values():
+        for column in TIMESTAMP_COLUMNS:
+            if column not in df.columns:
+                continue
+            original = df[column]
+            df[column] = parse_timestamps(original, formats, language)
+            if keep_original:
+                df.insert(df.columns.get_loc(column) + 1, f"{column}_original", original)
+    return tables
@@ -0,0 +1,229 @@
+import io
+import zipfile
+
+import pytest
+
+from port.archive import ArchiveIndex, ArchiveSession, open_archive, part_of
+from port.extraction_insta_html_lxml import extract_all_html, extract_followers_html, extract_following_html
+from port.helper import read_file_from_zip
+from port.script import validate_the_participants_input
+
+
+NAMES = [
+    'connections/followers_and_following/followers_1.html',
+    'connections/followers_and_following/following.html',
+    'your_instagram_activity/messages/inbox/bob_1/message_1.html',
+    'your_instagram_activity/messages/inbox/bob_1/photos/1.jpg',
+    'your_instagram_activity/messages/inbox/carol_2/message_1.html',
+    'backup/followers_and_following/following.html',
+]
+
+
+FOLLOWERS = 'connections/followers_and_following/followers_1.html'
+FOLLOWING = 'connections/followers_and_following/following.html'
+
+
+def connections(*users: str) -> bytes:
+    records = ''.join(
+        f'<div><div><a href="https://www.instagram.com/{user}">{user}</a></div><div>Jan 28, 2024 1:00pm</div></div>'
+        for user in users
+    )
+    return f'<html><head><meta charset="utf-8"></head><body>{records}</body></html>'.encode('utf-8')
+
+
+def write_zip(path, members: dict[str, bytes]) -> str:
+    with zipfile.ZipFile(path, 'w') as f:
+        for name, data in members.items():
+            f.writestr(name, data)
+    return str(path)
+
+
+def index(*names: str) -> ArchiveIndex:
+    return ArchiveIndex([zipfile.ZipInfo(name) for name in names or NAMES])
+
+
+def zip_of(*names: str) -> zipfile.ZipFile:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as f:
+        for name in names:
+            f.writestr(name, name)
+    return zipfile.ZipFile(buffer)
+
+
+@pytest.mark.parametrize('suffix, path', [
+    ('followers_1.html', NAMES[0]),
+    ('followers_and_following/followers_1.html', NAMES[0]),
+    ('/connections/followers_and_following/followers_1.html', NAMES[0]),
+    ('inbox/carol_2/message_1.html', NAMES[4]),
+    ('your_instagram_activity/messages/inbox/', 'your_instagram_activity/messages/inbox/'),
+])
+def test_a_member_is_found_by_any_trailing_part_of_its_path(suffix, path):
+    assert index().find(suffix) == path
+    assert index().resolve(suffix) == path
+
+
+@pytest.mark.parametrize('suffix', ['ollowers_1.html', 'and_following/followers_1.html', 'followers.html', 'x.json'])
+def test_only_whole_path_components_match(suffix):
+    assert index().find(suffix) is None
+    with pytest.raises(KeyError):
+        index().resolve(suffix)
+
+
+def test_the_first_member_in_central_directory_order_wins():
+    assert index().find('following.html') == NAMES[1]
+    assert index(*reversed(NAMES)).find('following.html') == NAMES[5]
+
+
+def test_members_by_basename_and_directory():
+    assert index().by_basename('message_1.html') == [NAMES[2], NAMES[4]]
+    assert index().by_basename('nothing.html') == []
+    assert index().under('your_instagram_activity/messages/inbox') == NAMES[2:5]
+    assert index().under('your_instagram_activity/messages/inbox/bob_1/') == NAMES[2:4]
+    assert index().under('nowhere/') == []
+
+
+def test_directories_without_an_entry_are_indexed():
+    assert 'connections/followers_and_following/' not in index()
+    assert index().find('followers_and_following/') == 'connections/followers_and_following/'
+
+
+@pytest.mark.parametrize('name, family', [
+    ('followers_1.html', ('followers.html', 1)),
+    ('a/message_12.html', ('a/message.html', 12)),
+    ('followers.html', ('followers.html', 0)),
+    ('inbox/bob_1/photo.jpg', ('inbox/bob_1/photo.jpg', 0)),
+])
+def test_part_of(name, family):
+    assert part_of(name) == family
+
+
+def test_parts_are_ordered_by_number():
+    names = ['a/followers_10.html', 'a/followers_2.html', 'a/followers.html', 'b/followers_1.html']
+
+    assert index(*names).parts('a/followers_2.html') == ['a/followers.html', 'a/followers_2.html',
+                                                         'a/followers_10.html']
+    assert index(*names).parts('a/following.html') == ['a/following.html']
+
+
+def test_the_index_is_built_once_per_zip_file():
+    f = zip_of(*NAMES)
+
+    assert ArchiveIndex.from_zip(f) is ArchiveIndex.from_zip(f)
+    assert ArchiveIndex.from_zip(f) is not ArchiveIndex.from_zip(zip_of(*NAMES))
+
+
+def test_read_file_from_zip_looks_up_the_index():
+    f = zip_of(*NAMES)
+
+    assert read_file_from_zip(f, 'following.html') == NAMES[1]
+    assert read_file_from_zip(f, 'inbox/bob_1/message_1.html') == NAMES[2]
+    assert read_file_from_zip(f, 'followers.json') is None
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """
+    The zip files opened for reading while the test runs
+    """
+    zip_files = []
+
+    class ZipFile(zipfile.ZipFile):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            if self.mode == 'r':
+                zip_files.append(self)
+
+    monkeypatch.setattr(zipfile, 'ZipFile', ZipFile)
+    return zip_files
+
+
+def test_a_session_opens_the_archive_once_for_all_extractors(tmp_path, opened):
+    members = {FOLLOWERS: connections('alice', 'bob'), FOLLOWING: connections('carol')}
+    path = write_zip(tmp_path / 'export.zip', members)
+
+    with ArchiveSession(path) as archive:
+        assert extract_followers_html(archive)['user_name'].tolist() == ['alice', 'bob']
+        assert extract_following_html(archive)['user_name'].tolist() == ['carol']
+        extract_all_html(archive, ['followers', 'following'])
+        assert not archive.closed
+    assert archive.closed
+    assert len(opened) == 1
+
+
+def test_an_extractor_given_a_path_opens_and_closes_the_archive(tmp_path, opened):
+    path = write_zip(tmp_path / 'export.zip', {FOLLOWERS: connections('alice')})
+
+    assert extract_followers_html(path)['user_name'].tolist() == ['alice']
+    assert len(opened) == 1 and opened[0].fp is None
+
+
+def test_open_archive_leaves_a_session_open(tmp_path):
+    path = write_zip(tmp_path / 'export.zip', {FOLLOWERS: connections('alice')})
+
+    with ArchiveSession(path) as archive:
+        with open_archive(archive) as opened_archive:
+            assert opened_archive is archive
+        assert not archive.closed
+    with open_archive(path) as opened_archive:
+        assert opened_archive.resolve('followers_1.html') == FOLLOWERS
+    assert opened_archive.closed
+
+
+@pytest.fixture
+def split_export(tmp_path):
+    """
+    An export split over two zip files, and the same export in one zip file
+    """
+    first = {FOLLOWERS: connections('alice', 'bob'), 'media/1.jpg': b'jpg'}
+    second = {
+        'connections/followers_and_following/followers_2.html': connections('carol'),
+        FOLLOWING: connections('dave'),
+        'media/1.jpg': b'other',
+    }
+    parts = [write_zip(tmp_path / 'part_1.zip', first), write_zip(tmp_path / 'part_2.zip', second)]
+    whole = write_zip(tmp_path / 'whole.zip', {**second, **first})
+    return parts, whole
+
+
+def test_a_split_export_is_one_archive(split_export):
+    parts, _ = split_export
+
+    with ArchiveSession(parts) as archive:
+        assert archive.resolve('following.html') == FOLLOWING
+        with archive.open(FOLLOWING) as f:
+            assert b'dave' in f.read()
+        with archive.open('media/1.jpg') as f:
+            assert f.read() == b'jpg'
+        assert extract_followers_html(archive)['user_name'].tolist() == ['alice', 'bob', 'carol']
+        with pytest.raises(KeyError):
+            archive.holder('media/2.jpg')
+    assert archive.closed
+
+
+def test_a_split_export_has_the_fingerprint_of_the_whole_export(split_export):
+    parts, whole = split_export
+
+    with ArchiveSession(parts) as split, ArchiveSession(whole) as single, ArchiveSession(parts[:1]) as first:
+        assert split.index.fingerprint() == single.index.fingerprint()
+        assert first.index.fingerprint() != single.index.fingerprint()
+
+
+def test_a_session_closes_the_zip_files_it_opened_when_one_fails(split_export, tmp_path, opened):
+    parts, _ = split_export
+    (tmp_path / 'broken.zip').write_bytes(b'not a zip')
+
+    with pytest.raises(zipfile.BadZipFile):
+        ArchiveSession([*parts, str(tmp_path / 'broken.zip')])
+    assert len(opened) == 2 and all(zip_file.fp is None for zip_file in opened)
+    with pytest.raises(ValueError):
+        ArchiveSession([])
+
+
+def test_the_input_of_a_split_export_is_validated(split_export, tmp_path):
+    parts, whole = split_export
+    (tmp_path / 'notes.txt').write_text('not a zip')
+
+    assert validate_the_participants_input(whole)
+    assert validate_the_participants_input(parts)
+    assert not validate_the_participants_input([*parts, str(tmp_path / 'notes.txt')])
+    assert not validate_the_participants_input([])
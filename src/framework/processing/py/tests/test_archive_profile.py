@@ -0,0 +1,38 @@
+import pytest
+
+from port.archive_profile import LABELS
+from port.extraction_insta import MAP_DATA, TABLES
+
+
+def spec_labels() -> set[str]:
+    """
+    The labels the JSON specs look up: the keys of string_map_data in their paths
+    """
+    labels = set()
+    for specs in TABLES.values():
+        for spec in specs:
+            for field in spec.fields:
+                for step, label in zip(field.path, field.path[1:]):
+                    if step == MAP_DATA:
+                        labels.update(label if isinstance(label, tuple) else (label,))
+    return labels
+
+
+def test_specs_look_up_labels():
+    assert {'Time', 'Username', 'City Name', 'User Agent', 'Media Owner'} <= spec_labels()
+
+
+@pytest.mark.parametrize('language', [language for language in LABELS if language != 'en'])
+def test_every_spec_label_is_translated(language):
+    assert sorted(spec_labels() - set(LABELS[language])) == []
+
+
+@pytest.mark.parametrize('language', [language for language in LABELS if language != 'en'])
+def test_localized_specs_only_use_translated_labels(language):
+    for specs in TABLES.values():
+        for spec in specs:
+            for field in spec.localize(LABELS[language]).fields:
+                for step, label in zip(field.path, field.path[1:]):
+                    if step == MAP_DATA:
+                        labels = label if isinstance(label, tuple) else (label,)
+                        assert set(labels) <= set(LABELS[language].values())
@@ -0,0 +1,169 @@
+import json
+import os
+import zipfile
+
+import pandas as pd
+import pytest
+
+import port.extraction as extraction
+from port.batch import MANIFEST_FILE, Export, Manifest, find_exports, main, plan, process_export, run
+
+
+FOLLOWERS = 'connections/followers_and_following/followers_1.html'
+FOLLOWING = 'connections/followers_and_following/following.html'
+NAMES = ['followers', 'following']
+
+
+def connections(*users: str) -> bytes:
+    records = ''.join(
+        f'<div><div><a href="https://www.instagram.com/{user}">{user}</a></div><div>Jan 28, 2024 1:00pm</div></div>'
+        for user in users
+    )
+    return f'<html><head><meta charset="utf-8"></head><body>{records}</body></html>'.encode('utf-8')
+
+
+def write_export(path, followers: list[str], following: list[str]) -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with zipfile.ZipFile(path, 'w') as f:
+        f.writestr(FOLLOWERS, connections(*followers))
+        f.writestr(FOLLOWING, connections(*following))
+    return str(path)
+
+
+@pytest.fixture
+def exports(tmp_path):
+    """
+    A directory with an export, an export split over two zip files, a file that is not a zip and an empty directory
+    """
+    directory = tmp_path / 'exports'
+    write_export(directory / 'anna.zip', ['alice', 'bob'], ['carol'])
+    os.makedirs(directory / 'ben')
+    with zipfile.ZipFile(directory / 'ben' / 'part_1.zip', 'w') as f:
+        f.writestr(FOLLOWERS, connections('dave'))
+    with zipfile.ZipFile(directory / 'ben' / 'part_2.zip', 'w') as f:
+        f.writestr(FOLLOWING, connections('erin'))
+    (directory / 'notes.txt').write_text('not an export')
+    os.makedirs(directory / 'empty')
+    return str(directory)
+
+
+def read_table(output, table: str, export: str) -> pd.DataFrame:
+    return pd.read_csv(os.path.join(output, table, f'archive={export}.csv'))
+
+
+def test_every_zip_file_and_every_directory_of_zip_files_is_an_export(exports):
+    found = find_exports(exports)
+
+    assert [export.name for export in found] == ['anna', 'ben']
+    assert [os.path.basename(path) for path in found[1].paths] == ['part_1.zip', 'part_2.zip']
+
+
+def test_an_export_is_written_partitioned_by_table_and_export(exports, tmp_path):
+    output = str(tmp_path / 'out')
+    export = find_exports(exports)[1]
+
+    result = process_export(export, output, names=NAMES)
+
+    assert result.error is None and result.rows == {'followers': 1, 'following': 1}
+    followers = read_table(output, 'followers', 'ben')
+    assert followers.columns.tolist() == ['archive', 'type', 'timestamp', 'user_name', 'link']
+    assert followers[['archive', 'user_name']].values.tolist() == [['ben', 'dave']]
+    with open(os.path.join(output, '_provenance', 'archive=ben.json'), encoding='utf-8') as f:
+        provenance = json.load(f)
+    assert provenance['rows'] == {'followers': 1, 'following': 1}
+    assert [os.path.basename(file['path']) for file in provenance['files']] == ['part_1.zip', 'part_2.zip']
+    assert provenance['profile']['format'] == 'html'
+    assert not [name for _, _, names in os.walk(output) for name in names if name.endswith('.tmp')]
+
+
+def test_an_export_that_fails_is_reported_not_raised(tmp_path):
+    (tmp_path / 'broken.zip').write_bytes(b'not a zip')
+
+    result = process_export(Export('broken', [str(tmp_path / 'broken.zip')]), str(tmp_path / 'out'), names=NAMES)
+
+    assert result.error is not None and result.error.startswith('BadZipFile')
+    assert result.rows == {}
+
+
+def test_a_pool_of_workers_extracts_every_export(exports, tmp_path):
+    output = str(tmp_path / 'out')
+
+    results = run(find_exports(exports), output, workers=2, names=NAMES)
+
+    assert sorted((result.name, result.rows['following']) for result in results) == [('anna', 1), ('ben', 1)]
+    assert read_table(output, 'followers', 'anna')['user_name'].tolist() == ['alice', 'bob']
+    assert read_table(output, 'following', 'ben')['user_name'].tolist() == ['erin']
+
+
+def test_the_command_line_fails_when_an_export_fails(exports, tmp_path):
+    output = str(tmp_path / 'out')
+
+    assert main([exports, output, '--workers', '1', '--tables', *NAMES]) == 0
+    (tmp_path / 'exports' / 'broken.zip').write_bytes(b'not a zip')
+    assert main([exports, output, '--workers', '1', '--tables', *NAMES]) == 1
+
+
+def test_a_second_run_skips_what_is_done(exports, tmp_path):
+    output = str(tmp_path / 'out')
+    run(find_exports(exports), output, workers=1, names=NAMES)
+
+    results = run(find_exports(exports), output, workers=1, names=NAMES)
+
+    assert [(result.name, result.skipped) for result in results] == [('anna', True), ('ben', True)]
+    anna = find_exports(exports)[0]
+    plan([anna], Manifest(output), names=NAMES)
+    entry = Manifest(output).get(anna.fingerprint)
+    assert entry['archive'] == 'anna' and list(entry['tables']) == NAMES
+    assert entry['tables']['followers'] == {
+        'version': extraction.VERSIONS['followers'], 'rows': 2,
+        'path': os.path.join('followers', 'archive=anna.csv'), 'timestamps': 'text',
+    }
+
+
+def test_the_same_export_twice_is_extracted_once(exports, tmp_path):
+    write_export(tmp_path / 'exports' / 'anna_again.zip', ['alice', 'bob'], ['carol'])
+
+    todo, skipped = plan(find_exports(exports), Manifest(str(tmp_path / 'out')), names=NAMES)
+
+    assert [export.name for export, _ in todo] == ['anna', 'ben']
+    assert [(result.name, result.duplicate_of) for result in skipped] == [('anna_again', 'anna')]
+
+
+def test_only_the_tables_of_a_new_extractor_version_are_redone(exports, tmp_path, monkeypatch):
+    output = str(tmp_path / 'out')
+    run(find_exports(exports), output, workers=1, names=NAMES)
+    monkeypatch.setitem(extraction.VERSIONS, 'following', extraction.VERSIONS['following'] + 1)
+
+    todo, skipped = plan(find_exports(exports), Manifest(output), names=NAMES)
+    assert [(export.name, tables) for export, tables in todo] == [('anna', ['following']), ('ben', ['following'])]
+    assert skipped == []
+
+    run(find_exports(exports), output, workers=1, names=NAMES)
+    assert plan(find_exports(exports), Manifest(output), names=NAMES)[0] == []
+    with open(os.path.join(output, '_provenance', 'archive=anna.json'), encoding='utf-8') as f:
+        assert json.load(f)['rows'] == {'followers': 2, 'following': 1}
+
+
+@pytest.mark.parametrize('changes', [{'format': 'parquet'}, {'timestamps': 'datetime'}, {'force': True}])
+def test_another_format_or_force_redoes_everything(exports, tmp_path, changes):
+    output = str(tmp_path / 'out')
+    run(find_exports(exports), output, workers=1, names=NAMES)
+
+    todo, _ = plan(find_exports(exports), Manifest(output), names=NAMES, **changes)
+
+    assert [(export.name, tables) for export, tables in todo] == [('anna', NAMES), ('ben', NAMES)]
+
+
+def test_a_torn_last_line_of_the_manifest_is_ignored(exports, tmp_path):
+    output = str(tmp_path / 'out')
+    run(find_exports(exports)[:1], output, workers=1, names=NAMES)
+    with open(os.path.join(output, MANIFEST_FILE), 'a', encoding='utf-8') as f:
+        f.write('{"fingerprint": "abc", "archive": "be')
+
+    results = run(find_exports(exports), output, workers=1, names=NAMES)
+
+    assert [(result.name, result.skipped) for result in results] == [('anna', True), ('ben', False)]
+    with open(os.path.join(output, MANIFEST_FILE), encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 3 and json.loads(lines[2])['archive'] == 'ben'
+    assert len(Manifest(output).entries) == 2
@@ -0,0 +1,146 @@
+import json
+import zipfile
+
+import pandas as pd
+import pytest
+
+import port.budget as budget_module
+import port.extraction as extraction
+from port.api.props import PropsUIPromptConsentFormTable, Translatable
+from port.budget import TRUNCATED, Budget, Limits, Meter
+from port.consent import donation_entries
+from port.extraction_cache import ResultCache
+
+
+FOLLOWERS = 'connections/followers_and_following/followers_{}.html'
+FOLLOWING = 'connections/followers_and_following/following.html'
+NAMES = ['followers', 'following']
+
+
+def connections(*users: str) -> bytes:
+    records = ''.join(
+        f'<div><div><a href="https://www.instagram.com/{user}">{user}</a></div><div>Jan 28, 2024 1:00pm</div></div>'
+        for user in users
+    )
+    return f'<html><head><meta charset="utf-8"></head><body>{records}</body></html>'.encode('utf-8')
+
+
+@pytest.fixture
+def export(tmp_path):
+    """
+    Followers in four members of three accounts each, one account followed
+    """
+    path = tmp_path / 'export.zip'
+    with zipfile.ZipFile(path, 'w') as f:
+        for part in range(1, 5):
+            f.writestr(FOLLOWERS.format(part), connections(*(f'user_{part}_{i}' for i in range(3))))
+        f.writestr(FOLLOWING, connections('carol'))
+    return str(path)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    A clock for time.perf_counter that only moves when the test moves it
+    """
+    now = [100.0]
+    monkeypatch.setattr(budget_module.time, 'perf_counter', lambda: now[0])
+    return now
+
+
+def test_a_table_has_its_own_limits_or_those_of_every_table():
+    budget = Budget(table=Limits(seconds=60), tables={'links_shared_in_dms': Limits(rows=10)})
+
+    assert budget.limits('followers') == Limits(seconds=60)
+    assert budget.limits('links_shared_in_dms') == Limits(rows=10)
+    assert set(budget.meters(NAMES)) == set(NAMES)
+
+
+def test_a_meter_stops_at_its_rows():
+    meter = Meter(Limits(rows=5))
+    meter.members_total = 4
+
+    assert not meter.add_rows(3, 0.0)
+    assert meter.add_rows(2, 0.0)
+    meter.add_member(1.0)
+
+    assert meter.exhausted()
+    assert meter.truncation() == {'reason': 'rows', 'members_read': 1, 'members_total': 4, 'coverage': 0.25, 'rows': 5}
+
+
+def test_a_meter_stops_at_its_seconds(clock):
+    meter = Meter(Limits(seconds=10))
+    meter.add_member(6.0)
+    assert not meter.exhausted() and meter.truncation() is None
+
+    # A member that has been read for 4 seconds, the clock is looked at every CLOCK_ROWS rows
+    started = clock[0]
+    clock[0] += 4
+    assert not meter.add_rows(budget_module.CLOCK_ROWS - 1, started)
+    assert meter.add_rows(1, started)
+    assert meter.reason == 'time'
+
+
+def test_the_session_deadline_stops_every_meter(clock):
+    meters = Budget(session_seconds=30).meters(NAMES)
+
+    clock[0] += 29
+    assert not any(meter.exhausted() for meter in meters.values())
+    clock[0] += 1
+    assert all(meter.exhausted() and meter.reason == 'session' for meter in meters.values())
+
+
+def test_a_table_out_of_rows_keeps_the_rows_so_far(export):
+    tables = extraction.extract_all(export, names=NAMES, budget=Budget(tables={'followers': Limits(rows=4)}))
+
+    followers = tables['followers']
+    assert followers['user_name'].tolist() == ['user_1_0', 'user_1_1', 'user_1_2', 'user_2_0']
+    assert followers.attrs[TRUNCATED] == {
+        'reason': 'rows', 'members_read': 2, 'members_total': 4, 'coverage': 0.5, 'rows': 4,
+    }
+    assert tables['following']['user_name'].tolist() == ['carol']
+    assert TRUNCATED not in tables['following'].attrs
+
+
+def test_a_session_without_time_left_cuts_every_table_short(export):
+    tables = extraction.extract_all(export, names=NAMES, budget=Budget(session_seconds=0))
+
+    for name in NAMES:
+        assert tables[name].empty
+        assert tables[name].attrs[TRUNCATED]['reason'] == 'session'
+        assert tables[name].attrs[TRUNCATED]['members_read'] == 0
+
+
+def test_a_budget_that_is_not_spent_changes_nothing(export):
+    tables = extraction.extract_all(export, names=NAMES, budget=Budget(table=Limits(seconds=60, rows=1000)))
+
+    for name in NAMES:
+        assert TRUNCATED not in tables[name].attrs
+        pd.testing.assert_frame_equal(tables[name], extraction.extract_all(export, names=NAMES)[name])
+
+
+def test_a_truncated_table_is_not_cached(export):
+    cache = ResultCache()
+    extraction.extract_all(export, names=NAMES, cache=cache, budget=Budget(tables={'followers': Limits(rows=4)}))
+
+    tables = extraction.extract_all(export, names=NAMES, cache=cache)
+
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert len(tables['followers']) == 12 and TRUNCATED not in tables['followers'].attrs
+
+
+def test_the_truncation_is_shown_and_donated():
+    truncation = {'reason': 'time', 'members_read': 12, 'members_total': 30, 'coverage': 0.4, 'rows': 18}
+    df = pd.DataFrame({'link': ['https://a']})
+    df.attrs[TRUNCATED] = truncation
+    complete = pd.DataFrame({'link': ['https://b']})
+
+    shown = PropsUIPromptConsentFormTable('zip_contents_0', Translatable({'en': 'Links'}), df,
+                                          truncation=df.attrs.get(TRUNCATED)).toDict()
+    entries = donation_entries(json.dumps({'deleted': {}, 'meta': []}),
+                               {'zip_contents_0': df, 'zip_contents_1': complete})
+
+    assert shown['truncation'] == truncation
+    assert entries[-1] == {'truncated_tables': json.dumps({'zip_contents_0': truncation})}
+    assert 'truncated_tables' not in donation_entries(json.dumps({'deleted': {}, 'meta': []}),
+                                                      {'zip_contents_1': complete})[-1]
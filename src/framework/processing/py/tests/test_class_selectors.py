@@ -0,0 +1,84 @@
+import pytest
+from lxml import etree, html
+
+from port.class_selectors import ClassIndex, ClassSelector
+
+
+DOCUMENT = html.fromstring(
+    '<html><body>'
+    '<div class="record _a6-p"><table><tr>'
+    '<td class="_2pin _a6_q">one</td><td class="_a6_q _2pin">two</td><td class="_2pin _2piu _a6_r">Jan 1</td>'
+    '</tr></table></div>'
+    '<div class="record _a6-pq"><table><tr>'
+    '<td class="_2pin  _a6_q extra">three</td><td class="_2pin">no</td><td class="_2pin _2piu _a6_r"><b>Feb</b> 2</td>'
+    '</tr></table></div>'
+    '<div class="record"><span class="_a6_q">not a td</span></div>'
+    '</body></html>'
+)
+
+SELECTORS = [
+    ClassSelector('div', '_a6-p'),
+    ClassSelector('div', 'record'),
+    ClassSelector('td', '_2pin _a6_q'),
+    ClassSelector('td', '_2pin _a6_q', './/text()'),
+    ClassSelector('td', '_2pin _a6_q', 'text()', first_of_type=True),
+    ClassSelector('td', '_2pin _2piu _a6_r', './/text()'),
+    ClassSelector('td', 'missing'),
+]
+
+
+def text(results: list) -> list:
+    return [result if isinstance(result, str) else result.text for result in results]
+
+
+@pytest.mark.parametrize('selector', SELECTORS, ids=repr)
+def test_the_index_gives_what_the_xpath_gives(selector):
+    index = ClassIndex(DOCUMENT)
+
+    assert text(selector.results(index.select(selector))) == text(selector.xpath(DOCUMENT))
+
+
+def test_classes_match_on_whole_tokens_in_any_order():
+    index = ClassIndex(DOCUMENT)
+
+    assert [element.get('class') for element in index.select(ClassSelector('div', '_a6-p'))] == ['record _a6-p']
+    assert text(index.select(ClassSelector('td', '_a6_q _2pin'))) == ['one', 'two', 'three']
+
+
+def test_first_of_type_keeps_the_first_match_among_its_siblings():
+    selector = ClassSelector('td', '_2pin _a6_q', 'text()', first_of_type=True)
+
+    assert selector.results(ClassIndex(DOCUMENT).select(selector)) == ['one', 'three']
+
+
+@pytest.mark.parametrize('selector', SELECTORS, ids=repr)
+def test_matches_within_a_record_are_the_matches_below_it(selector):
+    index = ClassIndex(DOCUMENT)
+    records = index.select(ClassSelector('div', 'record'))
+    index.assign(records)
+
+    for record in records:
+        assert text(index.select_within(record, selector)) == text(selector.xpath(record))
+
+
+def test_any_of_several_selectors():
+    index = ClassIndex(DOCUMENT)
+    selected = index.select_any([ClassSelector('div', '_a6-p'), ClassSelector('div', '_a6-pq')])
+
+    assert [element.get('class') for element in selected] == ['record _a6-p', 'record _a6-pq']
+    with pytest.raises(ValueError):
+        index.select_any([ClassSelector('div', '_a6-p'), ClassSelector('td', '_a6_q')])
+
+
+def test_a_selector_needs_a_class():
+    with pytest.raises(ValueError):
+        ClassSelector('div', ' ')
+
+
+def test_matches():
+    selector = ClassSelector('td', '_2pin _a6_q')
+
+    assert selector.matches(etree.fromstring('<td class="x _a6_q _2pin"/>'))
+    assert not selector.matches(etree.fromstring('<td class="_2pin _a6_qq"/>'))
+    assert not selector.matches(etree.fromstring('<div class="_2pin _a6_q"/>'))
+    assert not selector.matches(etree.fromstring('<td/>'))
@@ -0,0 +1,122 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from port.api import columnar
+from port.api.props import DATA_FORMAT_VERSIONS, PropsUIPromptConsentFormTable, Translatable
+
+
+def table() -> pd.DataFrame:
+    return pd.DataFrame({
+        'type': ['follower'] * 4,
+        'user_name': ['alice', 'bob', 'alice', None],
+        'link': ['https://a', 'https://b', 'https://c', None],
+        'timestamp': pd.to_datetime([1_600_000_000, None, 1_600_000_060, 1_600_000_120], unit='s', utc=True),
+        'count': [1, 2, 3, 4],
+        'share': [0.5, np.nan, 1.0, 2.0],
+    })
+
+
+def decode(encoded: dict) -> list[list]:
+    """
+    The rows of a columnar table, the way the consent form decodes them (columnarRows)
+    """
+    columns = []
+    for column in encoded['columns']:
+        if 'codes' in column:
+            columns.append([None if code < 0 else column['dictionary'][code] for code in column['codes']])
+        elif 'timestamps' in column:
+            columns.append(column['timestamps'])
+        else:
+            columns.append(column['values'])
+    return [list(row) for row in zip(*columns)]
+
+
+def test_a_table_is_encoded_as_columns():
+    encoded = columnar.encode_table(table())
+
+    assert encoded['__type__'] == 'ColumnarTable' and encoded['version'] == columnar.VERSION
+    assert encoded['length'] == 4
+    assert encoded['columns'] == [
+        {'name': 'type', 'dictionary': ['follower'], 'codes': [0, 0, 0, 0]},
+        {'name': 'user_name', 'dictionary': ['alice', 'bob'], 'codes': [0, 1, 0, -1]},
+        {'name': 'link', 'values': ['https://a', 'https://b', 'https://c', None]},
+        {'name': 'timestamp', 'timestamps': [1_600_000_000_000, None, 1_600_000_060_000, 1_600_000_120_000]},
+        {'name': 'count', 'values': [1, 2, 3, 4]},
+        {'name': 'share', 'values': [0.5, None, 1.0, 2.0]},
+    ]
+
+
+def test_the_columns_decode_to_the_rows():
+    assert decode(columnar.encode_table(table())) == [
+        ['follower', 'alice', 'https://a', 1_600_000_000_000, 1, 0.5],
+        ['follower', 'bob', 'https://b', None, 2, None],
+        ['follower', 'alice', 'https://c', 1_600_000_060_000, 3, 1.0],
+        ['follower', None, None, 1_600_000_120_000, 4, 2.0],
+    ]
+
+
+def test_categorical_and_naive_timestamp_columns():
+    df = pd.DataFrame({
+        'type': pd.Categorical(['a', 'a', 'b', None]),
+        'timestamp': pd.to_datetime(['1970-01-01 00:00:01'] * 4),
+    })
+
+    assert decode(columnar.encode_table(df)) == [['a', 1000], ['a', 1000], ['b', 1000], [None, 1000]]
+
+
+def test_the_json_is_compact_and_smaller_than_to_json():
+    df = pd.concat([table()] * 500, ignore_index=True)
+    text = columnar.to_json(df)
+
+    assert json.loads(text) == columnar.encode_table(df)
+    assert ', ' not in text and len(text) < len(df.to_json(date_format='epoch')) / 2
+
+
+def test_the_summary_covers_the_whole_table():
+    assert columnar.summarize(table()) == [
+        {'name': 'type', 'distinct': 1, 'missing': 0},
+        {'name': 'user_name', 'distinct': 2, 'missing': 1},
+        {'name': 'link', 'distinct': 3, 'missing': 1},
+        {'name': 'timestamp', 'distinct': 3, 'missing': 1, 'first': 1_600_000_000_000, 'last': 1_600_000_120_000},
+        {'name': 'count', 'distinct': 4, 'missing': 0},
+        {'name': 'share', 'distinct': 3, 'missing': 1},
+    ]
+
+
+def test_the_cells_are_the_text_the_consent_form_shows():
+    assert dict(columnar.column_cells(table().iloc[:2])) == {
+        'type': ['follower', 'follower'],
+        'user_name': ['alice', 'bob'],
+        'link': ['https://a', 'https://b'],
+        'timestamp': ['2020-09-13 12:26:40', 'null'],
+        'count': ['1', '2'],
+        'share': ['0.5', 'null'],
+    }
+
+
+@pytest.mark.parametrize('data_format', ['columnar', 'pandas'])
+def test_a_consent_table_is_sent_in_its_format(data_format):
+    df = table()
+    sent = PropsUIPromptConsentFormTable('zip_contents_0', Translatable({'en': 'Followers'}), df,
+                                         data_format=data_format).toDict()
+
+    assert sent['version'] == DATA_FORMAT_VERSIONS[data_format]
+    if data_format == 'columnar':
+        assert json.loads(sent['data_frame']) == columnar.encode_table(df)
+    else:
+        assert sent['data_frame'] == df.to_json(date_format='epoch')
+
+
+def test_a_paginated_consent_table_sends_its_first_page_and_a_summary():
+    df = pd.concat([table()] * 3, ignore_index=True)
+    sent = PropsUIPromptConsentFormTable('zip_contents_0', Translatable({'en': 'Followers'}), df, page_size=5).toDict()
+
+    assert json.loads(sent['data_frame'])['length'] == 5
+    assert sent['total_rows'] == 12 and sent['page_size'] == 5
+    assert sent['summary'] == columnar.summarize(df)
+    with pytest.raises(ValueError):
+        PropsUIPromptConsentFormTable('zip_contents_0', Translatable({'en': 'Followers'}), df,
+                                      data_format='pandas', page_size=5).toDict()
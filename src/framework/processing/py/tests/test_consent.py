@@ -0,0 +1,108 @@
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from port.consent import deleted_mask, donation_entries, row_ranges, table_page, table_search
+from port.extraction import ROW_ID
+
+
+def table(rows: int) -> pd.DataFrame:
+    df = pd.DataFrame({'type': ['follower'] * rows, 'user_name': [f'user_{i}' for i in range(rows)]})
+    df.index = pd.RangeIndex(rows, name=ROW_ID)
+    return df
+
+
+def donated_names(ranges: list, rows: int = 100) -> list[str]:
+    edits = json.dumps({'deleted': {'zip_contents_0': ranges}, 'meta': []})
+    entries = donation_entries(edits, {'zip_contents_0': table(rows)})
+    return [record['user_name'] for record in entries[0]['zip_contents_0']]
+
+
+@pytest.mark.parametrize('row_ids, ranges', [
+    ([], []),
+    ([0], [[0, 1]]),
+    ([3, 4, 9], [[3, 5], [9, 10]]),
+    ([0, 1, 2, 5, 7, 8], [[0, 3], [5, 6], [7, 9]]),
+])
+def test_row_ranges(row_ids, ranges):
+    assert row_ranges(np.array(row_ids, dtype=np.int64)) == ranges
+
+
+def test_deleted_mask_is_the_rows_of_the_ranges():
+    ids = np.array([0, 1, 2, 17, 40, 41, 99])
+
+    assert np.flatnonzero(deleted_mask(row_ranges(ids), 100)).tolist() == ids.tolist()
+
+
+def test_range_deletions_remove_exactly_those_rows():
+    deleted = {3, 4, 9, 50, 51, 52, 99}
+
+    names = donated_names([[3, 5], [9, 10], [50, 53], [99, 100]])
+
+    assert names == [f'user_{i}' for i in range(100) if i not in deleted]
+
+
+def test_range_deletions_are_counted_in_the_omissions():
+    edits = json.dumps({'deleted': {'zip_contents_0': [[0, 10]]}, 'meta': []})
+    entries = donation_entries(edits, {'zip_contents_0': table(20)})
+
+    assert json.loads(entries[-1]['user_omissions']) == ['User deleted 10 rows from table: zip_contents_0']
+
+
+def test_ranges_outside_the_table_delete_nothing_else():
+    assert donated_names([[-5, 0], [100, 120]]) == [f'user_{i}' for i in range(100)]
+
+
+def test_deleting_the_ranges_of_a_search_removes_every_match():
+    tables = {'zip_contents_0': table(1000)}
+    result = table_search(tables, {'table_id': 'zip_contents_0', 'query': 'USER_1', 'limit': 5})
+
+    names = donated_names(result.ranges, 1000)
+
+    assert result.matches == 111 and len(result.row_ids) == 5
+    assert not any('user_1' in name for name in names)
+    assert len(names) == 1000 - result.matches
+
+
+def test_search_of_an_unknown_table_is_empty():
+    result = table_search({}, {'table_id': 'nope', 'query': 'a', 'limit': 5})
+
+    assert (result.matches, result.row_ids, result.ranges) == (0, [], [])
+
+
+def test_page_of_an_unknown_table_is_empty():
+    page = table_page({}, SimpleNamespace(table_id='nope', offset=0, limit=5))
+
+    assert page.total_rows == 0 and page.data_frame.empty
+
+
+def test_donated_rows_keep_missing_values_and_timestamps():
+    df = pd.DataFrame({
+        'timestamp': pd.to_datetime([1_600_000_000, None, 1_600_000_000.25], unit='s', utc=True),
+        'last_login': ['Jan 28, 2024 1:00pm', None, '28. Jan. 2024, 13:00'],
+        'user_name': ['alice', None, 'bob'],
+        'count': [1.0, np.nan, 2.5],
+        'private': [True, False, True],
+    })
+    df.index = pd.RangeIndex(3, name=ROW_ID)
+    entries = donation_entries(json.dumps({'deleted': {}, 'meta': []}), {'zip_contents_0': df})
+    entries[0]['zip_contents_0'] = list(entries[0]['zip_contents_0'])
+
+    assert json.dumps(entries[0], ensure_ascii=False) == json.dumps({'zip_contents_0': [
+        {'timestamp': '2020-09-13T12:26:40.000000Z', 'last_login': 'Jan 28, 2024 1:00pm',
+         'user_name': 'alice', 'count': '1', 'private': 'true'},
+        {'timestamp': None, 'last_login': None, 'user_name': None, 'count': None, 'private': 'false'},
+        {'timestamp': '2020-09-13T12:26:40.250000Z', 'last_login': '28. Jan. 2024, 13:00',
+         'user_name': 'bob', 'count': '2.5', 'private': 'true'},
+    ]})
+
+
+def test_donated_timestamps_are_whole_seconds_unless_a_value_has_a_fraction():
+    df = pd.DataFrame({'timestamp': pd.to_datetime(['2024-01-28 13:00:00', '2024-01-28 13:00:01'])})
+    entries = donation_entries(json.dumps({'deleted': {}, 'meta': []}), {'zip_contents_0': df})
+
+    timestamps = [row['timestamp'] for row in entries[0]['zip_contents_0']]
+    assert timestamps == ['2024-01-28T13:00:00Z', '2024-01-28T13:00:01Z']
@@ -0,0 +1,120 @@
+import json
+
+import pandas as pd
+import pytest
+
+from port.api import columnar
+from port.api.commands import CommandSystemDonate, CommandSystemDonateChunk, CommandSystemDonateManifest
+from port.consent import donation_entries
+from port.donation import donation_commands, reassemble
+from port.extraction import ROW_ID
+
+
+def table(rows: int, name: str = 'follower') -> pd.DataFrame:
+    df = pd.DataFrame({
+        'type': [name] * rows,
+        'user_name': [f'user_{i % 37} ä' for i in range(rows)],
+        'timestamp': pd.to_datetime([1_600_000_000 + 60 * i for i in range(rows)], unit='s', utc=True),
+    })
+    df.index = pd.RangeIndex(rows, name=ROW_ID)
+    return df
+
+
+TABLES = {'zip_contents_0': table(3000), 'zip_contents_1': table(0), 'zip_contents_2': table(500, 'following')}
+EDITS = json.dumps({'deleted': {}, 'meta': [{'meta_tables': [{'note': 'kept'}]}]})
+
+
+def expected() -> list[dict]:
+    entries = [{table_id: columnar.to_records(df)} for table_id, df in TABLES.items()]
+    return entries + [{'meta_tables': [{'note': 'kept'}]}, {'user_omissions': '[]'}]
+
+
+def chunked(chunk_bytes: int = 4096) -> list:
+    entries = donation_entries(EDITS, TABLES)
+    return list(donation_commands('key', entries, single_message_bytes=0, chunk_bytes=chunk_bytes))
+
+
+def test_a_small_donation_is_one_message():
+    commands = list(donation_commands('key', donation_entries(EDITS, TABLES)))
+
+    assert len(commands) == 1 and isinstance(commands[0], CommandSystemDonate)
+    assert json.loads(commands[0].json_string) == expected()
+
+
+def test_chunks_reassemble_to_the_donation():
+    commands = chunked()
+
+    assert isinstance(commands[-1], CommandSystemDonateManifest)
+    assert sum(isinstance(command, CommandSystemDonateChunk) for command in commands) > 10
+    assert commands[-1].tables == [*TABLES, 'meta_tables', 'user_omissions']
+    assert json.loads(reassemble(commands)) == expected()
+
+
+def test_chunks_reassemble_in_any_order():
+    commands = chunked()
+    *chunks, manifest = commands
+
+    assert json.loads(reassemble([*reversed(chunks), manifest])) == expected()
+
+
+def test_a_chunk_holds_one_table():
+    for command in chunked(chunk_bytes=1):
+        if isinstance(command, CommandSystemDonateChunk):
+            assert command.table_id in (*TABLES, 'meta_tables', 'user_omissions')
+
+
+def test_entries_that_share_an_id_stay_apart():
+    entries = [
+        {'meta_tables': [{'note': 'first'}] * 200}, {'zip_contents_0': [{'a': 1}] * 200},
+        {'meta_tables': [{'note': 'second'}] * 200}, {'meta_tables': []},
+    ]
+    commands = list(donation_commands('key', entries, single_message_bytes=0, chunk_bytes=1024))
+
+    assert commands[-1].tables == ['meta_tables', 'zip_contents_0', 'meta_tables', 'meta_tables']
+    assert json.loads(reassemble(commands)) == entries
+    single = list(donation_commands('key', entries, single_message_bytes=len(json.dumps(entries)) * 2))
+    assert json.loads(single[0].json_string) == entries
+
+
+def test_a_missing_chunk_is_detected():
+    commands = chunked()
+    del commands[3]
+
+    with pytest.raises(ValueError, match='Chunk 3 .* is missing'):
+        reassemble(commands)
+
+
+def test_a_damaged_chunk_is_detected():
+    commands = chunked()
+    other = commands[4]
+    commands[3] = CommandSystemDonateChunk('key', 3, other.entry, other.table_id, other.data, other.size, other.checksum)
+
+    with pytest.raises(ValueError, match='Chunk 3 .* is damaged'):
+        reassemble(commands)
+
+
+def test_a_donation_without_manifest_is_detected():
+    with pytest.raises(ValueError, match='no manifest'):
+        reassemble(chunked()[:-1])
+
+
+def test_a_donation_without_deletions_is_the_json_of_the_consent_form():
+    # What the consent form donated with JSON.stringify before the tables stayed in Python
+    baseline = (
+        '[{"zip_contents_0":[{"type":"follower","user_name":"ä \\"a\\"","count":"1"},'
+        '{"type":"follower","user_name":"b","count":"2.5"}]},'
+        '{"zip_contents_1":[]},'
+        '{"meta_tables":[{"note":"kept"}]},'
+        '{"user_omissions":"[]"}]'
+    )
+    df = pd.DataFrame({'type': ['follower'] * 2, 'user_name': ['ä "a"', 'b'], 'count': [1.0, 2.5]})
+    df.index = pd.RangeIndex(2, name=ROW_ID)
+    tables = {'zip_contents_0': df, 'zip_contents_1': table(0)[[]]}
+
+    entries = list(donation_entries(EDITS, tables))
+    single = list(donation_commands('key', entries))
+    entries = list(donation_entries(EDITS, tables))
+    chunks = list(donation_commands('key', entries, single_message_bytes=0, chunk_bytes=16))
+
+    assert single[0].json_string == baseline
+    assert reassemble(chunks) == baseline
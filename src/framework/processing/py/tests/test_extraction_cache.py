@@ -0,0 +1,117 @@
+import zipfile
+
+import pandas as pd
+import pytest
+
+import port.extraction as extraction
+from port.archive import ArchiveSession
+from port.extraction_cache import ResultCache, member_key
+from port.extraction_insta_html_lxml import TABLES
+
+
+FOLLOWERS = 'connections/followers_and_following/followers_1.html'
+FOLLOWING = 'connections/followers_and_following/following.html'
+NAMES = ['followers', 'following']
+
+
+def connections(*users: str) -> bytes:
+    records = ''.join(
+        f'<div><div><a href="https://www.instagram.com/{user}">{user}</a></div><div>Jan 28, 2024 1:00pm</div></div>'
+        for user in users
+    )
+    return f'<html><head><meta charset="utf-8"></head><body>{records}</body></html>'.encode('utf-8')
+
+
+def write_export(path, followers: list[str], following: list[str], extra: dict | None = None) -> str:
+    with zipfile.ZipFile(path, 'w') as f:
+        f.writestr(FOLLOWERS, connections(*followers))
+        f.writestr(FOLLOWING, connections(*following))
+        for name, data in (extra or {}).items():
+            f.writestr(name, data)
+    return str(path)
+
+
+def frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({'value': range(rows)}, dtype='int64')
+
+
+def size(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def test_the_least_recently_used_tables_are_evicted_first():
+    cache = ResultCache(max_bytes=3 * size(frame(100)))
+    for key in 'abc':
+        cache.put(key, frame(100))
+    cache.get('a')
+
+    cache.put('d', frame(100))
+
+    assert 'b' not in cache and all(key in cache for key in 'acd')
+    assert cache.bytes == 3 * size(frame(100))
+
+
+def test_a_table_larger_than_the_cache_is_not_kept():
+    cache = ResultCache(max_bytes=size(frame(100)))
+    cache.put('a', frame(10))
+
+    cache.put('a', frame(1000))
+
+    assert len(cache) == 0 and cache.bytes == 0
+
+
+def test_tables_are_copied_in_and_out():
+    cache = ResultCache()
+    df = frame(3)
+    cache.put('a', df)
+    df.loc[0, 'value'] = 10
+    out = cache.get('a')
+    out.loc[1, 'value'] = 10
+
+    assert cache.get('a')['value'].tolist() == [0, 1, 2]
+    assert cache.get('b') is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_the_member_key_changes_with_the_members_of_the_table_only(tmp_path):
+    def key(path, name):
+        with ArchiveSession(path) as archive:
+            return member_key(TABLES[name], archive.index)
+
+    first = write_export(tmp_path / 'first.zip', ['alice'], ['bob'])
+    other_member = write_export(tmp_path / 'other_member.zip', ['alice'], ['bob'], {'media/1.jpg': b'jpg'})
+    other_followers = write_export(tmp_path / 'other_followers.zip', ['alice', 'carol'], ['bob'])
+
+    assert key(first, 'followers') == key(other_member, 'followers')
+    assert key(first, 'followers') != key(other_followers, 'followers')
+    assert key(first, 'following') == key(other_followers, 'following')
+    assert key(first, 'followers')[0][0] == FOLLOWERS
+
+
+def test_only_the_tables_of_changed_members_are_extracted_again(tmp_path):
+    cache = ResultCache()
+    first = extraction.extract_all(write_export(tmp_path / 'a.zip', ['alice'], ['bob']), names=NAMES, cache=cache)
+
+    again = extraction.extract_all(write_export(tmp_path / 'b.zip', ['alice'], ['bob']), names=NAMES, cache=cache)
+    assert (cache.hits, cache.misses) == (2, 2)
+    for name in NAMES:
+        pd.testing.assert_frame_equal(again[name], first[name])
+
+    changed = extraction.extract_all(write_export(tmp_path / 'c.zip', ['carol'], ['bob']), names=NAMES, cache=cache)
+    assert (cache.hits, cache.misses) == (3, 3)
+    assert changed['followers']['user_name'].tolist() == ['carol']
+
+
+@pytest.mark.parametrize('change', ['version', 'timestamps'])
+def test_a_new_extractor_version_or_other_options_miss_the_cache(tmp_path, monkeypatch, change):
+    cache = ResultCache()
+    path = write_export(tmp_path / 'a.zip', ['alice'], ['bob'])
+    extraction.extract_all(path, names=NAMES, cache=cache)
+
+    if change == 'version':
+        monkeypatch.setitem(extraction.VERSIONS, 'followers', extraction.VERSIONS['followers'] + 1)
+        extraction.extract_all(path, names=NAMES, cache=cache)
+        assert (cache.hits, cache.misses) == (1, 3)
+    else:
+        extraction.extract_all(path, names=NAMES, cache=cache, timestamps='datetime')
+        assert (cache.hits, cache.misses) == (0, 4)
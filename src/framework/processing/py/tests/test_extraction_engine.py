@@ -0,0 +1,92 @@
+import zipfile
+
+import pytest
+
+from port.archive import ArchiveIndex, open_archive
+from port.extraction_engine import ExtractorSpec, Field, extract_table, resolve_members, timestamp_key
+from port.html_records import RecordSelector
+
+
+def index(*names: str) -> ArchiveIndex:
+    return ArchiveIndex([zipfile.ZipInfo(name) for name in names])
+
+
+@pytest.mark.parametrize('names', [
+    ['connections/followers_and_following/followers.html'],
+    ['connections/followers_and_following/followers_1.html'],
+    ['connections/followers_and_following/followers_2.html', 'connections/followers_and_following/followers_1.html'],
+])
+@pytest.mark.parametrize('member', [
+    'followers_and_following/followers.html', 'followers_and_following/followers_1.html',
+])
+def test_a_member_is_found_whichever_parts_the_export_has(names, member):
+    found = [path for path, _ in resolve_members(member, index(*names, 'other/followers_3.json'))]
+
+    assert found == sorted(names)
+
+
+def test_a_missing_member_raises():
+    with pytest.raises(KeyError):
+        resolve_members('following.html', index('followers_1.html'))
+
+
+def test_a_pattern_finds_every_member_in_part_order():
+    found = resolve_members('inbox/*/*.html', index('a/inbox/bob/message_2.html', 'a/inbox/bob/message_1.html',
+                                                    'a/inbox/carol/message_1.html', 'a/inbox/carol/photo.jpg'))
+
+    assert found == [
+        ('a/inbox/bob/message_1.html', 'bob/message_1.html'),
+        ('a/inbox/bob/message_2.html', 'bob/message_2.html'),
+        ('a/inbox/carol/message_1.html', 'carol/message_1.html'),
+    ]
+
+
+@pytest.mark.parametrize('earlier, later', [
+    ('Jan 28, 2024 1:00pm', 'Jan 28, 2024 2:00pm'),
+    ('Jan 28, 2024 11:59am', 'Jan 28, 2024 12:00pm'),
+    ('Dec 31, 2023', 'Jan 1, 2024 12:00am'),
+    ('Jan 28, 2024 13:00', 'Jan 28, 2024, 2:00pm'),
+    ('Sept 1, 2023', 'Oct 1, 2023'),
+    ('28. Jan. 2024, 13:00', '28. Januar 2024, 14:00'),
+    ('30. April 2024', '1. Mai 2024'),
+    ('31. Dez. 2023, 23:59', '1. Jan. 2024, 00:00'),
+    ('28.01.2024, 13:00', '28.02.2024, 09:00'),
+    ('28. März 2024', '28.04.2024'),
+    ('soon', 'Jan 1, 1970'),
+])
+def test_timestamp_key_orders_the_notations_of_the_export(earlier, later):
+    assert timestamp_key(earlier) < timestamp_key(later)
+
+
+def test_the_same_time_in_english_and_german_has_the_same_key():
+    assert timestamp_key('Jan 28, 2024 1:05pm') == timestamp_key('28. Jan. 2024, 13:05')
+
+
+SPEC = ExtractorSpec(
+    member='followers_and_following/followers.html',
+    records=RecordSelector('div', 'record'),
+    fields=(Field('name', './/b/text()'), Field('timestamp', './/i/text()')),
+    columns=('name', 'timestamp'),
+)
+
+
+def page(records: list[tuple[str, str]]) -> str:
+    body = ''.join(f'<div class="record"><b>{name}</b><i>{time}</i></div>' for name, time in records)
+    return f'<html><head><meta charset="utf-8"></head><body>{body}</body></html>'
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_the_parts_of_a_german_member_are_merged_newest_first(tmp_path, stream):
+    path = tmp_path / 'export.zip'
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('followers_and_following/followers_1.html', page([
+            ('a', '3. Dez. 2023, 10:00'), ('c', '1. Mai 2023, 09:00'), ('e', '2. Jan. 2023, 08:00'),
+        ]))
+        archive.writestr('followers_and_following/followers_2.html', page([
+            ('b', '30. Okt. 2023, 23:00'), ('d', '15. März 2023, 12:00'),
+        ]))
+
+    with open_archive(str(path)) as archive:
+        df = extract_table((SPEC,), archive, stream)
+
+    assert df['name'].tolist() == ['a', 'b', 'c', 'd', 'e']
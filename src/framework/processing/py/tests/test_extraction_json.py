@@ -0,0 +1,152 @@
+import json
+import zipfile
+
+import pandas as pd
+import pytest
+
+from port.extraction_insta import TABLES, extract_all_json, extract_followers
+from port.extraction_insta_html_lxml import TABLES as HTML_TABLES
+from port.extraction_json import JsonField, JsonSpec, constant, extract_table, fix_encoding, format_timestamps, \
+    from_member
+
+
+FOLLOWERS = 'connections/followers_and_following/followers_{}.json'
+FOLLOWING = 'connections/followers_and_following/following.json'
+
+# 2024-01-28 13:00 UTC
+EPOCH = 1_706_446_800
+
+
+def connection(user: str, timestamp: int) -> dict:
+    return {'title': '', 'media_list_data': [], 'string_list_data': [
+        {'href': f'https://www.instagram.com/{user}', 'value': user, 'timestamp': timestamp},
+    ]}
+
+
+def write_zip(path, members: dict[str, object]) -> str:
+    with zipfile.ZipFile(path, 'w') as f:
+        for name, document in members.items():
+            f.writestr(name, json.dumps(document))
+    return str(path)
+
+
+@pytest.fixture
+def export(tmp_path):
+    return write_zip(tmp_path / 'export.zip', {
+        # The parts of a family are merged newest first
+        FOLLOWERS.format(1): [connection('alice', EPOCH), connection('carol', EPOCH - 120)],
+        FOLLOWERS.format(2): [connection('bob', EPOCH - 60), {'string_list_data': []}],
+        FOLLOWING: {'relationships_following': [connection('ZoÃ«', EPOCH + 3600)]},
+    })
+
+
+@pytest.mark.parametrize('stream', [None, False, True])
+def test_the_parts_of_a_member_are_merged_newest_first(export, stream):
+    df = extract_followers(export, stream)
+
+    assert df.columns.tolist() == list(HTML_TABLES['followers'][0].columns)
+    assert df['user_name'].tolist() == ['alice', 'bob', 'carol']
+    assert df['timestamp'].tolist() == ['Jan 28, 2024 1:00pm', 'Jan 28, 2024 12:59pm', 'Jan 28, 2024 12:58pm']
+    assert (df['type'] == 'follower').all()
+
+
+def test_every_json_table_has_the_columns_of_the_html_table():
+    for name, specs in TABLES.items():
+        for spec in specs:
+            assert spec.columns == HTML_TABLES[name][0].columns, name
+
+
+def test_epoch_timestamps_are_kept_as_numbers(export):
+    tables = extract_all_json(export, ['followers', 'following'], timestamps='epoch')
+
+    assert tables['followers']['timestamp'].dtype == 'float64'
+    assert tables['followers']['timestamp'].tolist() == [EPOCH, EPOCH - 60, EPOCH - 120]
+    assert tables['following']['user_name'].tolist() == ['Zoë']
+
+
+@pytest.mark.parametrize('epochs, unit, texts', [
+    ([EPOCH, EPOCH + 3600 * 11, 0], 's', ['Jan 28, 2024 1:00pm', 'Jan 29, 2024 12:00am', 'Jan 1, 1970 12:00am']),
+    ([EPOCH * 1000 - 60_000], 'ms', ['Jan 28, 2024 12:59pm']),
+    ([EPOCH - 3600, None, 'soon'], 's', ['Jan 28, 2024 12:00pm', None, None]),
+    ([None], 's', [None]),
+])
+def test_format_timestamps(epochs, unit, texts):
+    formatted = format_timestamps(pd.Series(epochs, dtype=object), unit)
+
+    assert [None if pd.isna(text) else text for text in formatted] == texts
+
+
+@pytest.mark.parametrize('value, fixed', [
+    ('ZoÃ«', 'Zoë'),
+    ('alice', 'alice'),
+    ('Zoë', 'Zoë'),
+    ('€', '€'),
+])
+def test_fix_encoding(value, fixed):
+    assert fix_encoding(value) == fixed
+
+
+def test_fields_from_the_document_the_member_and_constants(tmp_path):
+    path = write_zip(tmp_path / 'export.zip', {
+        'inbox/bob_1/message_1.json': {
+            'participants': [{'name': 'bob'}, {'name': 'me'}],
+            'messages': [{'sender_name': 'bob', 'share': {'link': 'a'}}, {'sender_name': 'me'}],
+        },
+    })
+    spec = JsonSpec(
+        member='inbox/*/message_1.json',
+        records='messages',
+        fields=(
+            constant('type', 'message'),
+            from_member('chat', lambda relative: relative.split('/')[0]),
+            JsonField('partner', ('participants', 0, 'name'), scope='document'),
+            JsonField('sender', ('sender_name',)),
+            JsonField('link', ('share', 'link'), required=True),
+        ),
+        columns=('type', 'chat', 'partner', 'sender', 'link'),
+    )
+
+    assert not spec.streamable
+    assert extract_table((spec,), path).values.tolist() == [['message', 'bob_1', 'bob', 'bob', 'a']]
+
+
+def test_explode_limit_and_post(tmp_path):
+    path = write_zip(tmp_path / 'export.zip', {'saved.json': {'saved': [
+        {'links': ['a', 'b']}, {'links': ['c']}, {'links': ['skip']}, {'links': ['d']},
+    ]}})
+    spec = JsonSpec(
+        member='saved.json',
+        records='saved',
+        fields=(JsonField('link', ('links',)),),
+        columns=('link',),
+        post=(lambda row: None if row['link'] == ['skip'] else row,),
+        explode='link',
+        limit=3,
+    )
+
+    for stream in (False, True):
+        assert extract_table((spec,), path, stream)['link'].tolist() == ['a', 'b', 'c']
+
+
+def test_a_localized_spec_reads_the_labels_of_the_export(tmp_path):
+    path = write_zip(tmp_path / 'export.zip', {'searches.json': {'searches': [
+        {'string_map_data': {'Zeit': {'timestamp': EPOCH}, 'Suche': {'value': 'katzen'}}},
+    ]}})
+    spec = JsonSpec(
+        member='searches.json',
+        records='searches',
+        fields=(
+            JsonField('timestamp', ('string_map_data', 'Time', 'timestamp'), unit='s'),
+            JsonField('search', ('string_map_data', ('Search', 'Query'), 'value')),
+        ),
+        columns=('timestamp', 'search'),
+    )
+
+    assert extract_table((spec,), path)['search'].tolist() == [None]
+    localized = spec.localize({'Time': 'Zeit', 'Search': 'Suche'})
+    assert extract_table((localized,), path).values.tolist() == [['Jan 28, 2024 1:00pm', 'katzen']]
+
+
+def test_columns_need_a_field():
+    with pytest.raises(ValueError):
+        JsonSpec(member='a.json', records=None, fields=(JsonField('a', ('a',)),), columns=('a', 'b'))
@@ -0,0 +1,123 @@
+import pytest
+
+from port.html_records import RecordSelector
+from port.html_scanner import RecordTemplate, UnexpectedMarkup, unescape
+
+
+RECORDS = RecordSelector('div', 'record')
+TEMPLATE = RecordTemplate(RECORDS, '<div class="record"><span...>{}</span><b>{name}</b><i>{time}</i></div>')
+
+
+def page(body: str, head: str = '<meta charset="utf-8">') -> bytes:
+    return f'<html><head>{head}</head><body>{body}</body></html>'.encode('utf-8')
+
+
+def record(name: str, time: str = 'Jan 28, 2024 1:00pm') -> str:
+    return f'<div class="record"><span class="label">Name</span><b>{name}</b><i>{time}</i></div>'
+
+
+def test_scan_gives_the_fields_of_every_record():
+    data = page(record('alice') + record('bob', 'Feb 1, 2024 9:30am'))
+
+    assert TEMPLATE.scan(data) == [
+        {'name': 'alice', 'time': 'Jan 28, 2024 1:00pm'},
+        {'name': 'bob', 'time': 'Feb 1, 2024 9:30am'},
+    ]
+
+
+def test_scan_gives_none_for_an_empty_text():
+    assert TEMPLATE.scan(page(record(''))) == [{'name': None, 'time': 'Jan 28, 2024 1:00pm'}]
+
+
+def test_scan_of_a_member_without_records():
+    assert TEMPLATE.scan(page('<div class="other"></div>')) == []
+
+
+def test_a_record_that_does_not_fit_falls_back():
+    # The second record carries the class token of the records, but an extra element
+    odd = '<div class="record"><span>Name</span><b>carol</b><em>!</em><i>Jan 1, 2024 1:00pm</i></div>'
+
+    assert TEMPLATE.scan(page(record('alice') + odd)) is None
+
+
+def test_the_token_count_looks_at_the_whole_body():
+    # One token of the records that occurs only in the matched records is enough, 'box' also occurs elsewhere
+    template = RecordTemplate(RecordSelector('div', 'record box'), '<div class="record box"><b>{name}</b></div>')
+    data = page('<div class="box"></div><div class="record box"><b>alice</b></div>')
+
+    odd = page('<div class="record box"><b>alice</b></div><div class="record box"><i>x</i></div>')
+
+    assert template.scan(data) == [{'name': 'alice'}]
+    assert template.scan(odd) is None
+
+
+@pytest.mark.parametrize('body', [
+    record('alice') + '<!-- <div class="record"> -->',
+    record('alice') + '<script>var a = "<div>"</script>',
+    record('alice') + '<textarea><b>x</b></textarea>',
+])
+def test_comments_and_scripts_fall_back(body):
+    assert TEMPLATE.scan(page(body)) is None
+
+
+def test_a_document_that_is_not_declared_utf8_falls_back():
+    assert TEMPLATE.scan(page(record('alice'), head='<meta charset="windows-1252">')) is None
+    assert TEMPLATE.scan(page(record('alice'), head='')) is None
+
+
+def test_carriage_returns_fall_back():
+    assert TEMPLATE.scan(page(record('alice') + '\r\n')) is None
+
+
+def test_invalid_utf8_falls_back():
+    data = page(record('alice')).replace(b'alice', b'al\xffice')
+
+    assert TEMPLATE.scan(data) is None
+
+
+@pytest.mark.parametrize('text, expected', [
+    (b'plain', 'plain'),
+    (b'caf\xc3\xa9', 'café'),
+    (b'a &amp; b', 'a & b'),
+    (b'&lt;tag&gt; &quot;q&quot; &apos;', '<tag> "q" \''),
+    (b'no&nbsp;break', 'no\xa0break'),
+    (b'&#233;&#xE9;&#XE9;', 'ééé'),
+    (b'&#128512;', '\U0001F600'),
+    (b'tab\tand\nnewline', 'tab\tand\nnewline'),
+])
+def test_unescape(text, expected):
+    assert unescape(text) == expected
+
+
+@pytest.mark.parametrize('text', [
+    b'a & b',
+    b'a &amp b',
+    b'&eacute;',
+    b'&copy;',
+    b'&#0;',
+    b'&#128;',
+    b'&#x9f;',
+    b'&#xD800;',
+    b'&#1114112;',
+    b'bell\x07',
+    b'delete\x7f',
+])
+def test_unescape_leaves_what_lxml_might_read_differently(text):
+    with pytest.raises(UnexpectedMarkup):
+        unescape(text)
+
+
+def test_an_unexpected_text_makes_the_member_fall_back():
+    assert TEMPLATE.scan(page(record('caf&eacute;'))) is None
+    assert TEMPLATE.scan(page(record('caf&amp;&#233;'))) == [{'name': 'caf&é', 'time': 'Jan 28, 2024 1:00pm'}]
+
+
+def test_tag_placeholders_take_any_attributes():
+    template = RecordTemplate(RECORDS, '<div class="record"><table...><tr><td>{value}</td></tr></table></div>')
+    body = (
+        '<div class="record"><table><tr><td>a</td></tr></table></div>'
+        '<div class="record"><table style="x" class="y"><tr><td>b</td></tr></table></div>'
+    )
+
+    assert template.scan(page(body)) == [{'value': 'a'}, {'value': 'b'}]
+    assert template.scan(page('<div class="record"><tables><tr><td>a</td></tr></tables></div>')) is None
@@ -0,0 +1,154 @@
+import zipfile
+
+import pandas as pd
+import pytest
+
+import port.extraction as extraction
+import port.progress as progress_module
+import port.script as script
+from port.extraction_cache import ResultCache
+from port.progress import MemberDone, Progress, Throttle, run_stages
+
+
+FOLLOWERS = 'connections/followers_and_following/followers_1.html'
+FOLLOWING = 'connections/followers_and_following/following.html'
+NAMES = ['followers', 'following']
+
+
+def connections(*users: str) -> bytes:
+    records = ''.join(
+        f'<div><div><a href="https://www.instagram.com/{user}">{user}</a></div><div>Jan 28, 2024 1:00pm</div></div>'
+        for user in users
+    )
+    return f'<html><head><meta charset="utf-8"></head><body>{records}</body></html>'.encode('utf-8')
+
+
+@pytest.fixture
+def export(tmp_path):
+    path = tmp_path / 'export.zip'
+    with zipfile.ZipFile(path, 'w') as f:
+        f.writestr(FOLLOWERS, connections('alice', 'bob'))
+        f.writestr(FOLLOWING, connections('carol'))
+        f.writestr('media/1.jpg', b'jpg' * 1000)
+    return str(path)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    A clock for time.perf_counter that only moves when the test moves it
+    """
+    now = [100.0]
+    monkeypatch.setattr(progress_module.time, 'perf_counter', lambda: now[0])
+    return now
+
+
+def test_progress_is_the_share_of_the_bytes_read(clock):
+    progress = Progress(400, started=clock[0])
+    assert (progress.percentage, progress.eta, progress.table) == (0, None, None)
+
+    clock[0] += 10
+    progress.advance(MemberDone('a.html', ('followers', 'following'), 100))
+    assert (progress.percentage, progress.eta, progress.table) == (25, 30.0, 'followers')
+
+    progress.advance(MemberDone('b.html', (), 1000))
+    assert (progress.bytes_done, progress.percentage, progress.eta) == (400, 100, 0.0)
+    assert progress.table == 'followers'
+
+
+def test_nothing_to_read_is_done():
+    assert Progress(0).percentage == 100
+
+
+def test_run_stages_returns_what_the_stages_return():
+    def stages():
+        yield 1
+        yield 2
+        return 'tables'
+
+    assert run_stages(stages()) == 'tables'
+
+
+def test_the_throttle_keeps_renders_to_a_share_of_the_time(clock):
+    throttle = Throttle(min_interval=0.25, max_share=0.05)
+    assert throttle.due()
+
+    throttle.rendered(0.001)
+    clock[0] += 0.2
+    assert not throttle.due()
+    clock[0] += 0.05
+    assert throttle.due()
+
+    # A render of 100 ms may come after 2 seconds
+    throttle.rendered(0.1)
+    clock[0] += 1.9
+    assert not throttle.due()
+    clock[0] += 0.1
+    assert throttle.due()
+
+
+def test_the_stages_yield_progress_and_return_the_tables(export):
+    stages = extraction.extract_all_stages(export, names=NAMES)
+    seen = []
+    while True:
+        try:
+            progress = next(stages)
+        except StopIteration as stop:
+            tables = stop.value
+            break
+        seen.append((progress.bytes_done, progress.percentage))
+
+    with zipfile.ZipFile(export) as f:
+        total = f.getinfo(FOLLOWERS).file_size + f.getinfo(FOLLOWING).file_size
+    assert seen[0] == (0, 0) and seen[-1] == (total, 100)
+    assert [done for done, _ in seen] == sorted(done for done, _ in seen)
+    assert len(seen) == 3
+    for name in NAMES:
+        pd.testing.assert_frame_equal(tables[name], extraction.extract_all(export, names=NAMES)[name])
+
+
+def test_tables_from_the_cache_are_not_counted(export):
+    cache = ResultCache()
+    extraction.extract_all(export, names=NAMES, cache=cache)
+
+    stages = extraction.extract_all_stages(export, names=NAMES, cache=cache)
+
+    progress = next(stages)
+    assert (progress.bytes_total, progress.percentage) == (0, 100)
+    assert set(run_stages(stages)) == set(NAMES)
+
+
+def test_the_progress_is_rendered_when_the_throttle_allows(clock):
+    def stages():
+        progress = Progress(100, started=clock[0])
+        for size in (10, 10, 10, 70):
+            progress.advance(MemberDone('a.html', ('links_shared_in_dms',), size))
+            clock[0] += 0.1
+            yield progress
+        return {'followers': 'table'}
+
+    rendering = script.render_progress('Instagram', stages())
+    commands = []
+    while True:
+        try:
+            commands.append(next(rendering).toDict())
+        except StopIteration as stop:
+            assert stop.value == {'followers': 'table'}
+            break
+
+    bodies = [command['page']['body'] for command in commands]
+    assert [body['__type__'] for body in bodies] == ['PropsUIPromptProgress'] * 2
+    assert [body['percentage'] for body in bodies] == [10, 100]
+    assert bodies[0]['message']['translations']['en'] == 'Reading links shared in dms: 10%, less than a minute left'
+
+
+def test_the_prompt_tells_how_long_it_takes(clock):
+    progress = Progress(100, started=clock[0])
+    clock[0] += 300
+    progress.advance(MemberDone('a.html', (), 25))
+
+    message = script.generate_progress_prompt('Instagram', progress).toDict()['message']['translations']
+    assert message == {
+        'en': 'Reading your file: 25%, about 15 min left',
+        'nl': 'Bezig met uw bestand: 25%, nog ongeveer 15 min',
+    }
@@ -0,0 +1,182 @@
+"""
+The byte scanner (port.html_scanner) and lxml give the same rows for every table with a template
+"""
+
+import io
+import re
+import zipfile
+
+import pytest
+
+from port.archive import ArchiveSession, open_archive
+from port.extraction_insta_html_lxml import TABLES, check_scanner_parity, extract_all_html
+from port.html_records import STREAM_THRESHOLD_BYTES
+from port.html_scanner import SCAN_CHUNK_BYTES
+
+
+SCANNED = [name for name, specs in TABLES.items() if any(spec.template is not None for spec in specs)]
+
+# Texts with what the scanner has to read as lxml does: entities, character references,
+# non-ASCII and the narrow no-break space of the timestamps
+VALUES = ['alice', 'bob &amp; carol', 'caf&#233;', 'Zoë', '&lt;b&gt;', '']
+TIMES = ['Jan 28, 2024 1:00\u202fpm', 'Feb 2, 2024 10:15am', '']
+TIME_FIELDS = ('timestamp', 'last_login')
+
+
+def record(template, index: int) -> str:
+    values = {}
+    for field in template.fields:
+        texts = TIMES if field in TIME_FIELDS else VALUES
+        values[field] = texts[index % len(texts)]
+    markup = re.sub(r'<(\w+)\.\.\.>', r'<\1 class="_a6_o" style="width: 100%">', template.markup)
+    return re.sub(r'\{(\w*)\}', lambda match: values.get(match[1], 'Label'), markup)
+
+
+def page(records: list[str]) -> bytes:
+    return (
+        '<html><head><meta charset="utf-8"><title>Export</title></head>'
+        '<body><div class="_a705"><div class="_a706" role="main">' + ''.join(records) + '</div></div></body></html>'
+    ).encode('utf-8')
+
+
+def write_export(path, odd: bool = False) -> dict[str, bytes]:
+    """
+    An HTML export with 12 records on every page that can be scanned, odd adds a record
+    that does not fit the template to every page, so the pages fall back to lxml
+    """
+    pages = {}
+    for name in SCANNED:
+        for spec in TABLES[name]:
+            if spec.template is None:
+                continue
+            records = [record(spec.template, index) for index in range(12)]
+            if odd:
+                records.insert(5, records[0].replace('<div><div>', '<div><span>new</span><div>', 1))
+            pages[spec.member] = page(records)
+    with zipfile.ZipFile(path, 'w') as archive:
+        for member, data in pages.items():
+            archive.writestr(member, data)
+    return pages
+
+
+@pytest.fixture(scope='module')
+def export(tmp_path_factory):
+    path = tmp_path_factory.mktemp('export') / 'export.zip'
+    pages = write_export(path)
+    return path, pages
+
+
+def test_the_fixture_pages_are_scanned(export):
+    _, pages = export
+    for name in SCANNED:
+        for spec in TABLES[name]:
+            scanned = spec.template.scan(pages[spec.member])
+            assert scanned is not None and len(scanned) == 12, spec.member
+
+
+@pytest.mark.parametrize('name', SCANNED)
+def test_scan_and_lxml_give_the_same_rows(export, name):
+    path, _ = export
+    with open_archive(str(path)) as archive:
+        scanned = extract_all_html(archive, [name], scan=True)[name]
+        parsed = extract_all_html(archive, [name], scan=False)[name]
+
+    assert len(parsed) == 12
+    assert scanned.equals(parsed)
+
+
+def test_check_scanner_parity(export):
+    path, _ = export
+
+    assert check_scanner_parity(str(path)) == dict.fromkeys(SCANNED, True)
+
+
+def test_pages_that_do_not_fit_fall_back_to_lxml(tmp_path):
+    path = tmp_path / 'odd.zip'
+    pages = write_export(path, odd=True)
+    for name in SCANNED:
+        for spec in TABLES[name]:
+            assert spec.template.scan(pages[spec.member]) is None, spec.member
+
+    with open_archive(str(path)) as archive:
+        scanned = extract_all_html(archive, SCANNED, scan=True)
+        parsed = extract_all_html(archive, SCANNED, scan=False)
+    for name in SCANNED:
+        assert len(parsed[name]) == 13
+        assert scanned[name].equals(parsed[name]), name
+
+
+@pytest.mark.parametrize('chunk_size', [1, 64, 997, SCAN_CHUNK_BYTES])
+def test_scan_file_gives_what_scan_gives(chunk_size):
+    for odd in (False, True):
+        for spec in (spec for name in SCANNED for spec in TABLES[name] if spec.template is not None):
+            records = [record(spec.template, index) for index in range(12)]
+            if odd:
+                records.insert(5, records[0].replace('<div><div>', '<div><span>new</span><div>', 1))
+            data = page(records)
+
+            assert spec.template.scan_file(io.BytesIO(data), chunk_size) == spec.template.scan(data), spec.member
+
+
+@pytest.mark.parametrize('odd', [False, True], ids=['fits', 'odd'])
+@pytest.mark.parametrize('stream', [None, False, True])
+@pytest.mark.parametrize('scan', [True, False])
+def test_scan_and_stream_give_the_same_rows(tmp_path, scan, stream, odd):
+    path = tmp_path / 'export.zip'
+    write_export(path, odd)
+    with open_archive(str(path)) as archive:
+        expected = extract_all_html(archive, SCANNED, stream=False, scan=False)
+        tables = extract_all_html(archive, SCANNED, stream=stream, scan=scan)
+    for name in SCANNED:
+        assert len(tables[name]) == (13 if odd else 12)
+        assert tables[name].equals(expected[name]), name
+
+
+class _Reads(io.RawIOBase):
+    """
+    A member that records the size of every read
+    """
+
+    def __init__(self, f, sizes: list):
+        self.f = f
+        self.sizes = sizes
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        self.sizes.append(size)
+        return self.f.read(size)
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        self.f.close()
+        super().close()
+
+
+@pytest.mark.parametrize('odd', [False, True], ids=['fits', 'odd'])
+@pytest.mark.parametrize('scan', [True, False])
+def test_a_large_member_is_never_read_whole(tmp_path, monkeypatch, scan, odd):
+    spec = TABLES['posts_viewed'][0]
+    records = [record(spec.template, index) for index in range(2)]
+    count = STREAM_THRESHOLD_BYTES // min(map(len, records)) + 1
+    records = records * (count // 2 + 1)
+    if odd:
+        records.insert(len(records) // 2, records[0].replace('<div><div>', '<div><span>new</span><div>', 1))
+    path = tmp_path / 'export.zip'
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(spec.member, page(records))
+
+    sizes = []
+    open_member = ArchiveSession.open
+    monkeypatch.setattr(ArchiveSession, 'open', lambda self, name: _Reads(open_member(self, name), sizes))
+    with open_archive(str(path)) as archive:
+        assert archive.index.info(archive.find(spec.member)).file_size > STREAM_THRESHOLD_BYTES
+        df = extract_all_html(archive, ['posts_viewed'], scan=scan)['posts_viewed']
+
+    assert len(df) == len(records)
+    assert sizes and all(0 <= size <= SCAN_CHUNK_BYTES for size in sizes)
@@ -0,0 +1,118 @@
+import zipfile
+
+import pandas as pd
+import pytest
+
+import port.extraction as extraction
+from port.extraction_insta_html_lxml import TABLES
+from port.schema import SCHEMAS, apply_schema, apply_schemas, intern_accounts, memory_usage
+
+
+def test_every_table_has_a_schema_of_its_columns():
+    assert set(SCHEMAS) == set(extraction.VERSIONS) == set(TABLES)
+    for name, specs in TABLES.items():
+        assert set(SCHEMAS[name]) <= set(specs[0].columns), name
+
+
+def posts_viewed(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        'type': ['post_viewed'] * rows,
+        'timestamp': [f'Jan {1 + i % 3}, 2024 1:00pm' for i in range(rows)],
+        'from_user': [f'user_{i % 7}' for i in range(rows)],
+        'extra': [f'x{i % 2}' for i in range(rows)],
+    }, dtype=object)
+
+
+def test_columns_get_the_types_of_their_schema():
+    df = posts_viewed(100)
+    expected = df.copy()
+
+    apply_schemas({'posts_viewed': df})
+
+    assert {column: str(df[column].dtype) for column in df.columns} == {
+        'type': 'category', 'timestamp': 'category', 'from_user': 'category', 'extra': 'object',
+    }
+    pd.testing.assert_frame_equal(df.astype(object), expected)
+    assert memory_usage(df) < memory_usage(expected) / 2
+
+
+@pytest.mark.parametrize('kind', ['dictionary', 'timestamp'])
+def test_mostly_distinct_values_are_not_dictionary_encoded(kind):
+    df = pd.DataFrame({'value': [f'v{i}' for i in range(10)]}, dtype=object)
+
+    assert str(apply_schema(df, {'value': kind})['value'].dtype) == 'object'
+    df = pd.DataFrame({'value': ['v'] * 10}, dtype=object)
+    assert str(apply_schema(df, {'value': kind})['value'].dtype) == 'category'
+
+
+def test_text_and_converted_columns_are_kept():
+    df = pd.DataFrame({
+        'link': ['https://a'] * 10,
+        'timestamp': pd.to_datetime([1_600_000_000] * 10, unit='s', utc=True),
+    })
+
+    apply_schema(df, {'link': 'text', 'timestamp': 'timestamp', 'missing': 'category'})
+
+    assert str(df['link'].dtype) != 'category'
+    assert pd.api.types.is_datetime64_any_dtype(df['timestamp'].dtype)
+
+
+def test_compact_tables_hold_the_values_of_the_extracted_tables(tmp_path):
+    path = tmp_path / 'export.zip'
+    with zipfile.ZipFile(path, 'w') as f:
+        f.writestr('connections/followers_and_following/following.html', (
+            '<html><body>'
+            + ''.join(f'<div><div><a href="https://www.instagram.com/{user}">{user}</a></div>'
+                      f'<div>Jan 28, 2024 1:00pm</div></div>' for user in ['alice', 'bob', 'alice'])
+            + '</body></html>'
+        ))
+
+    compact = extraction.extract_all(str(path), names=['following'])['following']
+    plain = extraction.extract_all(str(path), names=['following'], compact=False)['following']
+
+    assert str(compact['type'].dtype) == 'category' and str(plain['type'].dtype) != 'category'
+    pd.testing.assert_frame_equal(compact.astype(object), plain.astype(object))
+
+
+def account_tables() -> dict[str, pd.DataFrame]:
+    return {
+        'followers': pd.DataFrame({'type': 'follower', 'user_name': ['carol', 'alice', None], 'link': 'x'}),
+        'posts_viewed': pd.DataFrame({'type': 'post_viewed', 'timestamp': 't', 'from_user': ['bob', 'carol']}),
+        'ads_clicked': pd.DataFrame({'type': 'ad_clicked', 'timestamp': 't', 'from_user': ['Shoes ad']}),
+        'links_shared_in_dms': pd.DataFrame({
+            'type': 'link', 'timestamp': 't', 'link': 'x', 'sender': 'self', 'conversation_partner': ['dave_123'],
+        }),
+        'post_comments': pd.DataFrame(columns=['type', 'timestamp', 'text', 'media_owner'], dtype=object),
+    }
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_the_account_columns_of_an_archive_share_one_dictionary(compact):
+    tables = account_tables()
+    expected = {name: df.copy() for name, df in tables.items()}
+    if compact:
+        apply_schemas(tables)
+
+    accounts = intern_accounts(tables)
+
+    assert accounts.tolist() == ['alice', 'bob', 'carol']
+    followers, viewed = tables['followers']['user_name'], tables['posts_viewed']['from_user']
+    assert followers.cat.categories.equals(accounts) and viewed.cat.categories.equals(accounts)
+    assert tables['post_comments']['media_owner'].cat.categories.equals(accounts)
+    assert followers.cat.codes.tolist() == [2, 0, -1] and viewed.cat.codes.tolist() == [1, 2]
+    for name, df in tables.items():
+        pd.testing.assert_frame_equal(df.astype(object), expected[name].astype(object), check_dtype=False)
+
+
+def test_columns_that_do_not_hold_accounts_keep_their_own_values():
+    tables = account_tables()
+
+    apply_schemas(tables)
+    intern_accounts(tables)
+
+    assert tables['ads_clicked']['from_user'].cat.categories.tolist() == ['Shoes ad']
+    assert tables['links_shared_in_dms']['conversation_partner'].cat.categories.tolist() == ['dave_123']
+
+
+def test_an_archive_without_accounts_has_an_empty_dictionary():
+    assert intern_accounts({'your_topics': pd.DataFrame({'type': ['topic'], 'name': ['Cats']})}).empty
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from port.timestamps import MONTHS, normalize_timestamps
+
+
+def normalized(values: list, language: str) -> list:
+    tables = {'table': pd.DataFrame({'timestamp': values})}
+    return normalize_timestamps(tables, language)['table']['timestamp'].tolist()
+
+
+FULL = {
+    'en': ('January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October',
+           'November', 'December'),
+    'de': ('Januar', 'Februar', 'März', 'April', 'Mai', 'Juni', 'Juli', 'August', 'September', 'Oktober',
+           'November', 'Dezember'),
+}
+SHORT = {
+    'en': ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'),
+    'de': ('Jan', 'Feb', 'Mär', 'Apr', 'Mai', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dez'),
+}
+
+
+def text(language: str, month: str, day: int, time: bool) -> str:
+    if language == 'en':
+        return f'{month} {day}, 2024 1:05pm' if time else f'{month} {day}, 2024'
+    return f'{day}. {month} 2024, 13:05' if time else f'{day}. {month} 2024'
+
+
+NAMES = [
+    (language, month, name)
+    for language in ('en', 'de')
+    for month in range(1, 13)
+    for name in (FULL[language][month - 1], SHORT[language][month - 1], SHORT[language][month - 1] + '.')
+]
+
+
+@pytest.mark.parametrize('language, month, name', NAMES)
+def test_every_month_is_parsed(language, month, name):
+    assert normalized([text(language, name, 28, True), text(language, name, 3, False)], language) == [
+        pd.Timestamp(2024, month, 28, 13, 5, tz='UTC'),
+        pd.Timestamp(2024, month, 3, tz='UTC'),
+    ]
+
+
+@pytest.mark.parametrize('name, month', [('Sept.', 9), ('Mrz', 3), ('Mrz.', 3)])
+def test_other_german_abbreviations(name, month):
+    assert normalized([f'1. {name} 2023'], 'de') == [pd.Timestamp(2023, month, 1, tz='UTC')]
+
+
+def test_every_language_names_every_month():
+    for months in MONTHS.values():
+        assert len(set(months.values())) == 12
+
+
+def test_the_export_notation_with_narrow_no_break_space():
+    assert normalized(['Jan 28, 2024 1:00 pm'], 'en') == [pd.Timestamp(2024, 1, 28, 13, tz='UTC')]
+
+
+def test_values_that_are_not_timestamps_become_nat():
+    assert pd.isna(normalized(['Jan 28, 2024 1:00pm', 'soon'], 'en')[1])
+
+
+def test_epochs_in_seconds_and_milliseconds():
+    assert normalized([1_700_000_000, 1_700_000_000_000], 'en') == [pd.Timestamp(1_700_000_000, unit='s', tz='UTC')] * 2
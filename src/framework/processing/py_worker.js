@@ -50,7 +50,15 @@ function unwrap(response) {
   return new Promise((resolve) => {
     switch (response.payload.__type__) {
       case 'PayloadFile':
-        copyFileToPyFS(response.payload.value, resolve)
+        copyFilesToPyFS([response.payload.value], (paths) => {
+          resolve({ __type__: 'PayloadString', value: paths[0] })
+        })
+        break
+
+      case 'PayloadFiles':
+        copyFilesToPyFS(response.payload.value, (paths) => {
+          resolve({ __type__: 'PayloadStringList', value: paths })
+        })
         break
 
       default:
@@ -59,7 +67,7 @@ function unwrap(response) {
   })
 }
 
-function copyFileToPyFS(file, resolve) {
+function copyFilesToPyFS(files, resolve) {
   directoryName = `/file-input`
   pathStats = self.pyodide.FS.analyzePath(directoryName)
   if (!pathStats.exists) {
@@ -70,11 +78,11 @@ function copyFileToPyFS(file, resolve) {
   self.pyodide.FS.mount(
     self.pyodide.FS.filesystems.WORKERFS,
     {
-      files: [file]
+      files: files
     },
     directoryName
   )
-  resolve({ __type__: 'PayloadString', value: directoryName + '/' + file.name })
+  resolve(files.map((file) => directoryName + '/' + file.name))
 }
 
 function initialise() {
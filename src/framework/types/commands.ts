@@ -42,8 +42,13 @@ export type PayloadResolved =
   PayloadVoid |
   PayloadTrue |
   PayloadString |
+  PayloadStringList |
   PayloadFile |
-  PayloadJSON
+  PayloadFiles |
+  PayloadJSON |
+  PayloadTablePageRequest |
+  PayloadTableSearch |
+  PayloadConsentEdits
 
 export interface PayloadVoid {
   __type__: 'PayloadVoid'
@@ -60,11 +65,21 @@ export interface PayloadString {
   value: string
 }
 
+export interface PayloadStringList {
+  __type__: 'PayloadStringList'
+  value: string[]
+}
+
 export interface PayloadFile {
   __type__: 'PayloadFile'
   value: File
 }
 
+export interface PayloadFiles {
+  __type__: 'PayloadFiles'
+  value: File[]
+}
+
 export interface PayloadJSON {
   __type__: 'PayloadJSON'
   value: string
@@ -73,6 +88,34 @@ export function isPayloadJSON (arg: any): arg is PayloadJSON {
   return isInstanceOf<PayloadJSON>(arg, 'PayloadJSON', ['value'])
 }
 
+// Asks the script for further rows of a paginated consent table, answered with a CommandUITablePage
+export interface PayloadTablePageRequest {
+  __type__: 'PayloadTablePageRequest'
+  value: {
+    table_id: string
+    offset: number
+    limit: number
+  }
+}
+
+// Asks the script for the rows of a paginated consent table that match query, in the whole table,
+// answered with a CommandUITableSearch
+export interface PayloadTableSearch {
+  __type__: 'PayloadTableSearch'
+  value: {
+    table_id: string
+    query: string
+    limit: number
+  }
+}
+
+// The donation of the consent form: a JSON string with the rows the participant deleted per table,
+// as half-open ranges of row ids, and the meta tables: {"deleted": {"<table id>": [[3, 5], [9, 10]]}, "meta": [...]}
+export interface PayloadConsentEdits {
+  __type__: 'PayloadConsentEdits'
+  value: string
+}
+
 export type Command =
   CommandUI |
   CommandSystem
@@ -83,11 +126,14 @@ export function isCommand (arg: any): arg is Command {
 
 export type CommandSystem =
   CommandSystemDonate |
+  CommandSystemDonateChunk |
+  CommandSystemDonateManifest |
   CommandSystemEvent |
   CommandSystemExit
 
 export function isCommandSystem (arg: any): arg is CommandSystem {
-  return isCommandSystemDonate(arg) || isCommandSystemEvent(arg) || isCommandSystemExit(arg)
+  return isCommandSystemDonate(arg) || isCommandSystemDonateChunk(arg) || isCommandSystemDonateManifest(arg) ||
+    isCommandSystemEvent(arg) || isCommandSystemExit(arg)
 }
 
 export interface CommandSystemEvent {
@@ -108,10 +154,20 @@ export function isCommandSystemExit (arg: any): arg is CommandSystemExit {
 }
 
 export type CommandUI =
-  CommandUIRender
+  CommandUIRender |
+  CommandUITable
 
 export function isCommandUI (arg: any): arg is CommandUI {
-  return isCommandUIRender(arg)
+  return isCommandUIRender(arg) || isCommandUITable(arg)
+}
+
+// The answers to the requests of the consent form on screen, they do not render a page
+export type CommandUITable =
+  CommandUITablePage |
+  CommandUITableSearch
+
+export function isCommandUITable (arg: any): arg is CommandUITable {
+  return isCommandUITablePage(arg) || isCommandUITableSearch(arg)
 }
 
 export interface CommandSystemDonate {
@@ -123,6 +179,46 @@ export function isCommandSystemDonate (arg: any): arg is CommandSystemDonate {
   return isInstanceOf<CommandSystemDonate>(arg, 'CommandSystemDonate', ['key', 'json_string'])
 }
 
+// Part of a large donation: data is the gzip compressed, base64 encoded JSON of part of a table,
+// checksum the SHA-256 (hex) of that JSON, size its length in bytes
+// A part of the JSON of the value of one entry of a chunked donation, entry is its position in the donation
+export interface CommandSystemDonateChunk {
+  __type__: 'CommandSystemDonateChunk'
+  key: string
+  sequence: number
+  entry: number
+  table_id: string
+  data: string
+  size: number
+  checksum: string
+}
+export function isCommandSystemDonateChunk (arg: any): arg is CommandSystemDonateChunk {
+  return isInstanceOf<CommandSystemDonateChunk>(arg, 'CommandSystemDonateChunk', ['key', 'sequence', 'entry', 'table_id', 'data', 'checksum'])
+}
+
+export interface DonationChunkInfo {
+  sequence: number
+  entry: number
+  table_id: string
+  size: number
+  checksum: string
+}
+
+// Sent after the chunks of a donation: tables holds the table id of every entry (entries can share an id),
+// the JSON of the chunks of an entry in sequence order is its value,
+// the donation is [{ [tables[entry]]: value }, ...], see reassembleDonation in framework/donation.ts
+export interface CommandSystemDonateManifest {
+  __type__: 'CommandSystemDonateManifest'
+  key: string
+  compression: 'gzip'
+  encoding: 'base64'
+  tables: string[]
+  chunks: DonationChunkInfo[]
+}
+export function isCommandSystemDonateManifest (arg: any): arg is CommandSystemDonateManifest {
+  return isInstanceOf<CommandSystemDonateManifest>(arg, 'CommandSystemDonateManifest', ['key', 'tables', 'chunks'])
+}
+
 export interface CommandUIRender {
   __type__: 'CommandUIRender'
   page: PropsUIPage
@@ -130,3 +226,31 @@ export interface CommandUIRender {
 export function isCommandUIRender (arg: any): arg is CommandUIRender {
   return isInstanceOf<CommandUIRender>(arg, 'CommandUIRender', ['page']) && isPropsUIPage(arg.page)
 }
+
+// Rows of a paginated consent table, appended to the table on screen (data_frame is a ColumnarTable)
+export interface CommandUITablePage {
+  __type__: 'CommandUITablePage'
+  table_id: string
+  offset: number
+  total_rows: number
+  data_frame: string
+}
+export function isCommandUITablePage (arg: any): arg is CommandUITablePage {
+  return isInstanceOf<CommandUITablePage>(arg, 'CommandUITablePage', ['table_id', 'offset', 'total_rows', 'data_frame'])
+}
+
+// Rows of a paginated consent table that match a search of the whole table: matches is the number
+// of matching rows, ranges their row ids as half-open ranges, data_frame (a ColumnarTable) the first
+// of them with their row ids in row_ids
+export interface CommandUITableSearch {
+  __type__: 'CommandUITableSearch'
+  table_id: string
+  query: string
+  data_frame: string
+  row_ids: number[]
+  ranges: number[][]
+  matches: number
+}
+export function isCommandUITableSearch (arg: any): arg is CommandUITableSearch {
+  return isInstanceOf<CommandUITableSearch>(arg, 'CommandUITableSearch', ['table_id', 'query', 'row_ids', 'ranges'])
+}
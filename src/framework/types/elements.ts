@@ -1,7 +1,7 @@
 import { isInstanceOf, isLike } from "../helpers"
 import {} from "./commands"
 import { isPropsUIPage, PropsUIPage } from "./pages"
-import { isPropsUIPrompt, PropsUIPrompt } from "./prompts"
+import { ColumnSummary, isPropsUIPrompt, PropsUIPrompt, Truncation } from "./prompts"
 
 export type PropsUI =
   | PropsUIText
@@ -390,6 +390,24 @@ export interface TableContext {
   deletedRows: string[][]
   visualizations?: any[]
   folded: boolean
+  // Paginated tables: the rows of the whole table, originalBody holds the rows loaded so far
+  totalRows?: number
+  pageSize?: number
+  summary?: ColumnSummary[]
+  truncation?: Truncation
+  // Paginated tables: the last search of the whole table by the script, and of a searched table
+  // the number of matching rows that are not deleted
+  search?: TableSearch
+  searchMatches?: number
+}
+
+// The rows of a paginated table that match query, found in the whole table: ranges holds the row ids
+// of all matching rows as half-open ranges, rows the first of them
+export interface TableSearch {
+  query: string
+  matches: number
+  ranges: number[][]
+  rows: PropsUITableRow[]
 }
 
 export type TableWithContext = TableContext & PropsUITable
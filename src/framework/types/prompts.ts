@@ -10,13 +10,15 @@ export type PropsUIPrompt =
   | PropsUIPromptRadioInput
   | PropsUIPromptConsentForm
   | PropsUIPromptConfirm
+  | PropsUIPromptProgress
 
 export function isPropsUIPrompt(arg: any): arg is PropsUIPrompt {
   return (
     isPropsUIPromptFileInput(arg) ||
     isPropsUIPromptRadioInput(arg) ||
     isPropsUIPromptConsentForm(arg) ||
-    isPropsUIPromptQuestionnaire(arg)
+    isPropsUIPromptQuestionnaire(arg) ||
+    isPropsUIPromptProgress(arg)
   )
 }
 
@@ -30,10 +32,22 @@ export function isPropsUIPromptConfirm(arg: any): arg is PropsUIPromptConfirm {
   return isInstanceOf<PropsUIPromptConfirm>(arg, "PropsUIPromptConfirm", ["text", "ok", "cancel"])
 }
 
+// Shown while a step takes a while, the prompt resolves as soon as it is rendered
+export interface PropsUIPromptProgress {
+  __type__: "PropsUIPromptProgress"
+  description: Text
+  message: Text
+  percentage?: number
+}
+export function isPropsUIPromptProgress(arg: any): arg is PropsUIPromptProgress {
+  return isInstanceOf<PropsUIPromptProgress>(arg, "PropsUIPromptProgress", ["description", "message"])
+}
+
 export interface PropsUIPromptFileInput {
   __type__: "PropsUIPromptFileInput"
   description: Text
   extensions: string
+  multiple?: boolean
 }
 export function isPropsUIPromptFileInput(arg: any): arg is PropsUIPromptFileInput {
   return isInstanceOf<PropsUIPromptFileInput>(arg, "PropsUIPromptFileInput", ["description", "extensions"])
@@ -62,12 +76,20 @@ export function isPropsUIPromptConsentForm(arg: any): arg is PropsUIPromptConsen
 
 export interface PropsUIPromptConsentFormTable {
   __type__: "PropsUIPromptConsentFormTable"
+  // 1 (or absent): data_frame is DataFrame.to_json(), 2: data_frame is a ColumnarTable
+  version?: number
   id: string
   title: Text
   description: Text
   data_frame: any
   visualizations: any
   folded: boolean
+  // Paginated tables: data_frame holds the first page_size of total_rows rows
+  total_rows?: number
+  page_size?: number
+  summary?: ColumnSummary[]
+  // The extraction of the table was cut short on its budget, the table is incomplete
+  truncation?: Truncation | null
 }
 export function isPropsUIPromptConsentFormTable(arg: any): arg is PropsUIPromptConsentFormTable {
   return isInstanceOf<PropsUIPromptConsentFormTable>(arg, "PropsUIPromptConsentFormTable", [
@@ -78,6 +100,44 @@ export function isPropsUIPromptConsentFormTable(arg: any): arg is PropsUIPromptC
   ])
 }
 
+export interface ColumnarTableColumn {
+  name: string
+  // One of: dictionary and codes, timestamps (epoch milliseconds), values
+  dictionary?: any[]
+  codes?: number[]
+  timestamps?: Array<number | null>
+  values?: any[]
+}
+
+// Of the whole table, first and last are the epoch milliseconds of a timestamp column
+export interface ColumnSummary {
+  name: string
+  distinct: number
+  missing: number
+  first?: number
+  last?: number
+}
+
+// How the extraction of a table was cut short: reason is "rows", "time" or "session",
+// coverage the share of the files (or conversations) of the table that was read
+export interface Truncation {
+  reason: string
+  members_read: number
+  members_total: number
+  coverage: number
+  rows: number
+}
+
+export interface ColumnarTable {
+  __type__: "ColumnarTable"
+  version: number
+  length: number
+  columns: ColumnarTableColumn[]
+}
+export function isColumnarTable(arg: any): arg is ColumnarTable {
+  return isInstanceOf<ColumnarTable>(arg, "ColumnarTable", ["version", "length", "columns"])
+}
+
  export interface PropsUIPromptQuestionnaire {
   __type__: 'PropsUIPromptQuestionnaire'
   questions: PropsUIQuestionMultipleChoice[]
@@ -1,6 +1,6 @@
 import * as ReactDOM from 'react-dom/client'
 import { VisualisationEngine } from '../../types/modules'
-import { Response, Payload, CommandUIRender } from '../../types/commands'
+import { Response, Payload, CommandUI, CommandUITable, isCommandUITable } from '../../types/commands'
 import { PropsUIPage } from '../../types/pages'
 import VisualisationFactory from './factory'
 import { Main } from './main'
@@ -11,6 +11,11 @@ export default class ReactEngine implements VisualisationEngine {
   locale!: string
   root!: ReactDOM.Root
 
+  // Resolves the command the page on screen currently answers, a page request or a search
+  // of a consent table is answered by a CommandUITable without rendering the page again
+  resolvePayload: (payload: Payload) => void = () => {}
+  tableListeners = new Set<(command: CommandUITable) => void>()
+
   constructor (factory: VisualisationFactory) {
     this.factory = factory
   }
@@ -21,23 +26,31 @@ export default class ReactEngine implements VisualisationEngine {
     this.locale = locale
   }
 
-  async render (command: CommandUIRender): Promise<Response> {
+  async render (command: CommandUI): Promise<Response> {
     return await new Promise<Response>((resolve) => {
-      this.renderPage(command.page).then(
-        (payload: Payload) => {
-          resolve({ __type__: 'Response', command, payload })
-        },
-        () => {}
-      )
+      this.resolvePayload = (payload: Payload) => {
+        resolve({ __type__: 'Response', command, payload })
+      }
+      if (isCommandUITable(command)) {
+        this.tableListeners.forEach((listener) => listener(command))
+      } else {
+        this.renderPage(command.page)
+      }
     })
   }
 
-  async renderPage (props: PropsUIPage): Promise<any> {
-    return await new Promise<any>((resolve) => {
-      const context = { locale: this.locale, resolve }
-      const page = this.factory.createPage(props, context)
-      this.renderElements([page])
-    })
+  renderPage (props: PropsUIPage): void {
+    this.tableListeners.clear()
+    const context = {
+      locale: this.locale,
+      resolve: (payload: Payload) => this.resolvePayload(payload),
+      onTableCommand: (listener: (command: CommandUITable) => void) => {
+        this.tableListeners.add(listener)
+        return () => { this.tableListeners.delete(listener) }
+      }
+    }
+    const page = this.factory.createPage(props, context)
+    this.renderElements([page])
   }
 
   terminate (): void {
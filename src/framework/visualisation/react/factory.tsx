@@ -7,12 +7,14 @@ import {
   PropsUIPage
 } from '../../types/pages'
 import { DonationPage } from './ui/pages/donation_page'
-import { Payload } from '../../types/commands'
+import { CommandUITable, Payload } from '../../types/commands'
 import { ErrorPage } from './ui/pages/error_page'
 
 export interface ReactFactoryContext {
   locale: string
   resolve?: (payload: Payload) => void
+  // Subscribes to the pages and searches of paginated consent tables, returns the unsubscribe function
+  onTableCommand?: (listener: (command: CommandUITable) => void) => () => void
 }
 
 export default class ReactFactory {
@@ -1,5 +1,5 @@
 import { useCallback, useMemo, useState, useEffect, useRef } from "react"
-import { TableWithContext, PropsUITableRow } from "../../../../types/elements"
+import { TableWithContext, PropsUITableRow, TableSearch } from "../../../../types/elements"
 import { Figure } from "../visualization_plugin/figure"
 import { TableItems } from "./table_items"
 import { SearchBar } from "./search_bar"
@@ -12,10 +12,12 @@ interface TableContainerProps {
   id: string
   table: TableWithContext
   updateTable: (tableId: string, table: TableWithContext) => void
+  // Searches the whole table, for tables with rows that are not loaded (the result arrives in table.search)
+  onSearch?: (query: string) => void
   locale: string
 }
 
-export const TableContainer = ({ id, table, updateTable, locale }: TableContainerProps): JSX.Element => {
+export const TableContainer = ({ id, table, updateTable, onSearch, locale }: TableContainerProps): JSX.Element => {
   const tableVisualizations = table.visualizations != null ? table.visualizations : []
   const [searchFilterIds, setSearchFilterIds] = useState<Set<string>>()
   const [search, setSearch] = useState<string>("")
@@ -27,6 +29,7 @@ export const TableContainer = ({ id, table, updateTable, locale }: TableContaine
     const timer = setTimeout(() => {
       const ids = searchRows(table.originalBody.rows, search)
       setSearchFilterIds(ids)
+      if (ids !== undefined) onSearch?.(search.trim())
       if (search !== "" && lastSearch.current === "") {
         setTimeout(() => setShow(true), 10)
       }
@@ -35,11 +38,20 @@ export const TableContainer = ({ id, table, updateTable, locale }: TableContaine
     return () => clearTimeout(timer)
   }, [search, lastSearch])
 
+  // Until the search of the whole table arrives, the loaded rows that match are shown
+  const remoteSearch = table.search !== undefined && table.search.query === search.trim() ? table.search : undefined
+
   const searchedTable = useMemo(() => {
     if (searchFilterIds === undefined) return table
+    if (remoteSearch !== undefined) {
+      const deleteIds = deletedIds(table.deletedRows)
+      const rows = remoteSearch.rows.filter((row) => !deleteIds.has(row.id))
+      const searchMatches = searchIds(remoteSearch).filter((id) => !deleteIds.has(id)).length
+      return { ...table, body: { ...table.body, rows }, searchMatches }
+    }
     const filteredRows = table.body.rows.filter((row) => searchFilterIds.has(row.id))
     return { ...table, body: { ...table.body, rows: filteredRows } }
-  }, [table, searchFilterIds])
+  }, [table, searchFilterIds, remoteSearch])
 
   const handleDelete = useCallback(
     (rowIds?: string[]) => {
@@ -53,6 +65,8 @@ export const TableContainer = ({ id, table, updateTable, locale }: TableContaine
       }
       if (rowIds.length > 0) {
         if (rowIds.length === searchedTable?.body?.rows?.length) {
+          // all rows that meet the search condition, of a search of the whole table also those not loaded
+          if (remoteSearch !== undefined) rowIds = searchIds(remoteSearch)
           setSearch("")
           setSearchFilterIds(undefined)
         }
@@ -61,7 +75,7 @@ export const TableContainer = ({ id, table, updateTable, locale }: TableContaine
         updateTable(id, newTable)
       }
     },
-    [id, table, searchedTable]
+    [id, table, searchedTable, remoteSearch]
   )
 
   const handleUndo = useCallback(() => {
@@ -141,16 +155,32 @@ export const TableContainer = ({ id, table, updateTable, locale }: TableContaine
   )
 }
 
-function deleteTableRows(table: TableWithContext, deletedRows: string[][]): TableWithContext {
+function deletedIds(deletedRows: string[][]): Set<string> {
   const deleteIds = new Set<string>()
   for (const deletedSet of deletedRows) {
     for (const id of deletedSet) {
       deleteIds.add(id)
     }
   }
+  return deleteIds
+}
+
+// The row ids of all rows that match a search of the whole table
+function searchIds(search: TableSearch): string[] {
+  const ids: string[] = []
+  for (const [start, end] of search.ranges) {
+    for (let id = start; id < end; id++) {
+      ids.push(`${id}`)
+    }
+  }
+  return ids
+}
 
+// The deleted rows of a paginated table include rows that are not loaded, found by a search of the whole table
+function deleteTableRows(table: TableWithContext, deletedRows: string[][]): TableWithContext {
+  const deleteIds = deletedIds(deletedRows)
   const rows = table.originalBody.rows.filter((row) => !deleteIds.has(row.id))
-  const deletedRowCount = table.originalBody.rows.length - rows.length
+  const deletedRowCount = deleteIds.size
   return {
     ...table,
     body: { ...table.body, rows },
@@ -14,13 +14,12 @@ interface Props {
 export const TableItems = ({ table, searchedTable, handleUndo, locale }: Props): JSX.Element => {
   const text = useMemo(() => getTranslations(locale), [locale])
 
+  // Of a paginated table the rows of the whole table, and the matches of a search of the whole table
   const deleted = table.deletedRowCount
-  const n = table.body.rows.length
-  const searched = searchedTable.body.rows.length
-  const total = table.originalBody.rows.length - table.deletedRowCount
+  const n = (table.totalRows ?? table.originalBody.rows.length) - deleted
+  const searched = searchedTable.searchMatches ?? searchedTable.body.rows.length
 
   const nLabel = n.toLocaleString(locale, { useGrouping: true })
-  const totalLabel = total.toLocaleString(locale, { useGrouping: true })
   const searchLabel = searched.toLocaleString(locale, { useGrouping: true })
   const deletedLabel = deleted.toLocaleString('en', { useGrouping: true }) + ' ' + text.deleted
 
@@ -34,13 +33,13 @@ export const TableItems = ({ table, searchedTable, handleUndo, locale }: Props):
     <div className='flex  min-w-[200px] gap-1'>
       <div className='flex items-center'>{tableIcon}</div>
       <div
-        key={`${totalLabel}_${deleted}`}
+        key={`${nLabel}_${deleted}`}
         className='flex flex-wrap items-center px-2  gap-x-2 animate-fadeIn text-title7 md:text-title6 font-label'
       >
         <div className={n > 0 ? '' : 'hidden'}>
           {table.head.cells.length} {text.columns},
         </div>
-        <div key={totalLabel} className='animate-fadeIn'>
+        <div key={nLabel} className='animate-fadeIn'>
           {rowsLabel()}
           {deleted > 0 ? ',' : ''}
         </div>
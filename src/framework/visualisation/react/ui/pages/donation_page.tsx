@@ -8,7 +8,8 @@ import {
     isPropsUIPromptConsentForm,
     isPropsUIPromptFileInput,
     isPropsUIPromptRadioInput,
-    isPropsUIPromptQuestionnaire 
+    isPropsUIPromptQuestionnaire,
+    isPropsUIPromptProgress
 } from '../../../../types/prompts'
 import { ReactFactoryContext } from '../../factory'
 import { ForwardButton } from '../elements/button'
@@ -17,6 +18,7 @@ import { Confirm } from '../prompts/confirm'
 import { ConsentForm } from '../prompts/consent_form'
 import { FileInput } from '../prompts/file_input'
 import { Questionnaire } from '../prompts/questionnaire'
+import { ProgressPrompt } from '../prompts/progress'
 import { RadioInput } from '../prompts/radio_input'
 import { Footer } from './templates/footer'
 import { Page } from './templates/page'
@@ -28,7 +30,7 @@ export const DonationPage = (props: Props): JSX.Element => {
   const { locale, resolve } = props
 
   function renderBody (props: Props): JSX.Element {
-    const context = { locale: locale, resolve: props.resolve }
+    const context = { locale: locale, resolve: props.resolve, onTableCommand: props.onTableCommand }
     const body = props.body
     if (isPropsUIPromptFileInput(body)) {
       return <FileInput {...body} {...context} />
@@ -45,6 +47,9 @@ export const DonationPage = (props: Props): JSX.Element => {
     if (isPropsUIPromptQuestionnaire(body)) {
       return <Questionnaire {...body} {...context} />
     }
+    if (isPropsUIPromptProgress(body)) {
+      return <ProgressPrompt {...body} {...context} />
+    }
     throw new TypeError('Unknown body type')
   }
 
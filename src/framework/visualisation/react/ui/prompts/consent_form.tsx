@@ -6,14 +6,30 @@ import {
   PropsUITableRow,
   TableWithContext,
   TableContext,
+  TableSearch,
 } from "../../../../types/elements"
-import { PropsUIPromptConsentForm, PropsUIPromptConsentFormTable } from "../../../../types/prompts"
+import {
+  CommandUITable,
+  CommandUITablePage,
+  CommandUITableSearch,
+  isCommandUITableSearch,
+  Payload,
+} from "../../../../types/commands"
+import {
+  ColumnarTable,
+  ColumnarTableColumn,
+  ColumnSummary,
+  isColumnarTable,
+  PropsUIPromptConsentForm,
+  PropsUIPromptConsentFormTable,
+  Truncation,
+} from "../../../../types/prompts"
 import { LabelButton, PrimaryButton } from "../elements/button"
 import { BodyLarge } from "../elements/text"
 import TextBundle from "../../../../text_bundle"
 import { Translator } from "../../../../translator"
 import { ReactFactoryContext } from "../../factory"
-import { useCallback, useEffect, useState } from "react"
+import { useCallback, useEffect, useRef, useState } from "react"
 import _ from "lodash"
 
 import useUnloadWarning from "../hooks/useUnloadWarning"
@@ -29,12 +45,73 @@ export const ConsentForm = (props: Props): JSX.Element => {
   const { locale, resolve } = props
   const { description, donateQuestion, donateButton, cancelButton } = prepareCopy(props)
   const [isDonating, setIsDonating] = useState(false)
+  const [loadingTableId, setLoadingTableId] = useState<string>()
 
   useEffect(() => {
     setTables(parseTables(props.tables))
     setMetaTables(parseTables(props.metaTables))
   }, [props.tables])
 
+  // The script answers one payload at a time: a payload sent while it answers
+  // a request of the form waits its turn, a newer search of a table replaces a waiting one
+  const waiting = useRef(false)
+  const queued = useRef<Payload[]>([])
+
+  function send(payload: Payload): void {
+    if (waiting.current) {
+      if (payload.__type__ === "PayloadTableSearch") {
+        queued.current = queued.current.filter(
+          (other) => other.__type__ !== "PayloadTableSearch" || other.value.table_id !== payload.value.table_id
+        )
+      }
+      queued.current.push(payload)
+      return
+    }
+    waiting.current = payload.__type__ === "PayloadTablePageRequest" || payload.__type__ === "PayloadTableSearch"
+    resolve?.(payload)
+  }
+
+  function answered(): void {
+    waiting.current = false
+    const next = queued.current.shift()
+    if (next !== undefined) send(next)
+  }
+
+  // Rows of a paginated table arrive as a CommandUITablePage, the result of a search of the whole table
+  // as a CommandUITableSearch, while the page stays on screen
+  useEffect(() => {
+    return props.onTableCommand?.((command: CommandUITable) => {
+      if (isCommandUITableSearch(command)) {
+        const search = parseSearch(command)
+        setTables((tables) => tables.map((table) => (table.id === command.table_id ? { ...table, search } : table)))
+      } else {
+        receivePage(command)
+      }
+      answered()
+    })
+  }, [props.onTableCommand])
+
+  function receivePage(page: CommandUITablePage): void {
+    const dataFrame = JSON.parse(page.data_frame)
+    if (isColumnarTable(dataFrame)) {
+      const rows = columnarRows(dataFrame, page.offset)
+      setTables((tables) =>
+        tables.map((table) =>
+          table.id === page.table_id && table.originalBody.rows.length === page.offset
+            ? appendRows(table, rows, page.total_rows)
+            : table
+        )
+      )
+    }
+    setLoadingTableId(undefined)
+  }
+
+  function parseSearch(command: CommandUITableSearch): TableSearch {
+    const dataFrame = JSON.parse(command.data_frame)
+    const rows = isColumnarTable(dataFrame) ? columnarRows(dataFrame, 0, command.row_ids) : []
+    return { query: command.query, matches: command.matches, ranges: command.ranges, rows }
+  }
+
   const updateTable = useCallback((tableId: string, table: TableWithContext) => {
     setTables((tables) => {
       const index = tables.findIndex((table) => table.id === tableId)
@@ -79,6 +156,54 @@ export const ConsentForm = (props: Props): JSX.Element => {
     return result
   }
 
+  function columnarCell(column: ColumnarTableColumn, row: number): string {
+    if (column.codes !== undefined && column.dictionary !== undefined) {
+      const code = column.codes[row]
+      return String(code < 0 ? null : column.dictionary[code])
+    }
+    if (column.timestamps !== undefined) {
+      const milliseconds = column.timestamps[row]
+      return milliseconds === null ? String(null) : formatTimestamp(milliseconds)
+    }
+    return String(column.values?.[row] ?? null)
+  }
+
+  // Row ids count from the offset of the page, so they are row numbers of the whole table,
+  // the rows of a search have their row numbers in rowIds
+  function columnarRows(table: ColumnarTable, offset: number = 0, rowIds?: number[]): PropsUITableRow[] {
+    const result: PropsUITableRow[] = []
+    for (let row = 0; row < table.length; row++) {
+      const cells = table.columns.map((column) => columnarCell(column, row))
+      result.push({ id: `${rowIds?.[row] ?? offset + row}`, cells })
+    }
+    return result
+  }
+
+  // The rows are not deleted, so they go to the body as well as to the original body
+  function appendRows(table: TableWithContext, rows: PropsUITableRow[], totalRows: number): TableWithContext {
+    return {
+      ...table,
+      originalBody: { ...table.originalBody, rows: table.originalBody.rows.concat(rows) },
+      body: { ...table.body, rows: table.body.rows.concat(rows) },
+      totalRows,
+    }
+  }
+
+  function loadMoreRows(table: TableWithContext): void {
+    if (loadingTableId !== undefined || isDonating) return
+    setLoadingTableId(table.id)
+    const offset = table.originalBody.rows.length
+    const limit = table.pageSize ?? offset
+    send({ __type__: "PayloadTablePageRequest", value: { table_id: table.id, offset, limit } })
+  }
+
+  // A table with rows that are not loaded is searched by the script, see TableContainer
+  function searchTable(table: TableWithContext, query: string): void {
+    if (!hasMoreRows(table) || isDonating) return
+    const limit = table.pageSize ?? table.originalBody.rows.length
+    send({ __type__: "PayloadTableSearch", value: { table_id: table.id, query, limit } })
+  }
+
   function parseTables(tablesData: PropsUIPromptConsentFormTable[]): Array<PropsUITable & TableContext> {
     return tablesData.map((table) => parseTable(table))
   }
@@ -90,14 +215,17 @@ export const ConsentForm = (props: Props): JSX.Element => {
       tableData.description !== undefined ? Translator.translate(tableData.description, props.locale) : ""
     const deletedRowCount = 0
     const dataFrame = JSON.parse(tableData.data_frame)
-    const headCells = columnNames(dataFrame).map((column: string) => column)
+    const columnar = (tableData.version ?? 1) >= 2 && isColumnarTable(dataFrame)
+    const headCells = columnar
+      ? dataFrame.columns.map((column: ColumnarTableColumn) => column.name)
+      : columnNames(dataFrame).map((column: string) => column)
     const head: PropsUITableHead = {
       __type__: "PropsUITableHead",
       cells: headCells,
     }
     const body: PropsUITableBody = {
       __type__: "PropsUITableBody",
-      rows: rows(dataFrame),
+      rows: columnar ? columnarRows(dataFrame) : rows(dataFrame),
     }
     return {
       __type__: "PropsUITable",
@@ -112,45 +240,37 @@ export const ConsentForm = (props: Props): JSX.Element => {
       deletedRows: [],
       visualizations: tableData.visualizations,
       folded: tableData.folded || false,
+      totalRows: tableData.total_rows ?? body.rows.length,
+      pageSize: tableData.page_size,
+      summary: tableData.summary,
+      truncation: tableData.truncation ?? undefined,
     }
   }
 
+  // Only the deletions go back, the script builds the donation from the tables it holds
   function handleDonate(): void {
+    if (isDonating) return
     setIsDonating(true)
-    const value = serializeConsentData()
-    resolve?.({ __type__: "PayloadJSON", value })
+    const value = serializeConsentEdits()
+    send({ __type__: "PayloadConsentEdits", value })
   }
 
   function handleCancel(): void {
-    resolve?.({ __type__: "PayloadFalse", value: false })
+    if (isDonating) return
+    send({ __type__: "PayloadFalse", value: false })
   }
 
-  function serializeConsentData(): string {
-    const array = serializeTables().concat(serializeMetaData())
-    return JSON.stringify(array)
-  }
-
-  function serializeMetaData(): any[] {
-    return serializeMetaTables().concat(serializeDeletedMetaData())
-  }
-
-  function serializeTables(): any[] {
-    return tables.map((table) => serializeTable(table))
+  function serializeConsentEdits(): string {
+    const deleted = _.fromPairs(
+      tables.filter(({ deletedRowCount }) => deletedRowCount > 0).map((table) => [table.id, deletedRanges(table)])
+    )
+    return JSON.stringify({ deleted, meta: serializeMetaTables() })
   }
 
   function serializeMetaTables(): any[] {
     return metaTables.map((table) => serializeTable(table))
   }
 
-  function serializeDeletedMetaData(): any {
-    const rawData = tables
-      .filter(({ deletedRowCount }) => deletedRowCount > 0)
-      .map(({ id, deletedRowCount }) => `User deleted ${deletedRowCount} rows from table: ${id}`)
-
-    const data = JSON.stringify(rawData)
-    return { user_omissions: data }
-  }
-
   function serializeTable({ id, head, body: { rows } }: PropsUITable): any {
     const data = rows.map((row) => serializeRow(row, head))
     return { [id]: data }
@@ -177,7 +297,28 @@ export const ConsentForm = (props: Props): JSX.Element => {
         <div className="grid gap-8 max-w-full">
           {tables.map((table) => {
             return (
-              <TableContainer key={table.id} id={table.id} table={table} updateTable={updateTable} locale={locale} />
+              <div key={table.id} className="flex flex-col gap-2">
+                {table.truncation !== undefined ? (
+                  <BodyLarge margin="" text={truncationLabel(table.truncation, locale)} />
+                ) : null}
+                <TableContainer
+                  id={table.id}
+                  table={table}
+                  updateTable={updateTable}
+                  onSearch={(query: string) => searchTable(table, query)}
+                  locale={locale}
+                />
+                {hasMoreRows(table) ? (
+                  <div className="flex flex-row flex-wrap items-center gap-4">
+                    <BodyLarge margin="" text={pagesLabel(table, locale)} />
+                    <LabelButton
+                      label={loadingTableId === table.id ? loadingRowsLabel(locale) : loadMoreLabel(locale)}
+                      onClick={() => loadMoreRows(table)}
+                      color="text-primary"
+                    />
+                  </div>
+                ) : null}
+              </div>
             )
           })}
         </div>
@@ -199,6 +340,62 @@ export const ConsentForm = (props: Props): JSX.Element => {
   )
 }
 
+// The deleted row ids of a table as sorted half-open ranges: [[3, 5], [9, 10]] for rows 3, 4 and 9
+function deletedRanges(table: TableWithContext): number[][] {
+  const ids = _.sortBy(_.uniq(_.flatten(table.deletedRows)).map(Number))
+  const ranges: number[][] = []
+  for (const id of ids) {
+    const last = ranges[ranges.length - 1]
+    if (last !== undefined && last[1] === id) {
+      last[1] = id + 1
+    } else {
+      ranges.push([id, id + 1])
+    }
+  }
+  return ranges
+}
+
+function hasMoreRows(table: TableWithContext): boolean {
+  return (table.totalRows ?? 0) > table.originalBody.rows.length
+}
+
+// "100 of 5,000 rows loaded, from 2021-03-01 to 2024-01-28"
+function pagesLabel(table: TableWithContext, locale: string): string {
+  const loaded = table.originalBody.rows.length.toLocaleString(locale, { useGrouping: true })
+  const total = (table.totalRows ?? 0).toLocaleString(locale, { useGrouping: true })
+  const label = Translator.translate(rowsLoadedLabel, locale).replace("{loaded}", loaded).replace("{total}", total)
+  const period = table.summary?.find((column: ColumnSummary) => column.first !== undefined && column.last !== undefined)
+  if (period?.first === undefined || period?.last === undefined) return label
+  const from = formatTimestamp(period.first).slice(0, 10)
+  const to = formatTimestamp(period.last).slice(0, 10)
+  return label + Translator.translate(periodLabel, locale).replace("{from}", from).replace("{to}", to)
+}
+
+// "Only part of this data could be read in time: 12 of 30 files (40%)"
+function truncationLabel(truncation: Truncation, locale: string): string {
+  if (truncation.reason === "rows") {
+    const rows = truncation.rows.toLocaleString(locale, { useGrouping: true })
+    return Translator.translate(truncatedRowsLabel, locale).replace("{rows}", rows)
+  }
+  return Translator.translate(truncatedTimeLabel, locale)
+    .replace("{read}", String(truncation.members_read))
+    .replace("{total}", String(truncation.members_total))
+    .replace("{percentage}", String(Math.round(truncation.coverage * 100)))
+}
+
+function loadMoreLabel(locale: string): string {
+  return Translator.translate(loadMoreButtonLabel, locale)
+}
+
+function loadingRowsLabel(locale: string): string {
+  return Translator.translate(loadingLabel, locale)
+}
+
+// Epoch milliseconds as "2024-01-28 13:00:00" (UTC)
+function formatTimestamp(milliseconds: number): string {
+  return new Date(milliseconds).toISOString().replace("T", " ").replace(/\.\d{3}Z$/, "")
+}
+
 interface Copy {
   description: string
   donateQuestion: string
@@ -232,3 +429,21 @@ const defaultDescription = new TextBundle()
   )
 
 const cancelButtonLabel = new TextBundle().add("en", "No").add("nl", "Nee")
+
+const rowsLoadedLabel = new TextBundle()
+  .add("en", "{loaded} of {total} rows loaded")
+  .add("nl", "{loaded} van {total} rijen geladen")
+
+const periodLabel = new TextBundle().add("en", ", from {from} to {to}").add("nl", ", van {from} tot {to}")
+
+const loadMoreButtonLabel = new TextBundle().add("en", "Load more rows").add("nl", "Meer rijen laden")
+
+const loadingLabel = new TextBundle().add("en", "Loading...").add("nl", "Laden...")
+
+const truncatedRowsLabel = new TextBundle()
+  .add("en", "This table is incomplete: only the first {rows} rows are included")
+  .add("nl", "Deze tabel is onvolledig: alleen de eerste {rows} rijen zijn opgenomen")
+
+const truncatedTimeLabel = new TextBundle()
+  .add("en", "This table is incomplete: only part of this data could be read in time, {read} of {total} files ({percentage}%)")
+  .add("nl", "Deze tabel is onvolledig: maar een deel van deze gegevens kon op tijd worden gelezen, {read} van {total} bestanden ({percentage}%)")
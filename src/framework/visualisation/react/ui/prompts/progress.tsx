@@ -0,0 +1,42 @@
+import { useEffect } from 'react'
+import { Weak } from '../../../../helpers'
+import { ReactFactoryContext } from '../../factory'
+import { PropsUIPromptProgress } from '../../../../types/prompts'
+import { Translator } from '../../../../translator'
+import { BodyLarge, BodySmall } from '../elements/text'
+import { Progress } from '../elements/progress'
+
+type Props = Weak<PropsUIPromptProgress> & ReactFactoryContext
+
+export const ProgressPrompt = (props: Props): JSX.Element => {
+  const { resolve, percentage } = props
+  const { description, message } = prepareCopy(props)
+
+  // The script waits for the render to continue: answer every progress command once,
+  // the engine hands every rendered command a new resolve
+  useEffect(() => {
+    resolve?.({ __type__: 'PayloadVoid', value: undefined })
+  }, [resolve])
+
+  return (
+    <>
+      <BodyLarge text={description} margin='mb-4' />
+      <div className='flex flex-col gap-2 max-w-3xl'>
+        <Progress percentage={percentage ?? 0} />
+        <BodySmall text={message} margin='' />
+      </div>
+    </>
+  )
+}
+
+interface Copy {
+  description: string
+  message: string
+}
+
+function prepareCopy ({ description, message, locale }: Props): Copy {
+  return {
+    description: Translator.translate(description, locale),
+    message: Translator.translate(message, locale)
+  }
+}
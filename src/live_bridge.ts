@@ -1,11 +1,22 @@
-import { CommandSystem, isCommandSystem } from './framework/types/commands'
+import { DonationChunks, reassembleDonation } from './framework/donation'
+import {
+  CommandSystem,
+  CommandSystemDonateManifest,
+  isCommandSystem,
+  isCommandSystemDonateChunk,
+  isCommandSystemDonateManifest
+} from './framework/types/commands'
 import { Bridge } from './framework/types/modules'
 
 export default class LiveBridge implements Bridge {
   port: MessagePort
+  // Whether the host reads chunked donations, otherwise they are sent as one CommandSystemDonate
+  donationChunks: boolean
+  chunks = new DonationChunks()
 
-  constructor (port: MessagePort) {
+  constructor (port: MessagePort, donationChunks: boolean = false) {
     this.port = port
+    this.donationChunks = donationChunks
   }
 
   static create (window: Window, callback: (bridge: Bridge, locale: string) => void): void {
@@ -13,7 +24,7 @@ export default class LiveBridge implements Bridge {
       console.log('MESSAGE RECEIVED', event)
       // Skip webpack messages
       if (event.data.action === 'live-init') {
-        const bridge = new LiveBridge(event.ports[0])
+        const bridge = new LiveBridge(event.ports[0], event.data.donationChunks === true)
         const locale = event.data.locale
         console.log('LOCALE', locale)
         callback(bridge, locale)
@@ -22,7 +33,11 @@ export default class LiveBridge implements Bridge {
   }
 
   send (command: CommandSystem): void {
-    if (isCommandSystem(command)) {
+    if (!this.donationChunks && isCommandSystemDonateChunk(command)) {
+      this.chunks.add(command)
+    } else if (!this.donationChunks && isCommandSystemDonateManifest(command)) {
+      void this.sendReassembled(command)
+    } else if (isCommandSystem(command)) {
       this.log('info', 'send', command)
       this.port.postMessage(command)
     } else {
@@ -30,6 +45,14 @@ export default class LiveBridge implements Bridge {
     }
   }
 
+  private async sendReassembled (manifest: CommandSystemDonateManifest): Promise<void> {
+    try {
+      this.send(await reassembleDonation(manifest, this.chunks.take(manifest.key)))
+    } catch (error) {
+      this.log('error', 'donation could not be reassembled', manifest.key, error)
+    }
+  }
+
   private log (level: 'info' | 'error', ...message: any[]): void {
     const logger = level === 'info' ? console.log : console.error
     logger('[LiveBridge]', ...message)